@@ -0,0 +1,73 @@
+"""カタログのスナップショットの読み込みと集計にかかる時間を測るベンチマーク.
+
+使い方:
+    uv run python benchmarks/catalog.py [--reports N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from kamojiros.core.catalog import ReportCatalog
+from kamojiros.core.time import JST, to_epoch_us
+from kamojiros.models import ReportAuthor, ReportType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _sample_catalog(n: int) -> ReportCatalog:
+    start = datetime(2015, 1, 1, tzinfo=JST)
+    types = [t.value for t in ReportType]
+    authors = [a.value for a in ReportAuthor]
+    rows = []
+    for i in range(n):
+        created = to_epoch_us(start + timedelta(minutes=60 * i))
+        tags = [f"tag{i % 97}", f"topic/{i % 13}"]
+        rows.append((created, created, types[i % len(types)], authors[i % len(authors)], tags, f"ノート {i}", f"n-{i}"))
+    return ReportCatalog.from_rows(rows)
+
+
+def main() -> None:
+    """N 件のカタログをスナップショットに書き出し、読み込みと集計の時間を表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=100_000, help="カタログの件数")
+    args = parser.parse_args()
+
+    catalog = _sample_catalog(args.reports)
+    since = datetime(2015, 1, 1, tzinfo=JST)
+    until = since + timedelta(hours=args.reports)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.bin"
+        catalog.save(path)
+
+        started = time.perf_counter()
+        loaded = ReportCatalog.load(path)
+        load_ms = (time.perf_counter() - started) * 1e3
+        assert loaded is not None  # noqa: S101
+
+        measurements = {
+            "load (mmap)": load_ms,
+            "timeline (month)": _measure(lambda: loaded.timeline(since, until, "month")),
+            "crosstab": _measure(lambda: loaded.crosstab(since, until)),
+            "stats": _measure(lambda: loaded.stats(since, until)),
+        }
+
+    for name, ms in measurements.items():
+        print(f"{name:<18} {ms:8.2f} ms ({args.reports} reports)")  # noqa: T201
+
+
+def _measure(func: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1e3
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""CLI の起動時間 (kamojiros --help などが起動してから読み込むモジュールの import 時間) を測るベンチマーク.
+
+使い方:
+    uv run python benchmarks/cli_startup.py [--number N] [--top K] [--budget-ms MS] [-- 引数...]
+
+引数を省略した場合は --help を測る。--budget-ms を渡すと、中央値が上限を超えたときに終了コード 1 で終わる。
+import 時間の読み取り (import_times) は tests/kamojiros/test_import_time.py でも使う。
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+_PREFIX = "import time:"
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    """-X importtime の 1 行. depth は入れ子の深さ (0 が CLI から直接読み込んだモジュール)."""
+
+    name: str
+    depth: int
+    cumulative_us: int
+
+
+def import_times(args: list[str]) -> list[ImportTime]:
+    """-X importtime で CLI を起動し、site より後に読み込んだモジュールの import 時間を返す."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "kamojiros.main", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: list[ImportTime] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith(_PREFIX):
+            continue
+        _, cumulative, raw_name = line.split("|")
+        name = raw_name.strip()
+        if name == "site":
+            # 起動時に読み込むもの (site まで) は数えない
+            times.clear()
+            continue
+        if not cumulative.strip().isdigit():
+            # 見出しの行
+            continue
+        # 名前の前の空白は、区切りの 1 つと入れ子 1 段ごとの 2 つ
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        times.append(ImportTime(name=name, depth=depth, cumulative_us=int(cumulative)))
+    return times
+
+
+def top_level_us(times: list[ImportTime]) -> int:
+    """CLI から直接読み込んだモジュールの累積時間の合計 (マイクロ秒). 入れ子のぶんを二重に数えない."""
+    return sum(entry.cumulative_us for entry in times if entry.depth == 0)
+
+
+def main() -> None:
+    """CLI を number 回起動し、import 時間と起動全体の時間の中央値、import の重いモジュールを表示する."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=10, help="起動する回数")
+    parser.add_argument("--top", type=int, default=10, help="表示する import の重いモジュールの数")
+    parser.add_argument("--budget-ms", type=float, default=None, help="import 時間の中央値の上限 (ミリ秒)")
+    parser.add_argument("cli_args", nargs="*", help="kamojiros に渡す引数 (省略時は --help)")
+    args = parser.parse_args()
+    cli_args = args.cli_args or ["--help"]
+
+    totals: list[float] = []
+    walls: list[float] = []
+    last: list[ImportTime] = []
+    for _ in range(args.number):
+        started = time.perf_counter()
+        last = import_times(cli_args)
+        walls.append((time.perf_counter() - started) * 1000)
+        totals.append(top_level_us(last) / 1000)
+
+    imports_ms = statistics.median(totals)
+    print(f"kamojiros {' '.join(cli_args)}")  # noqa: T201
+    print(f"  imports after site  {imports_ms:8.1f} ms (median of {args.number})")  # noqa: T201
+    print(f"  process wall time   {statistics.median(walls):8.1f} ms")  # noqa: T201
+    heaviest = sorted((entry for entry in last if entry.depth == 0), key=lambda e: e.cumulative_us, reverse=True)
+    for entry in heaviest[: args.top]:
+        print(f"    {entry.name:<40} {entry.cumulative_us / 1000:8.1f} ms")  # noqa: T201
+
+    if args.budget_ms is not None and imports_ms > args.budget_ms:
+        print(f"over budget: {imports_ms:.1f} ms > {args.budget_ms:.1f} ms")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
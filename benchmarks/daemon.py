@@ -0,0 +1,114 @@
+"""Kamojiros serve に問い合わせた場合と、コマンドごとに同じプロセスで実行した場合の応答時間を比べるベンチマーク.
+
+git 管理の Notes リポジトリに N 件を保存してコミットし、別のスレッドで IndexServer を動かす。
+同じプロセスでの実行は、CLI と同じく毎回リポジトリと索引を開き直す (Python の起動と import の時間は含まない)。
+
+使い方:
+    uv run python benchmarks/daemon.py [--notes N] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from kamojiros.apps.index_server.main import IndexServer
+from kamojiros.cli.service import report_service
+from kamojiros.config.settings import NotesSettings
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from kamojiros.infrastructure.daemon import DaemonReportService
+    from kamojiros.services.report_service import ReportService
+
+_START = datetime(2025, 1, 1, tzinfo=JST)
+
+
+def _reports(n: int) -> list[Report]:
+    reports = []
+    for i in range(n):
+        created = _START + timedelta(minutes=37 * i)
+        meta = ReportMeta(
+            note_id=f"{created:%Y-%m-%d-%H%M}-tech-bench-{i}",
+            title=f"ベンチマーク {i}",
+            created_at=created,
+            updated_at=created,
+            type=ReportType.TECH,
+            author=ReportAuthor.USER,
+            tags=["bench", f"tag{i % 10}"],
+        )
+        reports.append(Report(meta=meta, body_markdown=f"本文 {i}\n" * 20))
+    return reports
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+
+def _commands(service: Callable[[], ReportService | DaemonReportService]) -> dict[str, Callable[[], object]]:
+    return {
+        "list": lambda: service().list_reports(limit=10, since=_START),
+        "search": lambda: service().search_reports("本文 42", all_time=True),
+        "stats": lambda: service().get_statistics(_START),
+    }
+
+
+def main() -> None:
+    """各コマンドの応答時間の中央値を表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=2000, help="保存するノートの件数")
+    parser.add_argument("--repeat", type=int, default=30, help="1 コマンドあたりの実行回数")
+    args = parser.parse_args()
+    git = shutil.which("git")
+    if git is None:
+        parser.error("git is not available")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        notes = NotesSettings(repo_root=Path(tmp) / "notes")
+        MarkdownReportRepository(notes_repo_root=notes.repo_root).save_many(_reports(args.notes))
+        for git_args in (("init", "--quiet"), ("add", "-A"), ("commit", "--quiet", "-m", "bench")):
+            subprocess.run(  # noqa: S603
+                [git, "-C", str(notes.repo_root), "-c", "user.name=bench", "-c", "user.email=b@example.com", *git_args],
+                check=True,
+            )
+
+        local = _commands(lambda: report_service(notes.model_copy(update={"use_daemon": False})))
+        for fn in local.values():
+            fn()  # 索引を作っておく
+        local_ms = {name: _median_ms(fn, args.repeat) for name, fn in local.items()}
+
+        server = IndexServer(notes)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        remote = _commands(lambda: report_service(notes))
+        for fn in remote.values():
+            fn()
+        remote_ms = {name: _median_ms(fn, args.repeat) for name, fn in remote.items()}
+        server.stop()
+        thread.join()
+
+    for name, local in local_ms.items():
+        print(f"{name:7s} in-process {local:8.2f} ms   serve {remote_ms[name]:6.2f} ms")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""フロントマター 1 件あたりの読み込み時間を比較するベンチマーク.
+
+使い方:
+    uv run python benchmarks/front_matter.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from datetime import datetime
+
+import yaml
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.front_matter import dump_front_matter, load_front_matter, parse_own_front_matter
+
+
+def _sample_front_matter() -> str:
+    created = datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST).isoformat()
+    return dump_front_matter(
+        {
+            "note_id": "2025-11-17-2100-tech-benchmark",
+            "title": "フロントマターのベンチマーク",
+            "created_at": created,
+            "updated_at": created,
+            "type": "tech",
+            "author": "user",
+            "tags": ["python", "yaml", "benchmark"],
+            "source_urls": ["https://example.com/articles/1"],
+        }
+    )
+
+
+def main() -> None:
+    """各パーサで同じフロントマターを読み、1 件あたりの時間を表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5000, help="1 パーサあたりの読み込み回数")
+    args = parser.parse_args()
+
+    fm_text = _sample_front_matter()
+    candidates = {
+        "yaml.safe_load": lambda: yaml.safe_load(fm_text),
+        "parse_own_front_matter": lambda: parse_own_front_matter(fm_text),
+        "load_front_matter": lambda: load_front_matter(fm_text),
+    }
+    if getattr(yaml, "CSafeLoader", None) is not None:
+        candidates["yaml.load(CSafeLoader)"] = lambda: yaml.load(fm_text, Loader=yaml.CSafeLoader)
+
+    for name, func in candidates.items():
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        print(f"{name:<26} {seconds / args.number * 1e6:8.1f} us/file")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""保存したノートを git にコミットするオーバーヘッドを、1,000 件あたりで測るベンチマーク.
+
+GitCommitter で 1 コミットにまとめた場合と、1 件ずつ git add / git commit した場合を比べる。
+1 件ずつの場合は --per-file-sample 件だけ実行し、1,000 件あたりに換算する。
+
+使い方:
+    uv run python benchmarks/git_commit.py [--notes N] [--per-file-sample M]
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.committer import GitCommitter
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+_PER = 1000
+
+
+def _reports(n: int, offset: int = 0) -> list[Report]:
+    start = datetime(2025, 1, 1, tzinfo=JST)
+    reports = []
+    for i in range(offset, offset + n):
+        created = start + timedelta(minutes=37 * i)
+        meta = ReportMeta(
+            note_id=f"{created:%Y-%m-%d-%H%M}-meta-bench-{i}",
+            title=f"ベンチマーク {i}",
+            created_at=created,
+            updated_at=created,
+            type=ReportType.META,
+            author=ReportAuthor.SELF_OBSERVER,
+            tags=["bench"],
+        )
+        reports.append(Report(meta=meta, body_markdown=f"本文 {i}\n" * 20))
+    return reports
+
+
+def _init_repo(git: str, repo_root: Path) -> None:
+    repo_root.mkdir()
+    for args in (("init", "--quiet"), ("config", "user.name", "bench"), ("config", "user.email", "bench@example.com")):
+        subprocess.run([git, "-C", str(repo_root), *args], check=True)  # noqa: S603
+
+
+def main() -> None:
+    """N 件を保存してコミットし、保存だけの場合との差を 1,000 件あたりで表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=_PER, help="保存するノートの件数")
+    parser.add_argument("--per-file-sample", type=int, default=50, help="1 件ずつコミットする場合に測る件数")
+    args = parser.parse_args()
+    git = shutil.which("git")
+    if git is None:
+        parser.error("git is not available")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo_root = Path(tmp) / "notes"
+        _init_repo(git, repo_root)
+
+        # 保存だけ
+        repo = MarkdownReportRepository(notes_repo_root=repo_root)
+        started = time.perf_counter()
+        repo.save_many(_reports(args.notes))
+        save_ms = (time.perf_counter() - started) * 1e3
+
+        # 保存 + GitCommitter で 1 コミット
+        committer = GitCommitter(repo_root, git, batch_size=args.notes + 1)
+        repo = MarkdownReportRepository(notes_repo_root=repo_root, committer=committer)
+        started = time.perf_counter()
+        repo.save_many(_reports(args.notes, offset=args.notes))
+        commit = committer.flush()
+        batched_ms = (time.perf_counter() - started) * 1e3
+        assert commit is not None  # noqa: S101
+
+        # 保存 + 1 件ずつ git add / git commit
+        started = time.perf_counter()
+        for report in _reports(args.per_file_sample, offset=2 * args.notes):
+            path = MarkdownReportRepository(notes_repo_root=repo_root).save(report)
+            for git_args in (("add", str(path)), ("commit", "--quiet", "--message", "Add note", "--", str(path))):
+                subprocess.run([git, "-C", str(repo_root), *git_args], check=True)  # noqa: S603
+        per_file_ms = (time.perf_counter() - started) * 1e3
+
+    scale = _PER / args.notes
+    print(f"save only             {save_ms * scale:9.1f} ms / {_PER} notes")  # noqa: T201
+    print(f"save + batched commit {batched_ms * scale:9.1f} ms / {_PER} notes")  # noqa: T201
+    print(f"  commit overhead     {(batched_ms - save_ms) * scale:9.1f} ms / {_PER} notes")  # noqa: T201
+    print(  # noqa: T201
+        f"save + commit per file {per_file_ms * _PER / args.per_file_sample:8.1f} ms / {_PER} notes "
+        f"(extrapolated from {args.per_file_sample})"
+    )
+
+
+if __name__ == "__main__":
+    main()
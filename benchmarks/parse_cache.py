@@ -0,0 +1,73 @@
+"""同じプロセスで同じノートを 2 回読み出すときの、ParseCache の効果を測るベンチマーク.
+
+索引なしの MarkdownReportRepository で期間内のノートを本文まで読み、1 回目 (ファイルから読む) と
+2 回目 (キャッシュから返す) の時間を比べる。
+
+使い方:
+    uv run python benchmarks/parse_cache.py [--notes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.interfaces.reports import ReportQuery
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+
+def _reports(n: int) -> list[Report]:
+    start = datetime(2025, 1, 1, tzinfo=JST)
+    reports = []
+    for i in range(n):
+        created = start + timedelta(minutes=37 * i)
+        meta = ReportMeta(
+            note_id=f"{created:%Y-%m-%d-%H%M}-tech-bench-{i}",
+            title=f"ベンチマーク {i}",
+            created_at=created,
+            updated_at=created,
+            type=ReportType.TECH,
+            author=ReportAuthor.USER,
+            tags=["bench", f"tag{i % 10}"],
+        )
+        reports.append(Report(meta=meta, body_markdown=f"本文 {i}\n" * 20))
+    return reports
+
+
+def _read_all(repo: MarkdownReportRepository) -> float:
+    started = time.perf_counter()
+    for report in repo.query(ReportQuery()):
+        _ = report.body_markdown
+    return (time.perf_counter() - started) * 1e3
+
+
+def main() -> None:
+    """N 件を保存し、別のリポジトリから 2 回続けて全件を読む時間を表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=5000, help="保存するノートの件数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "notes"
+        MarkdownReportRepository(notes_repo_root=root).save_many(_reports(args.notes))
+
+        repo = MarkdownReportRepository(notes_repo_root=root)
+        cold_ms = _read_all(repo)
+        warm_ms = _read_all(repo)
+
+    stats = repo.cache.stats()
+    print(f"first read  {cold_ms:9.1f} ms / {args.notes} notes")  # noqa: T201
+    print(f"second read {warm_ms:9.1f} ms / {args.notes} notes")  # noqa: T201
+    print(  # noqa: T201
+        f"cache: {stats.entries} entries, ~{stats.approx_bytes / 1024 / 1024:.1f} MiB, "
+        f"{stats.hits} hits / {stats.misses} misses"
+    )
+
+
+if __name__ == "__main__":
+    main()
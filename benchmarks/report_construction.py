@@ -0,0 +1,74 @@
+"""索引行から Report を 1 件作る時間を、検証あり / なしで比較するベンチマーク.
+
+使い方:
+    uv run python benchmarks/report_construction.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import HttpUrl
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.front_matter import MarkdownBody
+from kamojiros.infrastructure.sqlite.report_index import FileState, IndexedReport
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+
+def _sample_entry() -> IndexedReport:
+    created = datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST)
+    meta = ReportMeta(
+        note_id="2025-11-17-2100-tech-benchmark",
+        title="Report 生成のベンチマーク",
+        created_at=created,
+        updated_at=created,
+        type=ReportType.TECH,
+        author=ReportAuthor.USER,
+        tags=["python", "pydantic"],
+        source_urls=[HttpUrl("https://example.com/articles/1")],
+    )
+    return IndexedReport.from_meta(
+        meta, path="docs/journal/2025/11/17/x.md", day="2025-11-17", state=FileState(0, 0, 0), body_offset=0
+    )
+
+
+def _validated(entry: IndexedReport, body: MarkdownBody) -> Report:
+    meta = ReportMeta(
+        note_id=entry.note_id,
+        title=entry.title,
+        created_at=datetime.fromisoformat(entry.created_at),
+        updated_at=datetime.fromisoformat(entry.updated_at),
+        type=ReportType(entry.type),
+        author=ReportAuthor(entry.author),
+        tags=entry.tags,
+        source_urls=[HttpUrl(u) for u in entry.source_urls],
+    )
+    report = Report.model_construct(meta=meta)
+    report._body_source = body  # noqa: SLF001
+    return report
+
+
+def main() -> None:
+    """各方法で同じ索引行から Report を作り、1 件あたりの時間を表示する."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="1 方法あたりの生成回数")
+    args = parser.parse_args()
+
+    entry = _sample_entry()
+    body = MarkdownBody(Path(entry.path), entry.body_offset)
+    candidates = {
+        "validate + model_construct": lambda: _validated(entry, body),
+        "trusted": lambda: Report.with_lazy_body(entry.to_meta(), body),
+    }
+
+    for name, func in candidates.items():
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        print(f"{name:<28} {seconds / args.number * 1e6:8.1f} us/report")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
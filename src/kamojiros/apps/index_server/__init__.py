@@ -0,0 +1 @@
+"""Index Server App Package."""
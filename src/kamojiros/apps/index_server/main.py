@@ -0,0 +1,273 @@
+"""索引と読み込んだノートを温めたまま常駐し、CLI の list / search / stats に Unix ドメインソケットで答えるサーバー.
+
+リポジトリを読むエンドポイントは通常の関数で定義し、FastAPI のスレッドプールで処理する。
+SQLite の同期的な読み出し (/list/stream の読み終わるまでを含む) がイベントループを止めず、
+1 つの遅い要求が他のクライアントを待たせない。
+
+したがってリポジトリ・SQLite の engine・ParseCache は、要求を処理する複数のスレッドと
+IndexUpdater の監視スレッドから同時に使われる。SQLite の接続は engine の接続プールから
+スレッドごとに取り出し、ParseCache は自身のロックで守り、索引の更新は
+MarkdownReportRepository が 1 つずつに直列化する。
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from itertools import islice
+from typing import TYPE_CHECKING
+
+import uvicorn
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+from kamojiros.config.settings import load_settings
+from kamojiros.infrastructure.daemon import (
+    FINGERPRINT_HEADER,
+    BodyResponse,
+    CrosstabResponse,
+    HealthResponse,
+    ListRequest,
+    ListResponse,
+    PeriodRequest,
+    SearchRequest,
+    SearchResponse,
+    TimelineResponse,
+    WireHit,
+    WireReport,
+    settings_fingerprint,
+    socket_path,
+)
+from kamojiros.infrastructure.federated import combine_repositories, root_repositories
+from kamojiros.infrastructure.git.watcher import IndexUpdater
+from kamojiros.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from pydantic import BaseModel
+
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.interfaces.reports import ReportRepository, SearchHit
+    from kamojiros.models import Report
+
+
+# /list/stream が一度に送る行数. 最初の 1 件はすぐに送り、以降はこの件数ずつまとめて送る
+_STREAM_BATCH = 256
+
+
+class DaemonAlreadyRunningError(RuntimeError):
+    """同じソケットで別のサーバーが動いている."""
+
+
+def create_app(repo: ReportRepository, fingerprint: str) -> FastAPI:  # noqa: C901
+    """Repo に問い合わせる FastAPI アプリを作る. 指紋が fingerprint と違う要求には 409 を返す."""
+    service = ReportService(report_repo=repo)
+
+    def check_fingerprint(settings: str | None = Header(None, alias=FINGERPRINT_HEADER)) -> None:
+        if settings != fingerprint:
+            raise HTTPException(status_code=409, detail="settings differ from the running server")
+
+    app = FastAPI(title="kamojiros index server", dependencies=[Depends(check_fingerprint)])
+
+    @app.get("/health")
+    async def health() -> Response:
+        return _json(HealthResponse(pid=os.getpid(), fingerprint=fingerprint))
+
+    @app.post("/list")
+    def list_reports(request: ListRequest) -> Response:
+        reports = service.list_reports(
+            request.limit,
+            request.since,
+            request.report_type,
+            request.author,
+            request.tags,
+            tag_match=request.tag_match,
+            exclude_tags=request.exclude_tags,
+            after=request.after,
+        )
+        wired = [_wire(report, with_body=request.with_body, preview=request.preview) for report in reports]
+        return _json(ListResponse(reports=wired))
+
+    @app.post("/list/stream")
+    def stream_reports(request: ListRequest) -> StreamingResponse:
+        reports = service.stream_reports(
+            request.limit,
+            request.since,
+            request.report_type,
+            request.author,
+            request.tags,
+            tag_match=request.tag_match,
+            exclude_tags=request.exclude_tags,
+            after=request.after,
+        )
+        lines = _ndjson(reports, with_body=request.with_body, preview=request.preview)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @app.post("/search")
+    def search(request: SearchRequest) -> Response:
+        # dict() は model_dump と違い、after を ReportCursor のまま渡す
+        hits = service.search_reports(**dict(request))
+        return _json(SearchResponse(hits=[_wire_hit(hit) for hit in hits]))
+
+    @app.post("/stats")
+    def stats(request: PeriodRequest) -> Response:
+        return _json(service.get_statistics(request.since))
+
+    @app.post("/timeline")
+    def timeline(request: PeriodRequest) -> Response:
+        return _json(TimelineResponse(buckets=service.get_timeline(request.group_by, request.since)))
+
+    @app.post("/crosstab")
+    def crosstab(request: PeriodRequest) -> Response:
+        counts = service.get_crosstab(request.since)
+        return _json(CrosstabResponse(cells=[(t, a, count) for (t, a), count in counts.items()]))
+
+    @app.get("/body")
+    def body(note_id: str, length: int | None = None) -> Response:
+        return _json(BodyResponse(body=_read_body(repo, note_id, length)))
+
+    return app
+
+
+class IndexServer:
+    """設定のすべての root の索引を開いて常駐し、ソケットで要求を待つ.
+
+    run でソケットを作ったあと docs/journal の監視を始め、変更はバックグラウンドで索引に反映する。
+    監視していない間は、読み出しのたびの git による索引の更新を
+    NotesSettings.daemon_refresh_interval 秒に 1 回までにする。
+    """
+
+    def __init__(self, notes: NotesSettings, path: Path | None = None) -> None:
+        """初期化. path を省略した場合は設定のソケットのパスを使う."""
+        self.path = path if path is not None else socket_path(notes)
+        self._repos = root_repositories(notes)
+        for root_repo in self._repos:
+            root_repo.refresh_interval = notes.daemon_refresh_interval
+        self._updater = IndexUpdater.from_settings(notes, self._repos)
+        repo = combine_repositories(self._repos)
+        self.app = create_app(repo, settings_fingerprint(notes))
+        config = uvicorn.Config(self.app, log_level="warning", access_log=False, lifespan="off")
+        self._server = uvicorn.Server(config)
+
+    @property
+    def started(self) -> bool:
+        """要求を受け付け始めたか."""
+        return self._server.started
+
+    def run(self, on_ready: Callable[[], None] | None = None) -> None:
+        """ソケットを作り、索引を温めてから要求を待つ.
+
+        ソケットを作れなければ (別のサーバーが動いていれば DaemonAlreadyRunningError)、索引の更新や監視を始めずに戻る。
+        すべての root の索引を最新にして docs/journal の監視を始めたあとで on_ready を呼ぶ。
+        stop が呼ばれるか、SIGINT / SIGTERM を受けると戻り、監視をやめてソケットを消す。
+        """
+        sock = bind_socket(self.path)
+        try:
+            self._updater.start()
+            if on_ready is not None:
+                on_ready()
+            self._server.run(sockets=[sock])
+        finally:
+            self._updater.stop()
+            sock.close()
+            self.path.unlink(missing_ok=True)
+
+    def stop(self) -> None:
+        """要求の待ち受けをやめる (別のスレッドから呼べる)."""
+        self._server.should_exit = True
+
+
+def bind_socket(path: Path) -> socket.socket:
+    """所有者だけが読み書きできる Unix ドメインソケットを作る.
+
+    応答の無いソケットファイル (前回のサーバーが残したもの) は消して作り直す。
+    応答するサーバーがいれば DaemonAlreadyRunningError。
+    """
+    if path.exists():
+        if _is_listening(path):
+            msg = f"kamojiros serve is already running on {path}"
+            raise DaemonAlreadyRunningError(msg)
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # bind が作るソケットファイルの権限を、作った瞬間から 0600 にする
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(str(path))
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(old_umask)
+    return sock
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def _wire(report: Report, *, with_body: bool = False, preview: int = 0) -> WireReport:
+    """Report を応答の形にする. 本文は with_body / preview で求められたぶんだけ読む."""
+    return WireReport(
+        meta=report.meta,
+        body=report.body_markdown if with_body else None,
+        head=report.body_preview(preview) if preview > 0 and not with_body else "",
+    )
+
+
+def _read_body(repo: ReportRepository, note_id: str, length: int | None) -> str:
+    """note_id の本文 (length があれば先頭 length 文字) を読む. 無ければ 404."""
+    report = repo.get(note_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"report not found: {note_id}")
+    return report.body_markdown if length is None else report.body_preview(length)
+
+
+def _wire_hit(hit: SearchHit) -> WireHit:
+    """検索結果を応答の形にする."""
+    if hit.snippet is None:
+        return WireHit(report=_wire(hit.report), score=hit.score)
+    return WireHit(
+        report=_wire(hit.report), score=hit.score, snippet=hit.snippet.text, highlights=list(hit.snippet.highlights)
+    )
+
+
+def _ndjson(reports: Iterator[Report], *, with_body: bool, preview: int) -> Iterator[str]:
+    """レポートを 1 行に 1 件の JSON にし、最初の 1 行、以降 _STREAM_BATCH 行ずつまとめて返す.
+
+    同期の generator なので、StreamingResponse はスレッドプールで 1 回ずつ読み進める
+    (SQLite のカーソルはバッチごとに別のスレッドから読まれうるが、同時に読まれることはない)。
+    """
+    lines = (_wire(report, with_body=with_body, preview=preview).model_dump_json() + "\n" for report in reports)
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first
+    while batch := "".join(islice(lines, _STREAM_BATCH)):
+        yield batch
+
+
+def _json(model: BaseModel) -> Response:
+    """モデルを JSON の応答にする (FastAPI による応答モデルの検証を省く)."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+def run() -> None:
+    """設定のソケットでサーバーを起動する."""
+    settings = load_settings()
+    if settings.notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+    IndexServer(settings.notes).run()
+
+
+if __name__ == "__main__":
+    run()
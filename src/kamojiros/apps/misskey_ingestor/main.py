@@ -4,7 +4,7 @@ from pathlib import Path
 
 from rich.console import Console
 
-from kamojiros.config.settings import Settings
+from kamojiros.config.settings import load_settings
 from kamojiros.infrastructure.misskey.client import MisskeyClient
 
 console = Console()
@@ -12,7 +12,7 @@ console = Console()
 
 def run() -> None:
     """Misskey Ingestor execution."""
-    settings = Settings()
+    settings = load_settings()
     if not settings.misskey or not settings.misskey.url:
         console.print("[red]Misskey URL is not configured.[/red]")
         return
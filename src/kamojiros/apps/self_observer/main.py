@@ -2,23 +2,34 @@
 
 import typer
 
-from kamojiros.config.settings import Settings
-from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.config.settings import load_settings
+from kamojiros.infrastructure.federated import report_repository_from_settings
+from kamojiros.infrastructure.git.committer import GitCommitter
 from kamojiros.services.self_observer_service import SelfObserverService
 
 
 def run() -> None:
     """self_observer アプリケーションのエントリーポイント."""
-    settings = Settings()
+    settings = load_settings()
     if settings.notes is None:
         msg = "settings.notes must be set"
         raise RuntimeError(msg)
 
-    repo = MarkdownReportRepository(notes_repo_root=settings.notes.repo_root)
+    notes = settings.notes
+    committer = (
+        GitCommitter.discover(notes.repo_root, push=notes.auto_push, message="Add self_observer daily report")
+        if notes.auto_commit
+        else None
+    )
+    repo = report_repository_from_settings(notes, committer)
     service = SelfObserverService(report_repo=repo)
 
     report = service.analyze_daily_activity()
     typer.echo(f"wrote: {report.meta.note_id}")
+    if committer is not None:
+        commit = committer.flush()
+        if commit is not None:
+            typer.echo(f"committed: {commit}")
 
 
 if __name__ == "__main__":
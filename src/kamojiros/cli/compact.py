@@ -0,0 +1,43 @@
+"""compact コマンド - 閉じた月のノートを月ごとのパックにまとめる."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import typer
+
+from kamojiros.cli.formatters import console
+from kamojiros.config.settings import load_settings
+from kamojiros.core.time import JST, now_jst
+from kamojiros.infrastructure.federated import root_repositories
+
+
+def compact(
+    before: str | None = typer.Option(
+        None, "--before", help="Pack months before this month (YYYY-MM, default: the current month)"
+    ),
+) -> None:
+    """Before の月より前の loose ファイルを docs/journal/YYYY/MM/journal.pack にまとめる."""
+    if before is None:
+        first_open = now_jst().date()
+    else:
+        try:
+            first_open = datetime.strptime(before, "%Y-%m").replace(tzinfo=JST).date()
+        except ValueError:
+            console.print(f"[red]Error: Invalid month format '{before}'. Use YYYY-MM[/red]")
+            raise typer.Exit(1) from None
+
+    settings = load_settings()
+    if settings.notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+    repos = root_repositories(settings.notes)
+
+    for repo in repos:
+        result = repo.pack_months(first_open)
+
+        where = f" {repo.notes_repo_root}" if len(repos) > 1 else ""
+        console.print(
+            f"[green]✓ Packed[/green]{where} {result.months} months: {result.packed} notes in packs, "
+            f"removed {result.removed} files in {result.elapsed_seconds:.3f}s"
+        )
@@ -6,8 +6,8 @@ import typer
 from rich.prompt import Prompt
 
 from kamojiros.cli.formatters import console
-from kamojiros.config.settings import Settings
-from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.config.settings import load_settings
+from kamojiros.infrastructure.federated import report_repository_from_settings
 from kamojiros.models import ReportAuthor, ReportType
 from kamojiros.services.report_service import ReportService
 
@@ -67,11 +67,11 @@ def create(  # noqa: C901
         raise typer.Exit(1) from None
 
     # レポート保存
-    settings = Settings()
+    settings = load_settings()
     if settings.notes is None:
         msg = "settings.notes must be set"
         raise RuntimeError(msg)
-    repo = MarkdownReportRepository(notes_repo_root=settings.notes.repo_root)
+    repo = report_repository_from_settings(settings.notes)
     service = ReportService(report_repo=repo)
 
     report = service.create_report(
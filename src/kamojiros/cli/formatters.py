@@ -2,71 +2,105 @@
 
 from __future__ import annotations
 
-import json
+from itertools import batched
 from typing import TYPE_CHECKING
 
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
 
-if TYPE_CHECKING:
-    from kamojiros.models import Report, ReportStats
-
-console = Console()
+from kamojiros.models import ReportAuthor
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import date
 
-def format_report_table(reports: list[Report], show_body: bool = False) -> None:
-    """レポートをテーブル形式で表示する."""
-    table = Table(title="Reports")
+    from kamojiros.core.fulltext import Snippet
+    from kamojiros.interfaces.reports import SearchHit
+    from kamojiros.models import Report, ReportStats, ReportType
 
-    table.add_column("ID", style="cyan", no_wrap=True)
-    table.add_column("Title", style="magenta")
-    table.add_column("Type", style="green")
-    table.add_column("Author", style="yellow")
-    table.add_column("Tags", style="blue")
-    table.add_column("Updated", style="white")
-
-    if show_body:
-        table.add_column("Body Preview", style="white", max_width=50)
-
-    for report in reports:
-        tags_str = ", ".join(report.meta.tags) if report.meta.tags else "-"
-        updated_str = report.meta.updated_at.strftime("%Y-%m-%d %H:%M")
-
-        row = [
-            report.meta.note_id,
-            report.meta.title,
-            report.meta.type.value,
-            report.meta.author.value,
-            tags_str,
-            updated_str,
-        ]
+console = Console()
 
-        if show_body:
-            body_preview = report.body_markdown[:100].replace("\n", " ")
-            row.append(body_preview)
+# --show-body で表示する本文の文字数
+PREVIEW_LENGTH = 100
 
-        table.add_row(*row)
+# list / search のテーブルを区切る件数. 全件を読み終える前から 1 ページずつ表示する
+TABLE_PAGE_SIZE = 50
 
-    console.print(table)
 
+def format_report_table(reports: Iterable[Report], show_body: bool = False) -> int:
+    """レポートを TABLE_PAGE_SIZE 件ごとのテーブルに区切り、読んだそばから表示する. 表示した件数を返す."""
+    count = 0
+    for page in batched(reports, TABLE_PAGE_SIZE, strict=False):
+        table = Table(title="Reports" if count == 0 else None)
 
-def format_report_json(reports: list[Report]) -> None:
-    """レポートをJSON形式で表示する."""
-    data = [
-        {
-            "note_id": report.meta.note_id,
-            "title": report.meta.title,
-            "type": report.meta.type.value,
-            "author": report.meta.author.value,
-            "tags": report.meta.tags,
-            "created_at": report.meta.created_at.isoformat(),
-            "updated_at": report.meta.updated_at.isoformat(),
-            "body_markdown": report.body_markdown,
-        }
-        for report in reports
-    ]
+        table.add_column("ID", style="cyan", no_wrap=True)
+        table.add_column("Title", style="magenta")
+        table.add_column("Type", style="green")
+        table.add_column("Author", style="yellow")
+        table.add_column("Tags", style="blue")
+        table.add_column("Updated", style="white")
 
-    console.print_json(json.dumps(data, ensure_ascii=False, indent=2))
+        if show_body:
+            table.add_column("Body Preview", style="white", max_width=50)
+
+        for report in page:
+            tags_str = ", ".join(report.meta.tags) if report.meta.tags else "-"
+            updated_str = report.meta.updated_at.strftime("%Y-%m-%d %H:%M")
+
+            row = [
+                report.meta.note_id,
+                report.meta.title,
+                report.meta.type.value,
+                report.meta.author.value,
+                tags_str,
+                updated_str,
+            ]
+
+            if show_body:
+                # 表示する先頭だけを読む
+                body_preview = report.body_preview(PREVIEW_LENGTH).replace("\n", " ")
+                row.append(body_preview)
+
+            table.add_row(*row)
+
+        console.print(table)
+        count += len(page)
+    return count
+
+
+def format_search_results(hits: Iterable[SearchHit]) -> int:
+    """検索結果を一致箇所を強調したテーブル形式で、TABLE_PAGE_SIZE 件ごとに区切って表示する. 表示した件数を返す."""
+    count = 0
+    for page in batched(hits, TABLE_PAGE_SIZE, strict=False):
+        table = Table(title="Reports" if count == 0 else None)
+
+        table.add_column("ID", style="cyan", no_wrap=True)
+        table.add_column("Title", style="magenta")
+        table.add_column("Type", style="green")
+        table.add_column("Tags", style="blue")
+        table.add_column("Updated", style="white")
+        table.add_column("Match", style="white", max_width=50)
+
+        for hit in page:
+            meta = hit.report.meta
+            tags_str = ", ".join(meta.tags) if meta.tags else "-"
+            updated_str = meta.updated_at.strftime("%Y-%m-%d %H:%M")
+            table.add_row(meta.note_id, meta.title, meta.type.value, tags_str, updated_str, _snippet_text(hit.snippet))
+
+        console.print(table)
+        count += len(page)
+    return count
+
+
+def _snippet_text(snippet: Snippet | None) -> Text:
+    """スニペットの一致箇所を強調した Text にする."""
+    if snippet is None:
+        return Text("-")
+    text = Text(snippet.text.replace("\n", " "))
+    for start, end in snippet.highlights:
+        text.stylize("bold reverse", start, end)
+    return text
 
 
 def format_stats(stats: ReportStats) -> None:
@@ -102,3 +136,29 @@ def format_stats(stats: ReportStats) -> None:
         for tag, count in stats.top_tags.items():
             tag_table.add_row(tag, str(count))
         console.print(tag_table)
+
+
+def format_timeline(timeline: list[tuple[date, int]]) -> None:
+    """期間の区切りごとの作成件数を表示する."""
+    console.print("\n[bold]Timeline:[/bold]")
+    table = Table()
+    table.add_column("From", style="white")
+    table.add_column("Count", style="cyan", justify="right")
+    for start, count in timeline:
+        table.add_row(start.isoformat(), str(count))
+    console.print(table)
+
+
+def format_crosstab(counts: dict[tuple[ReportType, ReportAuthor], int]) -> None:
+    """種別 x 作成者ごとの作成件数を表示する."""
+    console.print("\n[bold]Type x Author:[/bold]")
+    types = list(dict.fromkeys(report_type for report_type, _ in counts))
+    present = {author for _, author in counts}
+    authors = [author for author in ReportAuthor if author in present]
+    table = Table()
+    table.add_column("Type", style="green")
+    for author in authors:
+        table.add_column(author.value, style="cyan", justify="right")
+    for report_type in types:
+        table.add_row(report_type.value, *(str(counts.get((report_type, author), 0)) for author in authors))
+    console.print(table)
@@ -0,0 +1,74 @@
+"""import コマンド - Markdown のディレクトリや JSONL のダンプからノートを取り込む."""
+
+from __future__ import annotations
+
+import os
+import time
+from itertools import batched
+from pathlib import Path
+
+import typer
+
+from kamojiros.cli.formatters import console
+from kamojiros.config.settings import load_settings
+from kamojiros.infrastructure.federated import report_repository_from_settings
+from kamojiros.infrastructure.git.committer import GitCommitter
+from kamojiros.infrastructure.report_source import iter_report_source
+
+
+def import_reports(
+    source: str = typer.Argument(..., help="Directory of Markdown notes or a JSONL dump"),
+    jobs: int | None = typer.Option(None, "--jobs", "-j", min=1, help="Number of writer threads (default: CPUs)"),
+    batch_size: int = typer.Option(1000, "--batch-size", min=1, help="Notes written and indexed per transaction"),
+    commit: bool = typer.Option(False, "--commit", help="Commit imported notes to git, one commit per batch"),
+) -> None:
+    """ノートをまとめて取り込む. 同じ note_id のノートは上書きする."""
+    settings = load_settings()
+    if settings.notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+
+    source_path = Path(source)
+    if not source_path.exists():
+        console.print(f"[red]Error: {source} does not exist[/red]")
+        raise typer.Exit(1)
+
+    committer = None
+    if commit:
+        committer = GitCommitter.discover(
+            settings.notes.repo_root,
+            batch_size=batch_size,
+            push=settings.notes.auto_push,
+            message=f"Import notes from {source_path.name}",
+        )
+        if committer is None:
+            console.print(f"[red]Error: {settings.notes.repo_root} is not a git working tree[/red]")
+            raise typer.Exit(1)
+    repo = report_repository_from_settings(settings.notes, committer)
+    try:
+        source_reports = iter_report_source(source_path)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1) from None
+
+    started = time.perf_counter()
+    imported = skipped = 0
+    for batch in batched(source_reports, batch_size, strict=False):
+        reports = [report for report in batch if report is not None]
+        skipped += len(batch) - len(reports)
+        repo.save_many(reports, jobs=jobs or os.cpu_count() or 1)
+        imported += len(reports)
+        console.print(f"  {imported} imported, {skipped} skipped ({_rate(imported, started):.0f} notes/s)")
+    if committer is not None:
+        committer.flush()
+
+    console.print(
+        f"[green]✓ Imported[/green] {imported} notes from {source} in {time.perf_counter() - started:.3f}s "
+        f"({_rate(imported, started):.0f} notes/s), skipped {skipped}"
+    )
+
+
+def _rate(count: int, started: float) -> float:
+    """Count 件を started からの経過秒数で割る."""
+    elapsed = time.perf_counter() - started
+    return count / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,52 @@
+"""index コマンド - メタデータ索引を管理."""
+
+from __future__ import annotations
+
+import typer
+
+from kamojiros.cli.formatters import console
+from kamojiros.config.settings import load_settings
+from kamojiros.infrastructure.federated import root_repositories
+
+index_app = typer.Typer(no_args_is_help=True)
+
+
+@index_app.command(name="refresh", help="Re-index added, changed and removed notes")
+def refresh() -> None:
+    """変更のあったノートだけを索引に反映する."""
+    settings = load_settings()
+    if settings.notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+    repos = root_repositories(settings.notes)
+
+    for repo in repos:
+        result = repo.refresh_index()
+
+        strategy = "git diff" if result.used_git else "full scan"
+        where = f" {repo.notes_repo_root}" if len(repos) > 1 else ""
+        console.print(
+            f"[green]✓ Index refreshed[/green]{where} ({strategy}): scanned {result.scanned}, "
+            f"parsed {result.parsed}, deleted {result.deleted} in {result.elapsed_seconds:.3f}s"
+        )
+
+
+@index_app.command(name="rebuild", help="Rebuild the index from scratch using parallel workers")
+def rebuild(
+    jobs: int | None = typer.Option(None, "--jobs", "-j", min=1, help="Number of worker processes (default: CPUs)"),
+) -> None:
+    """索引を作り直す. 年月ディレクトリごとに複数のプロセスで読み込む."""
+    settings = load_settings()
+    if settings.notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+    repos = root_repositories(settings.notes)
+
+    for repo in repos:
+        result = repo.rebuild_index(jobs=jobs)
+
+        where = f" {repo.notes_repo_root}" if len(repos) > 1 else ""
+        console.print(
+            f"[green]✓ Index rebuilt[/green]{where}: scanned {result.scanned}, indexed {result.parsed} "
+            f"in {result.elapsed_seconds:.3f}s ({result.files_per_second:.0f} files/s)"
+        )
@@ -0,0 +1,70 @@
+"""コマンドのモジュールを、そのコマンドを実行するときに初めて読み込む Typer のグループ."""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, ClassVar
+
+import typer
+from typer.core import TyperCommand, TyperGroup
+
+if TYPE_CHECKING:
+    import click
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    """まだ読み込んでいないコマンド."""
+
+    target: str  # "モジュール:属性". 属性はコマンドの関数か、サブコマンドを持つ typer.Typer
+    help: str  # --help の一覧に出す説明
+
+
+class LazyTyperGroup(TyperGroup):
+    """lazy_commands のコマンドを、実行するときに初めて import する TyperGroup.
+
+    サブクラスで lazy_commands を定義し、typer.Typer(cls=...) に渡す。
+    --help の一覧には lazy_commands の説明を出すだけで、コマンドのモジュールは読み込まない。
+    """
+
+    lazy_commands: ClassVar[dict[str, LazyCommand]] = {}
+    _listing: bool = False  # --help の一覧を作っている間は True
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """登録済みのコマンドと、まだ読み込んでいないコマンドの名前を登録の順に返す."""
+        names = super().list_commands(ctx)
+        return [*names, *(name for name in self.lazy_commands if name not in names)]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """名前のコマンドを返す. まだ読み込んでいなければここで読み込む (--help の一覧を作るときは読み込まない)."""
+        command = super().get_command(ctx, cmd_name)
+        if command is not None:
+            return command
+        lazy = self.lazy_commands.get(cmd_name)
+        if lazy is None:
+            return None
+        if self._listing:
+            return TyperCommand(cmd_name, help=lazy.help)
+        return self._load(cmd_name, lazy)
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """--help を表示する. コマンドの一覧は lazy_commands の説明から作る."""
+        self._listing = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self._listing = False
+
+    def _load(self, name: str, lazy: LazyCommand) -> click.Command:
+        module_name, _, attr = lazy.target.partition(":")
+        target = getattr(importlib.import_module(module_name), attr)
+        if isinstance(target, typer.Typer):
+            command: click.Command = typer.main.get_group(target)
+            command.help = command.help or lazy.help
+        else:
+            single = typer.Typer(add_completion=False)
+            single.command(name=name, help=lazy.help)(target)
+            command = typer.main.get_command(single)
+        self.add_command(command, name)
+        return command
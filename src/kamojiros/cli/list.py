@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import typer
 
-from kamojiros.cli.formatters import console, format_report_json, format_report_table
-from kamojiros.config.settings import Settings
+from kamojiros.cli.formatters import PREVIEW_LENGTH, console
+from kamojiros.cli.output import OUTPUT_FORMATS, parse_cursor, write_reports
+from kamojiros.cli.service import report_service
+from kamojiros.config.settings import load_settings
 from kamojiros.core.time import JST
-from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
 from kamojiros.models import ReportAuthor, ReportType
-from kamojiros.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from kamojiros.cli.output import Written
+    from kamojiros.cli.service import CliReportService
 
 
 def list_reports(  # noqa: C901
@@ -19,9 +24,18 @@ def list_reports(  # noqa: C901
     since: str | None = typer.Option(None, "--since", help="Show reports since date (YYYY-MM-DD)"),
     report_type: str | None = typer.Option(None, "--type", help="Filter by type (tech/paper/life/meta)"),
     author: str | None = typer.Option(None, "--author", help="Filter by author"),
-    tags: str | None = typer.Option(None, "--tags", help="Filter by tags (comma-separated)"),
-    json_format: bool = typer.Option(False, "--json", help="Output as JSON"),
+    tags: str | None = typer.Option(
+        None, "--tags", help="Filter by tags (comma-separated, 'prefix/*' matches by prefix)"
+    ),
+    match: str = typer.Option("any", "--match", help="Require any or all of --tags (any/all)"),
+    exclude_tags: str | None = typer.Option(None, "--exclude-tags", help="Exclude reports with these tags"),
+    after: str | None = typer.Option(None, "--after", help="Continue after the cursor printed by a previous page"),
+    output_format: str = typer.Option(
+        "table", "--format", help="Output format (table/json/ndjson/tsv); records are written as they are read"
+    ),
+    json_format: bool = typer.Option(False, "--json", help="Output as JSON (same as --format json)"),
     show_body: bool = typer.Option(False, "--show-body", help="Show body preview in table"),
+    watch: bool = typer.Option(False, "--watch", help="Re-render whenever notes change (Ctrl-C to stop)"),
 ) -> None:
     """レポート一覧を表示する."""
     # since をパース
@@ -52,33 +66,69 @@ def list_reports(  # noqa: C901
             raise typer.Exit(1) from None
 
     # tags をパース
-    tag_list = None
-    if tags:
-        tag_list = [t.strip() for t in tags.split(",")]
+    tag_list = _split_tags(tags)
+    exclude_list = _split_tags(exclude_tags)
+    if match not in {"any", "all"}:
+        console.print(f"[red]Error: Invalid match '{match}'. Use: any or all[/red]")
+        raise typer.Exit(1)
+
+    # 出力形式をパース
+    if json_format:
+        output_format = "json"
+    if output_format not in OUTPUT_FORMATS:
+        console.print(f"[red]Error: Invalid format '{output_format}'. Use: {', '.join(OUTPUT_FORMATS)}[/red]")
+        raise typer.Exit(1)
+
+    cursor = parse_cursor(after)
 
     # レポート取得
-    settings = Settings()
+    settings = load_settings()
     if settings.notes is None:
         msg = "settings.notes must be set"
         raise RuntimeError(msg)
-    repo = MarkdownReportRepository(notes_repo_root=settings.notes.repo_root)
-    service = ReportService(report_repo=repo)
-
-    reports = service.list_reports(
-        limit=limit,
-        since=since_dt,
-        report_type=rtype,
-        author=rauthor,
-        tags=tag_list,
-    )
-
-    if not reports:
+
+    def render(service: CliReportService) -> None:
+        # すべてを読み終える前から、読んだそばから書き出す
+        reports = service.stream_reports(
+            limit=limit,
+            since=since_dt,
+            report_type=rtype,
+            author=rauthor,
+            tags=tag_list,
+            tag_match="all" if match == "all" else "any",
+            exclude_tags=exclude_list,
+            after=cursor,
+        )
+        written = write_reports(reports, output_format, show_body=show_body)
+
+        # 件数の表示はテーブルのときだけ. 他の形式の出力は、そのまま他のコマンドに渡せるようにする
+        if output_format == "table":
+            _print_summary(written, limit)
+
+    if watch:
+        # 索引の監視 (SQLite 索引と Markdown の読み書き) は --watch のときだけ読み込む
+        from kamojiros.cli.watch import watch_and_render  # noqa: PLC0415
+
+        watch_and_render(settings.notes, render)
+    else:
+        # 表示に使う本文だけをデーモンから受け取る
+        with_body = output_format in {"json", "ndjson"}
+        render(report_service(settings.notes, with_body=with_body, preview=PREVIEW_LENGTH if show_body else 0))
+
+
+def _print_summary(written: Written, limit: int) -> None:
+    """テーブルの後に件数を表示する. 続きがありうる場合は、次のページを読むカーソルも表示する."""
+    if not written.count:
         console.print("[yellow]No reports found[/yellow]")
         return
+    console.print(f"\n[dim]Showing {written.count} report(s)[/dim]")
+    if written.count == limit and written.cursor is not None:
+        # カーソルをそのままコピーできるよう、端末の幅で折り返さない
+        console.print(f"[dim]Next page: --after {written.cursor.encode()}[/dim]", soft_wrap=True)
 
-    # 出力
-    if json_format:
-        format_report_json(reports)
-    else:
-        format_report_table(reports, show_body=show_body)
-        console.print(f"\n[dim]Showing {len(reports)} report(s)[/dim]")
+
+def _split_tags(value: str | None) -> list[str] | None:
+    """カンマ区切りのタグを分割する."""
+    if not value:
+        return None
+    return [t.strip() for t in value.split(",")]
@@ -0,0 +1,214 @@
+"""list / search の出力 - レコードを読んだそばから標準出力に書き出す.
+
+json / ndjson / tsv は rich を通さずに標準出力へ直接書く。table は rich のテーブルを
+TABLE_PAGE_SIZE 件ごとに区切って表示する (rich は table のときだけ読み込む)。
+json / ndjson / tsv の各レコードには、そのレコードの次から続けるカーソル (--after に渡すトークン) を含める。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+import typer
+
+from kamojiros.interfaces.reports import ReportCursor
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from kamojiros.interfaces.reports import SearchHit
+    from kamojiros.models import Report, ReportMeta
+
+# --format で選べる出力の形式 (--json は json と同じ)
+type OutputFormat = Literal["table", "json", "ndjson", "tsv"]
+OUTPUT_FORMATS: tuple[OutputFormat, ...] = ("table", "json", "ndjson", "tsv")
+
+# 最初のレコードを書いたあと、この件数ごとに標準出力を flush する (パイプの先に早く届けるため)
+_FLUSH_EVERY = 256
+
+# TSV のフィールドでエスケープする文字
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def parse_cursor(token: str | None) -> ReportCursor | None:
+    """--after のトークンをカーソルにする. 不正なトークンならエラーを表示して終了する."""
+    if token is None:
+        return None
+    try:
+        return ReportCursor.decode(token)
+    except ValueError:
+        from kamojiros.cli.formatters import console  # noqa: PLC0415
+
+        console.print(f"[red]Error: Invalid cursor '{token}'. Pass a cursor printed by a previous page[/red]")
+        raise typer.Exit(1) from None
+
+
+@dataclass
+class Written:
+    """書き出したレコードの件数と、最後に書き出したレコード."""
+
+    count: int = 0
+    last: ReportMeta | None = None
+
+    @property
+    def cursor(self) -> ReportCursor | None:
+        """最後に書き出したレコードの次から続けるカーソル. 1 件も書き出していなければ None."""
+        return ReportCursor.of(self.last) if self.last is not None else None
+
+
+def write_reports(reports: Iterable[Report], output_format: OutputFormat, *, show_body: bool = False) -> Written:
+    """レポートを output_format で書き出す.
+
+    json / ndjson は本文を含め、tsv は note_id, title, type, author, tags, created_at, updated_at, cursor の列にする。
+    show_body は table で本文の先頭を表示するか。
+    """
+    written = Written()
+    tracked = _track(reports, written, lambda report: report.meta)
+    match output_format:
+        case "table":
+            # rich は table のときだけ読み込む
+            from kamojiros.cli.formatters import format_report_table  # noqa: PLC0415
+
+            format_report_table(tracked, show_body=show_body)
+        case "json":
+            _write_json_array(_report_record(report) for report in tracked)
+        case "ndjson":
+            _write_records(tracked, lambda report: _ndjson_line(_report_record(report)))
+        case "tsv":
+            _write_records(tracked, _report_tsv_line)
+    return written
+
+
+def write_hits(hits: Iterable[SearchHit], output_format: OutputFormat, *, with_cursor: bool = False) -> Written:
+    """検索結果を output_format で書き出す.
+
+    json / ndjson は本文の代わりに score, snippet, highlights を含め、
+    tsv は note_id, title, type, tags, updated_at, score, snippet (with_cursor なら cursor も) の列にする。
+    with_cursor は各レコードにカーソルを含めるか (関連の強い順の結果からは続きを読めないので、新しい順のときだけ)。
+    """
+    written = Written()
+    tracked = _track(hits, written, lambda hit: hit.report.meta)
+    match output_format:
+        case "table":
+            from kamojiros.cli.formatters import format_search_results  # noqa: PLC0415
+
+            format_search_results(tracked)
+        case "json":
+            _write_json_array(_hit_record(hit, with_cursor=with_cursor) for hit in tracked)
+        case "ndjson":
+            _write_records(tracked, lambda hit: _ndjson_line(_hit_record(hit, with_cursor=with_cursor)))
+        case "tsv":
+            _write_records(tracked, lambda hit: _hit_tsv_line(hit, with_cursor=with_cursor))
+    return written
+
+
+def _track[T](items: Iterable[T], written: Written, meta: Callable[[T], ReportMeta]) -> Iterator[T]:
+    """Items を 1 件ずつ返しながら、件数と最後のレコードを written に記録する."""
+    for item in items:
+        written.count += 1
+        written.last = meta(item)
+        yield item
+
+
+def _report_record(report: Report, *, with_body: bool = True, with_cursor: bool = True) -> dict[str, Any]:
+    meta = report.meta
+    record: dict[str, Any] = {
+        "note_id": meta.note_id,
+        "title": meta.title,
+        "type": meta.type.value,
+        "author": meta.author.value,
+        "tags": meta.tags,
+        "created_at": meta.created_at.isoformat(),
+        "updated_at": meta.updated_at.isoformat(),
+    }
+    if with_body:
+        record["body_markdown"] = report.body_markdown
+    if with_cursor:
+        record["cursor"] = ReportCursor.of(meta).encode()
+    return record
+
+
+def _hit_record(hit: SearchHit, *, with_cursor: bool) -> dict[str, Any]:
+    record = _report_record(hit.report, with_body=False, with_cursor=with_cursor)
+    record["score"] = hit.score
+    record["snippet"] = hit.snippet.text if hit.snippet is not None else None
+    record["highlights"] = list(hit.snippet.highlights) if hit.snippet is not None else []
+    return record
+
+
+def _ndjson_line(record: dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _report_tsv_line(report: Report) -> str:
+    meta = report.meta
+    return _tsv_line(
+        meta.note_id,
+        meta.title,
+        meta.type.value,
+        meta.author.value,
+        ",".join(meta.tags),
+        meta.created_at.isoformat(),
+        meta.updated_at.isoformat(),
+        ReportCursor.of(meta).encode(),
+    )
+
+
+def _hit_tsv_line(hit: SearchHit, *, with_cursor: bool) -> str:
+    meta = hit.report.meta
+    fields = [
+        meta.note_id,
+        meta.title,
+        meta.type.value,
+        ",".join(meta.tags),
+        meta.updated_at.isoformat(),
+        f"{hit.score:g}",
+        hit.snippet.text if hit.snippet is not None else "",
+    ]
+    if with_cursor:
+        fields.append(ReportCursor.of(meta).encode())
+    return _tsv_line(*fields)
+
+
+def _tsv_line(*fields: str) -> str:
+    """フィールドをタブで区切った 1 行にする. タブ・改行・バックスラッシュはエスケープする."""
+    return "\t".join(field.translate(_TSV_ESCAPES) for field in fields) + "\n"
+
+
+def _write_json_array(records: Iterable[dict[str, Any]]) -> None:
+    """レコードを 1 件ずつ、全体で 1 つの JSON の配列 (インデント 2) になるように書き出す."""
+
+    def element(record: dict[str, Any]) -> str:
+        return "\n  " + json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+    _write_records(records, element, start="[", separator=",", end="\n]\n")
+
+
+def _write_records[T](
+    items: Iterable[T], encode: Callable[[T], str], *, start: str = "", separator: str = "", end: str = ""
+) -> None:
+    """Items を encode した文字列を、読んだそばから標準出力に書き出す.
+
+    最初の 1 件は書いてすぐに、以降は _FLUSH_EVERY 件ごとに flush する。
+    読み手 (head など) が先に終わった場合は、残りを捨てて終了する。
+    """
+    out = sys.stdout
+    count = 0
+    try:
+        out.write(start)
+        for item in items:
+            out.write(separator + encode(item) if count else encode(item))
+            count += 1
+            if count == 1 or count % _FLUSH_EVERY == 0:
+                out.flush()
+        out.write(end)
+        out.flush()
+    except BrokenPipeError:
+        # 終了時の flush で再び BrokenPipeError にならないよう、標準出力を /dev/null に向ける
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, out.fileno())
+        raise typer.Exit(1) from None
@@ -2,45 +2,105 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
 import typer
 
-from kamojiros.cli.formatters import console, format_report_table
-from kamojiros.config.settings import Settings
-from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
-from kamojiros.services.report_service import ReportService
+from kamojiros.cli.formatters import console
+from kamojiros.cli.output import OUTPUT_FORMATS, parse_cursor, write_hits
+from kamojiros.cli.service import report_service
+from kamojiros.config.settings import load_settings
+from kamojiros.core.time import JST
 
 
-def search(
+def search(  # noqa: PLR0917
     keyword: str = typer.Argument(..., help="Search keyword"),
     title_only: bool = typer.Option(False, "--title-only", help="Search only in titles"),
     body_only: bool = typer.Option(False, "--body-only", help="Search only in body"),
     tags_only: bool = typer.Option(False, "--tags-only", help="Search only in tags"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Number of results to show"),
+    since: str | None = typer.Option(None, "--since", help="Search reports updated since date (YYYY-MM-DD)"),
+    until: str | None = typer.Option(None, "--until", help="Search reports updated until date (YYYY-MM-DD)"),
+    all_time: bool = typer.Option(False, "--all", help="Search all reports (default: the past year)"),
+    sort: str | None = typer.Option(
+        None,
+        "--sort",
+        help="Order results by relevance or recent (updated_at) (default: relevance, recent with --after)",
+    ),
+    after: str | None = typer.Option(
+        None, "--after", help="Continue after the cursor printed by a previous page (recent order only)"
+    ),
+    output_format: str = typer.Option("table", "--format", help="Output format (table/json/ndjson/tsv)"),
 ) -> None:
     """キーワードでレポートを検索する."""
+    if output_format not in OUTPUT_FORMATS:
+        console.print(f"[red]Error: Invalid format '{output_format}'. Use: {', '.join(OUTPUT_FORMATS)}[/red]")
+        raise typer.Exit(1)
+    if sort not in {None, "relevance", "recent"}:
+        console.print(f"[red]Error: Invalid sort '{sort}'. Use: relevance or recent[/red]")
+        raise typer.Exit(1)
+    # 続きを読めるのは新しい順に並べた場合だけ
+    if after is not None and sort == "relevance":
+        console.print(
+            "[red]Error: --after pages results in recent order and cannot be combined with --sort relevance[/red]"
+        )
+        raise typer.Exit(1)
+    cursor = parse_cursor(after)
+    recent = sort == "recent" or cursor is not None
+    if all_time and since is not None:
+        console.print("[red]Error: --all cannot be combined with --since[/red]")
+        raise typer.Exit(1)
+
+    # since / until をパース (until はその日の終わりまでを含む)
+    since_dt = _parse_day(since) if since else None
+    until_dt = _parse_day(until) + timedelta(days=1, microseconds=-1) if until else None
+
     # 検索範囲の決定
     search_in_title = not body_only and not tags_only
     search_in_body = not title_only and not tags_only
     search_in_tags = not title_only and not body_only
 
     # レポート検索
-    settings = Settings()
+    settings = load_settings()
     if settings.notes is None:
         msg = "settings.notes must be set"
         raise RuntimeError(msg)
-    repo = MarkdownReportRepository(notes_repo_root=settings.notes.repo_root)
-    service = ReportService(report_repo=repo)
+    service = report_service(settings.notes)
 
-    reports = service.search_reports(
+    hits = service.search_reports(
         keyword=keyword,
         search_in_title=search_in_title,
         search_in_body=search_in_body,
         search_in_tags=search_in_tags,
+        since=since_dt,
+        until=until_dt,
+        all_time=all_time,
+        limit=limit,
+        order="recent" if recent else "relevance",
+        after=cursor,
     )
 
-    if not reports:
+    if output_format != "table":
+        # 見出しや件数を付けず、そのまま他のコマンドに渡せるようにする
+        write_hits(hits, output_format, with_cursor=recent)
+        return
+
+    if not hits:
         console.print(f"[yellow]No reports found for keyword: '{keyword}'[/yellow]")
         return
 
     console.print(f"[bold]Search Results for '{keyword}'[/bold]\n")
-    format_report_table(reports, show_body=True)
-    console.print(f"\n[dim]Found {len(reports)} report(s)[/dim]")
+    written = write_hits(hits, output_format)
+    console.print(f"\n[dim]Found {len(hits)} report(s)[/dim]")
+    if recent and written.count == limit and written.cursor is not None:
+        # カーソルをそのままコピーできるよう、端末の幅で折り返さない
+        console.print(f"[dim]Next page: --after {written.cursor.encode()}[/dim]", soft_wrap=True)
+
+
+def _parse_day(value: str) -> datetime:
+    """YYYY-MM-DD を日本時間のその日の 0 時にする. 不正な形式ならエラーを表示して終了する."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=JST)
+    except ValueError:
+        console.print(f"[red]Error: Invalid date format '{value}'. Use YYYY-MM-DD[/red]")
+        raise typer.Exit(1) from None
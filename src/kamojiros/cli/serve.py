@@ -0,0 +1,31 @@
+"""serve コマンド - 索引を温めたまま常駐し、list / search / stats に答える."""
+
+from __future__ import annotations
+
+import typer
+
+from kamojiros.apps.index_server.main import DaemonAlreadyRunningError, IndexServer
+from kamojiros.cli.formatters import console
+from kamojiros.config.settings import load_settings
+
+
+def serve() -> None:
+    """索引を開いたまま Unix ドメインソケットで要求を待つ. Ctrl-C で止める.
+
+    ソケットの場所は設定 (KAMOJIROS_NOTES__DAEMON_SOCKET) で変える。CLI も同じ設定でサーバーを探す。
+    """
+    notes = load_settings().notes
+    if notes is None:
+        msg = "settings.notes must be set"
+        raise RuntimeError(msg)
+
+    server = IndexServer(notes)
+
+    def ready() -> None:
+        console.print(f"[green]✓ Serving[/green] {notes.repo_root} on {server.path} (Ctrl-C to stop)")
+
+    try:
+        server.run(on_ready=ready)
+    except DaemonAlreadyRunningError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1) from None
@@ -0,0 +1,34 @@
+"""CLI のコマンドが使う ReportService を組み立てるモジュール."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from kamojiros.infrastructure.daemon import DaemonClient, DaemonReportService, settings_fingerprint, socket_path
+from kamojiros.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from kamojiros.config.settings import NotesSettings
+
+# CLI のコマンドが読み出しに使うサービス
+type CliReportService = ReportService | DaemonReportService
+
+
+def report_service(notes: NotesSettings, *, with_body: bool = False, preview: int = 0) -> CliReportService:
+    """Kamojiros serve のソケットがあればそちらに問い合わせ、無ければ同じプロセスで実行する ReportService を返す.
+
+    with_body / preview はデーモンに問い合わせる場合に list_reports の応答に含める本文の量。
+    デーモンに繋がらない・設定が違う場合は、その場で同じプロセスの ReportService に切り替える。
+    """
+
+    def local() -> ReportService:
+        # SQLite 索引と Markdown の読み書き (sqlalchemy など) は、デーモンに問い合わせるなら読み込まない
+        from kamojiros.infrastructure.federated import report_repository_from_settings  # noqa: PLC0415
+
+        return ReportService(report_repo=report_repository_from_settings(notes))
+
+    path = socket_path(notes)
+    if not notes.use_daemon or not path.exists():
+        return local()
+    client = DaemonClient(path, settings_fingerprint(notes))
+    return DaemonReportService(client, local, with_body=with_body, preview=preview)
@@ -3,18 +3,25 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import typer
 
-from kamojiros.cli.formatters import console, format_stats
-from kamojiros.config.settings import Settings
+from kamojiros.cli.formatters import console, format_crosstab, format_stats, format_timeline
+from kamojiros.cli.service import report_service
+from kamojiros.config.settings import load_settings
 from kamojiros.core.time import JST
-from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
-from kamojiros.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from kamojiros.cli.service import CliReportService
+    from kamojiros.core.catalog import GroupBy
 
 
 def stats(
     since: str | None = typer.Option(None, "--since", help="Stats since date (YYYY-MM-DD)"),
+    group_by: str | None = typer.Option(None, "--group-by", help="Count reports per day, week or month"),
+    crosstab: bool = typer.Option(False, "--crosstab", help="Show type x author counts"),
+    watch: bool = typer.Option(False, "--watch", help="Re-render whenever notes change (Ctrl-C to stop)"),
 ) -> None:
     """統計情報を表示する."""
     # since をパース
@@ -26,15 +33,37 @@ def stats(
             console.print(f"[red]Error: Invalid date format '{since}'. Use YYYY-MM-DD[/red]")
             raise typer.Exit(1) from None
 
+    # group_by をパース
+    group: GroupBy | None = None
+    match group_by:
+        case "day" | "week" | "month":
+            group = group_by
+        case None:
+            pass
+        case _:
+            console.print(f"[red]Error: Invalid group-by '{group_by}'. Use: day, week, or month[/red]")
+            raise typer.Exit(1)
+
     # 統計取得
-    settings = Settings()
+    settings = load_settings()
     if settings.notes is None:
         msg = "settings.notes must be set"
         raise RuntimeError(msg)
-    repo = MarkdownReportRepository(notes_repo_root=settings.notes.repo_root)
-    service = ReportService(report_repo=repo)
 
-    statistics = service.get_statistics(since=since_dt)
+    def render(service: CliReportService) -> None:
+        statistics = service.get_statistics(since=since_dt)
+
+        # 出力
+        format_stats(statistics)
+        if group is not None:
+            format_timeline(service.get_timeline(group, since=since_dt))
+        if crosstab:
+            format_crosstab(service.get_crosstab(since=since_dt))
+
+    if watch:
+        # 索引の監視 (SQLite 索引と Markdown の読み書き) は --watch のときだけ読み込む
+        from kamojiros.cli.watch import watch_and_render  # noqa: PLC0415
 
-    # 出力
-    format_stats(statistics)
+        watch_and_render(settings.notes, render)
+    else:
+        render(report_service(settings.notes))
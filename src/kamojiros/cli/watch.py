@@ -0,0 +1,47 @@
+"""--watch の表示 - ノートが変わるたびに表示し直す."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from kamojiros.cli.formatters import console
+from kamojiros.infrastructure.federated import combine_repositories, root_repositories
+from kamojiros.infrastructure.git.watcher import IndexUpdater
+from kamojiros.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from kamojiros.cli.service import CliReportService
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.infrastructure.git.markdown_report_writer import IndexRefreshResult, MarkdownReportRepository
+
+
+def watch_and_render(notes: NotesSettings, render: Callable[[CliReportService], None]) -> None:
+    """Docs/journal の変更を監視して索引に反映し、索引が変わるたびに render で表示し直す. Ctrl-C で終わる.
+
+    監視している間はデーモンを使わず、このプロセスで最新に保っている索引から読み出す。
+    """
+    repos = root_repositories(notes)
+    service = ReportService(report_repo=combine_repositories(repos))
+    changed = threading.Event()
+
+    def on_change(_: MarkdownReportRepository, result: IndexRefreshResult) -> None:
+        # 索引の内容が変わらなかった変更 (無関係なファイルの書き換えなど) では表示し直さない
+        if result.parsed or result.deleted:
+            changed.set()
+
+    updater = IndexUpdater.from_settings(notes, repos, on_change)
+    updater.start()
+    try:
+        while True:
+            console.clear()
+            render(service)
+            console.print("\n[dim]Watching for changes (Ctrl-C to stop)[/dim]")
+            changed.wait()
+            changed.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        updater.stop()
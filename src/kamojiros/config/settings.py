@@ -1,5 +1,6 @@
 """Kamojiros 固有の設定."""
 
+from functools import cache
 from pathlib import Path  # noqa: TC003
 from typing import Any
 
@@ -9,11 +10,33 @@ from pydantic_settings import SettingsConfigDict
 
 from kamojiros.config.base_settings import BaseSettings
 
+# Notes リポジトリの中で、索引やソケットなどを置くディレクトリ (Git 管理外)
+STATE_DIR = ".kamojiros"
+
 
 class NotesSettings(BaseModel):
-    """Notesリポジトリの設定."""
+    """Notesリポジトリの設定.
+
+    repo_root が書き込み先 (primary) で、extra_roots のリポジトリも合わせて読み出す。
+    """
 
     repo_root: Path
+    index_path: Path | None = None  # None の場合は repo_root/.kamojiros/index.db
+    extra_roots: list[Path] = Field(default_factory=list)  # 索引はそれぞれの root/.kamojiros/index.db
+    auto_commit: bool = False  # エージェントが書いたノートを repo_root の git にコミットする
+    auto_push: bool = False  # auto_commit のコミットのあとで git push する
+    parse_cache_entries: int = 10_000  # root ごとに読み込んだノートを保持する件数 (0 で保持しない)
+    parse_cache_bytes: int = 64 * 1024 * 1024  # root ごとに読み込んだノートを保持するおおよそのメモリ
+    use_daemon: bool = True  # kamojiros serve が動いていれば list / search / stats をそちらに問い合わせる
+    daemon_socket: Path | None = None  # None の場合は repo_root/.kamojiros/daemon.sock
+    daemon_refresh_interval: float = 1.0  # serve が git の差分で索引を更新する最短の間隔 (秒)
+    watch_debounce: float = 0.2  # 続けて起きたファイルの変更をまとめて索引に反映するまで待つ時間 (秒)
+    watch_poll_interval: float = 1.0  # watchfiles が無い場合に docs/journal のファイルの状態を見比べる間隔 (秒)
+
+    @property
+    def roots(self) -> list[Path]:
+        """読み出し対象のすべての root (先頭が repo_root)."""
+        return [self.repo_root, *self.extra_roots]
 
 
 class SelfObserverSettings(BaseModel):
@@ -61,3 +84,12 @@ class Settings(BaseSettings):
         実体は BaseSettings.__init__ に任せる。
         """
         super().__init__(**values)
+
+
+@cache
+def load_settings() -> Settings:
+    """環境変数から Settings を作る. 同じプロセスでは一度だけ作り、以降は同じものを返す.
+
+    環境変数を変えて作り直す場合 (テストなど) は load_settings.cache_clear() を呼ぶ。
+    """
+    return Settings()
@@ -0,0 +1,376 @@
+"""Report のメタデータを列ごとに持つ集計用のカタログ.
+
+Report (pydantic モデル) のリストの代わりに、メタデータを列ごとの配列で持つ。
+
+- 作成日時・更新日時: エポックからのマイクロ秒 (int64)。作成日時の昇順に並べる
+- 種別・作成者: 列挙値の番号 (uint8)
+- タグ: タグ ID を並べた配列と、各 Report のタグの開始位置を並べたオフセット配列 (CSR 形式)
+- タイトル・note_id: UTF-8 のバイト列とオフセット配列
+
+期間の絞り込みは作成日時の二分探索で行い、件数は Counter で数える。
+カタログは 1 つのスナップショットファイルに書き出せ、読み込みは mmap するだけなので件数によらず速い
+(文字列は参照されたときにデコードする)。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import secrets
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import chain, pairwise
+from operator import itemgetter
+from typing import TYPE_CHECKING, Literal, overload
+
+from kamojiros.core.time import to_epoch_us
+from kamojiros.models import ReportAuthor, ReportStats, ReportType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+    from kamojiros.models import ReportMeta
+
+logger = logging.getLogger(__name__)
+
+type GroupBy = Literal["day", "week", "month"]
+# カタログの 1 行. 作成日時・更新日時 (エポックからのマイクロ秒), 種別, 作成者, タグ, タイトル, note_id の順
+type CatalogRow = tuple[int, int, str, str, Sequence[str], str, str]
+
+_TYPES = tuple(ReportType)
+_AUTHORS = tuple(ReportAuthor)
+_TYPE_CODES = {t.value: i for i, t in enumerate(_TYPES)}
+_AUTHOR_CODES = {a.value: i for i, a in enumerate(_AUTHORS)}
+
+# スナップショットの形式: マジック, ヘッダ長 (uint64), ヘッダ (JSON), 8 バイト境界に揃えた各列
+_MAGIC = b"KJCATv1\n"
+_HEADER_LENGTH = struct.Struct("<Q")
+_ALIGNMENT = 8
+# 列名と array の型コード
+type _Typecode = Literal["q", "B", "I"]
+_COLUMNS: tuple[tuple[str, _Typecode], ...] = (
+    ("created_us", "q"),
+    ("updated_us", "q"),
+    ("type_codes", "B"),
+    ("author_codes", "B"),
+    ("tag_offsets", "q"),
+    ("tag_ids", "I"),
+    ("tag_name_offsets", "q"),
+    ("tag_name_data", "B"),
+    ("title_offsets", "q"),
+    ("title_data", "B"),
+    ("note_id_offsets", "q"),
+    ("note_id_data", "B"),
+)
+
+
+class StringColumn:
+    """UTF-8 のバイト列とオフセット配列で持つ文字列の列. 要素は参照されたときにデコードする."""
+
+    def __init__(self, offsets: Sequence[int], data: bytes | memoryview) -> None:
+        """初期化. i 番目の文字列は data[offsets[i]:offsets[i + 1]]."""
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> StringColumn:
+        """文字列の並びから作る."""
+        offsets = array("q", [0])
+        data = bytearray()
+        for s in strings:
+            data += s.encode("utf-8")
+            offsets.append(len(data))
+        return cls(offsets, bytes(data))
+
+    def __len__(self) -> int:
+        """要素数."""
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        """指定した位置の文字列 (スライスならそのリスト)."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            msg = "StringColumn index out of range"
+            raise IndexError(msg)
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        """先頭から順に返す."""
+        return (self[i] for i in range(len(self)))
+
+
+@dataclass(frozen=True)
+class ReportCatalog:
+    """Report のメタデータを列ごとに持つカタログ. 行は作成日時の昇順に並ぶ.
+
+    配列の列は array か、スナップショットを mmap したメモリの memoryview。
+    generation はカタログを作った時点の索引の世代で、スナップショットが古いかどうかの判定に使う。
+    """
+
+    created_us: Sequence[int]
+    updated_us: Sequence[int]
+    type_codes: Sequence[int]  # ReportType の定義順の番号
+    author_codes: Sequence[int]  # ReportAuthor の定義順の番号
+    tag_offsets: Sequence[int]  # i 番目の Report のタグは tag_ids[tag_offsets[i]:tag_offsets[i + 1]]
+    tag_ids: Sequence[int]  # tag_names の番号
+    tag_names: StringColumn
+    titles: StringColumn
+    note_ids: StringColumn
+    generation: str = ""
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[CatalogRow], generation: str = "") -> ReportCatalog:
+        """行の並びから作る. 行は作成日時の順に並べ直す."""
+        created_us = array("q")
+        updated_us = array("q")
+        type_codes = array("B")
+        author_codes = array("B")
+        tag_offsets = array("q", [0])
+        tag_ids = array("I")
+        tag_codes: dict[str, int] = {}
+        titles: list[str] = []
+        note_ids: list[str] = []
+
+        for created, updated, report_type, author, tags, title, note_id in sorted(rows, key=itemgetter(0)):
+            created_us.append(created)
+            updated_us.append(updated)
+            type_codes.append(_TYPE_CODES[report_type])
+            author_codes.append(_AUTHOR_CODES[author])
+            tag_ids.extend(tag_codes.setdefault(tag, len(tag_codes)) for tag in dict.fromkeys(tags))
+            tag_offsets.append(len(tag_ids))
+            titles.append(title)
+            note_ids.append(note_id)
+
+        return cls(
+            created_us=created_us,
+            updated_us=updated_us,
+            type_codes=type_codes,
+            author_codes=author_codes,
+            tag_offsets=tag_offsets,
+            tag_ids=tag_ids,
+            tag_names=StringColumn.from_strings(tag_codes),
+            titles=StringColumn.from_strings(titles),
+            note_ids=StringColumn.from_strings(note_ids),
+            generation=generation,
+        )
+
+    @classmethod
+    def from_metas(cls, metas: Iterable[ReportMeta]) -> ReportCatalog:
+        """メタデータの並びから作る."""
+        return cls.from_rows(
+            (
+                to_epoch_us(m.created_at),
+                to_epoch_us(m.updated_at),
+                m.type.value,
+                m.author.value,
+                m.tags,
+                m.title,
+                m.note_id,
+            )
+            for m in metas
+        )
+
+    @classmethod
+    def concat(cls, catalogs: Iterable[ReportCatalog]) -> ReportCatalog:
+        """複数のカタログの行をまとめた 1 つのカタログを作る."""
+        return cls.from_rows(chain.from_iterable(catalog.rows() for catalog in catalogs))
+
+    def __len__(self) -> int:
+        """Report の件数."""
+        return len(self.created_us)
+
+    def rows(self) -> Iterator[CatalogRow]:
+        """行を作成日時の順に返す."""
+        for i in range(len(self)):
+            tag_ids = self.tag_ids[self.tag_offsets[i] : self.tag_offsets[i + 1]]
+            yield (
+                self.created_us[i],
+                self.updated_us[i],
+                _TYPES[self.type_codes[i]].value,
+                _AUTHORS[self.author_codes[i]].value,
+                [self.tag_names[tag_id] for tag_id in tag_ids],
+                self.titles[i],
+                self.note_ids[i],
+            )
+
+    def span(self, since: datetime, until: datetime) -> range:
+        """作成日時が since から until まで (両端を含む) の行の範囲."""
+        first = bisect_left(self.created_us, to_epoch_us(since))
+        last = bisect_right(self.created_us, to_epoch_us(until), lo=first)
+        return range(first, last)
+
+    def tag_counts(self, since: datetime, until: datetime) -> Counter[str]:
+        """期間内に作成された Report のタグごとの件数."""
+        rows = self.span(since, until)
+        tag_ids = self.tag_ids[self.tag_offsets[rows.start] : self.tag_offsets[rows.stop]]
+        return Counter({self.tag_names[tag_id]: count for tag_id, count in Counter(tag_ids).items()})
+
+    def crosstab(self, since: datetime, until: datetime) -> dict[tuple[ReportType, ReportAuthor], int]:
+        """期間内に作成された Report の種別 x 作成者ごとの件数."""
+        rows = self.span(since, until)
+        pairs = Counter(
+            zip(self.type_codes[rows.start : rows.stop], self.author_codes[rows.start : rows.stop], strict=True)
+        )
+        return {(_TYPES[t], _AUTHORS[a]): count for (t, a), count in sorted(pairs.items())}
+
+    def timeline(self, since: datetime, until: datetime, group_by: GroupBy) -> list[tuple[date, int]]:
+        """期間内に作成された Report の件数を日・週 (月曜始まり)・月ごとに数える.
+
+        各区切りの開始日と件数を返す。件数 0 の区切りも含む。
+        区切りの境界は since のタイムゾーンの 0 時で、各境界の位置を二分探索で求めるので、
+        費用は区切りの数に比例し、Report の件数にはよらない。
+        """
+        if since > until:
+            return []
+        starts = list(_bucket_starts(since.date(), until.date(), group_by))
+        boundaries = [since] + [datetime.combine(day, datetime.min.time(), since.tzinfo) for day in starts[1:]]
+        positions = [bisect_left(self.created_us, to_epoch_us(b)) for b in boundaries]
+        positions.append(bisect_right(self.created_us, to_epoch_us(until)))
+        return [(start, last - first) for start, (first, last) in zip(starts, pairwise(positions), strict=True)]
+
+    def stats(self, since: datetime, until: datetime) -> ReportStats:
+        """期間内に作成された Report の統計."""
+        rows = self.span(since, until)
+        by_type = Counter(self.type_codes[rows.start : rows.stop])
+        by_author = Counter(self.author_codes[rows.start : rows.stop])
+        return ReportStats.from_counts(
+            total_count=len(rows),
+            by_type={_TYPES[code].value: count for code, count in by_type.items()},
+            by_author={_AUTHORS[code].value: count for code, count in by_author.items()},
+            tag_counts=self.tag_counts(since, until),
+            period_start=since,
+            period_end=until,
+        )
+
+    def save(self, path: Path) -> None:
+        """スナップショットファイルに書き出す.
+
+        一時ファイルに書いてから置き換えるので、読み手が書きかけのファイルを見ることはない。
+        """
+        columns = [(name, _as_array(typecode, self._column(name))) for name, typecode in _COLUMNS]
+        header: dict[str, object] = {
+            "generation": self.generation,
+            "byteorder": sys.byteorder,
+            "types": [t.value for t in _TYPES],
+            "authors": [a.value for a in _AUTHORS],
+            "columns": {},
+        }
+        layout: dict[str, tuple[int, int]] = {}
+        offset = 0
+        for name, values in columns:
+            layout[name] = (offset, len(values))
+            offset = _align(offset + len(values) * values.itemsize)
+        header["columns"] = layout
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = _align(len(_MAGIC) + _HEADER_LENGTH.size + len(header_bytes))
+
+        # 同じスナップショットを複数のプロセス・スレッドが同時に書いても衝突しないよう、一時ファイル名は毎回変える
+        tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(_MAGIC + _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes)
+            for name, values in columns:
+                f.seek(data_start + layout[name][0])
+                values.tofile(f)
+            f.truncate(data_start + offset)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> ReportCatalog | None:
+        """スナップショットファイルを mmap して読み込む. 無い・壊れている・形式が違う場合は None."""
+        try:
+            with path.open("rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.debug("Failed to open catalog snapshot %s: %s", path, e)
+            return None
+        try:
+            return cls._from_snapshot(memoryview(buffer))
+        except (ValueError, LookupError, TypeError, struct.error) as e:
+            logger.debug("Failed to load catalog snapshot %s: %s", path, e)
+            return None
+
+    @classmethod
+    def _from_snapshot(cls, view: memoryview) -> ReportCatalog:
+        """スナップショットのメモリから、各列をコピーせずに参照するカタログを作る."""
+        header_start = len(_MAGIC) + _HEADER_LENGTH.size
+        if bytes(view[: len(_MAGIC)]) != _MAGIC:
+            msg = "not a catalog snapshot"
+            raise ValueError(msg)
+        (header_length,) = _HEADER_LENGTH.unpack(view[len(_MAGIC) : header_start])
+        header = json.loads(bytes(view[header_start : header_start + header_length]))
+        if (
+            header["byteorder"] != sys.byteorder
+            or header["types"] != [t.value for t in _TYPES]
+            or header["authors"] != [a.value for a in _AUTHORS]
+        ):
+            msg = "incompatible catalog snapshot"
+            raise ValueError(msg)
+
+        data_start = _align(header_start + header_length)
+        columns: dict[str, memoryview] = {}
+        for name, typecode in _COLUMNS:
+            offset, length = header["columns"][name]
+            start = data_start + offset
+            end = start + length * array(typecode).itemsize
+            if end > len(view):
+                msg = f"truncated catalog snapshot: {name}"
+                raise ValueError(msg)
+            columns[name] = view[start:end].cast(typecode)
+
+        return cls(
+            created_us=columns["created_us"],
+            updated_us=columns["updated_us"],
+            type_codes=columns["type_codes"],
+            author_codes=columns["author_codes"],
+            tag_offsets=columns["tag_offsets"],
+            tag_ids=columns["tag_ids"],
+            tag_names=StringColumn(columns["tag_name_offsets"], columns["tag_name_data"]),
+            titles=StringColumn(columns["title_offsets"], columns["title_data"]),
+            note_ids=StringColumn(columns["note_id_offsets"], columns["note_id_data"]),
+            generation=header["generation"],
+        )
+
+    def _column(self, name: str) -> Sequence[int] | bytes | memoryview:
+        """スナップショットの列名に対応する値."""
+        strings = {"tag_name": self.tag_names, "title": self.titles, "note_id": self.note_ids}
+        prefix, _, part = name.rpartition("_")
+        if prefix in strings:
+            return strings[prefix].offsets if part == "offsets" else strings[prefix].data
+        return getattr(self, name)
+
+
+def _as_array(typecode: str, values: Sequence[int] | bytes | memoryview) -> array[int]:
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _bucket_starts(first: date, last: date, group_by: GroupBy) -> Iterator[date]:
+    """First から last までを区切った各区切りの開始日. 最初の区切りは first から始まる."""
+    start = first
+    while start <= last:
+        yield start
+        if group_by == "day":
+            start += timedelta(days=1)
+        elif group_by == "week":
+            start += timedelta(days=7 - start.weekday())
+        else:
+            start = date(start.year + start.month // 12, start.month % 12 + 1, 1)
@@ -0,0 +1,115 @@
+"""日本語を含むテキストの全文検索用の文字 bigram 分割とスニペット生成.
+
+日本語は単語の区切りが無いので、文字 (英数字・かな・漢字など) の連なりを 2 文字ずつずらした
+bigram に分けて索引する。連なりの最後の 1 文字も単独のトークンとして加えることで、
+1 文字の検索語も前方一致で引けるようにする。
+
+検索語も同じ規則で分割し、連なりごとに bigram のフレーズとして検索するので、
+結果は正規化 (NFKC + casefold) したテキストに対する部分一致と同じになる。
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+# 文字の連なり. 英字・数字・かな・漢字などが続く部分で、記号・空白・アンダースコアが区切りになる
+_RUN_PATTERN = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class Snippet:
+    """一致箇所の前後を切り出したテキスト.
+
+    highlights は text 内の一致箇所の (開始, 終了) 位置。
+    """
+
+    text: str
+    highlights: tuple[tuple[int, int], ...]
+
+
+def normalize(text: str) -> str:
+    """検索用に正規化する (全角英数字を半角に、大文字を小文字に)."""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def to_bigram_text(text: str) -> str:
+    """テキストを空白区切りの bigram トークン列にする."""
+    tokens: list[str] = []
+    for run in _RUN_PATTERN.findall(normalize(text)):
+        tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        tokens.append(run[-1])
+    return " ".join(tokens)
+
+
+def query_terms(keyword: str) -> list[str]:
+    """検索語を、部分一致させる連なりに分ける. すべての連なりを含むものが一致する."""
+    return _RUN_PATTERN.findall(normalize(keyword))
+
+
+def to_match_query(keyword: str) -> str | None:
+    """検索語を FTS5 の MATCH 式にする. 検索できる文字を含まなければ None."""
+    phrases: list[str] = []
+    for term in query_terms(keyword):
+        if len(term) == 1:
+            phrases.append(f'"{term}"*')
+        else:
+            bigrams = " ".join(term[i : i + 2] for i in range(len(term) - 1))
+            phrases.append(f'"{bigrams}"')
+    return " ".join(phrases) if phrases else None
+
+
+def contains_all(text: str, terms: list[str]) -> bool:
+    """正規化したテキストがすべての連なりを含むかどうか (索引を使わない場合の一致判定)."""
+    normalized = normalize(text)
+    return bool(terms) and all(term in normalized for term in terms)
+
+
+def make_snippet(text: str, terms: list[str], width: int = 80) -> Snippet | None:
+    """最初の一致箇所を中心に、最大 width 文字を切り出す. 一致しなければ None."""
+    normalized, origins = _normalize_with_origins(text)
+    spans = sorted(
+        (origins[start], origins[start + len(term) - 1] + 1) for term in terms for start in _find_all(normalized, term)
+    )
+    if not spans:
+        return None
+
+    first_start, first_end = spans[0]
+    start = max(0, min(first_start - (width - (first_end - first_start)) // 2, len(text) - width))
+    end = min(len(text), start + width)
+    highlights = tuple(
+        (max(s, start) - start, min(e, end) - start) for s, e in _merge_spans(spans) if s < end and e > start
+    )
+    return Snippet(text=text[start:end], highlights=highlights)
+
+
+def _normalize_with_origins(text: str) -> tuple[str, list[int]]:
+    """1 文字ずつ正規化し、正規化後の各文字が元のテキストの何文字目に由来するかを返す."""
+    chars: list[str] = []
+    origins: list[int] = []
+    for i, char in enumerate(text):
+        for normalized_char in normalize(char):
+            chars.append(normalized_char)
+            origins.append(i)
+    return "".join(chars), origins
+
+
+def _find_all(text: str, term: str) -> list[int]:
+    positions: list[int] = []
+    start = text.find(term)
+    while start >= 0:
+        positions.append(start)
+        start = text.find(term, start + 1)
+    return positions
+
+
+def _merge_spans(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """開始位置順の区間のうち、重なるものをまとめる."""
+    merged: list[tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
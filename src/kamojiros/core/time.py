@@ -1,11 +1,28 @@
 """time モジュール."""
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 JST = ZoneInfo("Asia/Tokyo")
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
 
 def now_jst() -> datetime:
     """日本標準時の現在時刻を取得する."""
     return datetime.now(JST)
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """Datetime を UNIX エポックからのマイクロ秒に変換する.
+
+    naive な datetime はローカルタイムとして扱う。
+    """
+    aware = dt if dt.tzinfo is not None else dt.astimezone()
+    return (aware - _EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch_us(us: int) -> datetime:
+    """UNIX エポックからのマイクロ秒を日本時間の datetime に戻す (to_epoch_us の逆)."""
+    return (_EPOCH + us * _ONE_MICROSECOND).astimezone(JST)
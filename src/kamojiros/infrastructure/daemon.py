@@ -0,0 +1,469 @@
+"""常駐する kamojiros serve と Unix ドメインソケット越しにやり取りするモジュール.
+
+サーバー (kamojiros.apps.index_server) とクライアント (DaemonReportService) が共有する要求・応答のモデルも定義する。
+要求には設定の指紋をヘッダで付け、サーバーと違う設定 (別の Notes リポジトリなど) のクライアントには 409 を返す。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import logging
+import socket
+from datetime import date, datetime  # noqa: TC003
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Literal
+from urllib.parse import urlencode
+
+from pydantic import BaseModel
+
+from kamojiros.config.settings import STATE_DIR
+from kamojiros.core.fulltext import Snippet
+from kamojiros.interfaces.reports import ReportCursor, SearchHit
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportStats, ReportType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.core.catalog import GroupBy
+    from kamojiros.interfaces.reports import SearchOrder, TagMatch
+    from kamojiros.services.report_service import ReportService
+
+logger = logging.getLogger(__name__)
+
+SOCKET_FILE = "daemon.sock"
+FINGERPRINT_HEADER = "X-Kamojiros-Settings"
+
+# ソケットへの接続を待つ秒数. 繋がらなければすぐに同じプロセスで実行する
+_CONNECT_TIMEOUT = 0.5
+# 要求の処理を待つ秒数
+_READ_TIMEOUT = 60.0
+
+
+def socket_path(notes: NotesSettings) -> Path:
+    """設定のソケットのパス. 省略時は repo_root/.kamojiros/daemon.sock."""
+    if notes.daemon_socket is not None:
+        return notes.daemon_socket
+    return notes.repo_root / STATE_DIR / SOCKET_FILE
+
+
+def settings_fingerprint(notes: NotesSettings) -> str:
+    """設定の指紋. サーバーとクライアントが同じ Notes リポジトリを見ているかを確かめる."""
+    return hashlib.sha256(notes.model_dump_json().encode()).hexdigest()[:16]
+
+
+class ListRequest(BaseModel):
+    """ReportService.list_reports の引数."""
+
+    limit: int | None = None
+    since: datetime | None = None
+    report_type: ReportType | None = None
+    author: ReportAuthor | None = None
+    tags: list[str] | None = None
+    tag_match: Literal["any", "all"] = "any"
+    exclude_tags: list[str] | None = None
+    after: ReportCursor | None = None
+    with_body: bool = False  # 本文を応答に含める
+    preview: int = 0  # 本文の先頭の何文字を応答に含めるか
+
+
+class SearchRequest(BaseModel):
+    """ReportService.search_reports の引数."""
+
+    keyword: str
+    search_in_title: bool = True
+    search_in_body: bool = True
+    search_in_tags: bool = True
+    since: datetime | None = None
+    until: datetime | None = None
+    all_time: bool = False
+    limit: int | None = None
+    order: Literal["relevance", "recent"] = "relevance"
+    after: ReportCursor | None = None
+
+
+class PeriodRequest(BaseModel):
+    """get_statistics / get_timeline / get_crosstab の引数."""
+
+    since: datetime | None = None
+    group_by: Literal["day", "week", "month"] = "day"  # get_timeline だけが使う
+
+
+class WireReport(BaseModel):
+    """応答の Report 1 件. 本文は要求されたぶんだけ含める."""
+
+    meta: ReportMeta
+    body: str | None = None
+    head: str = ""  # 本文の先頭 (ListRequest.preview 文字まで)
+
+
+class WireHit(BaseModel):
+    """応答の検索結果 1 件."""
+
+    report: WireReport
+    score: float
+    snippet: str | None = None
+    highlights: list[tuple[int, int]] = []
+
+
+class ListResponse(BaseModel):
+    """list の応答."""
+
+    reports: list[WireReport]
+
+
+class SearchResponse(BaseModel):
+    """search の応答."""
+
+    hits: list[WireHit]
+
+
+class TimelineResponse(BaseModel):
+    """timeline の応答."""
+
+    buckets: list[tuple[date, int]]
+
+
+class CrosstabResponse(BaseModel):
+    """crosstab の応答."""
+
+    cells: list[tuple[ReportType, ReportAuthor, int]]
+
+
+class BodyResponse(BaseModel):
+    """body の応答."""
+
+    body: str
+
+
+class HealthResponse(BaseModel):
+    """health の応答."""
+
+    pid: int
+    fingerprint: str
+
+
+class DaemonUnavailableError(RuntimeError):
+    """デーモンに繋がらない・設定が違う・要求に失敗した."""
+
+
+class DaemonClient:
+    """Unix ドメインソケットの上で HTTP/1.1 の要求を送るクライアント.
+
+    CLI の 1 回の実行で数回しか要求しないので、httpx は使わず標準ライブラリの http.client で接続を 1 本だけ張る
+    (httpx の読み込みと Client の作成だけで要求の処理より時間がかかるため)。
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        """初期化."""
+        self.path = path
+        self.fingerprint = fingerprint
+        self._connection: _UnixHTTPConnection | None = None
+
+    def call[M: BaseModel](
+        self,
+        endpoint: str,
+        request: BaseModel | None,
+        response_type: type[M],
+        *,
+        params: dict[str, str | int] | None = None,
+    ) -> M:
+        """Endpoint に要求を送り、応答を response_type で読む.
+
+        request が None なら GET で送る。繋がらない・エラーの応答だった場合は DaemonUnavailableError。
+        """
+        try:
+            response = self._send(self._connect(), endpoint, request, params)
+            content = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise self._unavailable(e) from e
+        if response.status != HTTPStatus.OK:
+            self.close()
+            msg = f"kamojiros serve at {self.path} answered {response.status} {response.reason}"
+            raise DaemonUnavailableError(msg)
+        try:
+            return response_type.model_validate_json(content)
+        except ValueError as e:
+            msg = f"kamojiros serve at {self.path} sent an invalid response: {e}"
+            raise DaemonUnavailableError(msg) from e
+
+    def stream[M: BaseModel](self, endpoint: str, request: BaseModel, item_type: type[M]) -> Iterator[M]:
+        """Endpoint に要求を送り、1 行に 1 件の JSON で返る応答を item_type で 1 件ずつ読む.
+
+        応答の状態はこの呼び出しで確かめ、繋がらない・エラーの応答だった場合は DaemonUnavailableError。
+        読んでいる途中で切れた場合も、返したイテレータが DaemonUnavailableError を送出する。
+        読んでいる間も call で本文を取り寄せられるよう、共有の接続とは別の接続を使う。
+        """
+        connection = _UnixHTTPConnection(self.path)
+        try:
+            response = self._send(connection, endpoint, request, None)
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise self._unavailable(e) from e
+        if response.status != HTTPStatus.OK:
+            connection.close()
+            msg = f"kamojiros serve at {self.path} answered {response.status} {response.reason}"
+            raise DaemonUnavailableError(msg)
+        return self._read_lines(connection, response, item_type)
+
+    def close(self) -> None:
+        """接続を閉じる."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> _UnixHTTPConnection:
+        if self._connection is None:
+            self._connection = _UnixHTTPConnection(self.path)
+        return self._connection
+
+    def _send(
+        self,
+        connection: _UnixHTTPConnection,
+        endpoint: str,
+        request: BaseModel | None,
+        params: dict[str, str | int] | None,
+    ) -> http.client.HTTPResponse:
+        headers = {FINGERPRINT_HEADER: self.fingerprint}
+        if request is None:
+            url = f"{endpoint}?{urlencode(params)}" if params else endpoint
+            connection.request("GET", url, headers=headers)
+        else:
+            headers["Content-Type"] = "application/json"
+            connection.request("POST", endpoint, body=request.model_dump_json().encode(), headers=headers)
+        return connection.getresponse()
+
+    def _read_lines[M: BaseModel](
+        self, connection: _UnixHTTPConnection, response: http.client.HTTPResponse, item_type: type[M]
+    ) -> Iterator[M]:
+        try:
+            for line in response:
+                yield item_type.model_validate_json(line)
+        except (OSError, http.client.HTTPException) as e:
+            raise self._unavailable(e) from e
+        except ValueError as e:
+            msg = f"kamojiros serve at {self.path} sent an invalid response: {e}"
+            raise DaemonUnavailableError(msg) from e
+        finally:
+            connection.close()
+
+    def _unavailable(self, error: Exception) -> DaemonUnavailableError:
+        return DaemonUnavailableError(f"kamojiros serve at {self.path} is not available: {error}")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix ドメインソケットに繋ぐ HTTPConnection. 接続は _CONNECT_TIMEOUT 秒だけ待つ."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__("kamojiros", timeout=_READ_TIMEOUT)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(str(self._path))
+            sock.settimeout(self.timeout)
+        except BaseException:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class DaemonReportService:
+    """ReportService の読み出しを kamojiros serve に任せ、使えなければ同じプロセスの ReportService で実行する.
+
+    with_body / preview は list_reports の応答に含める本文の量で、--json や --show-body の表示に合わせて指定する。
+    含めなかった本文は、アクセスされたときにデーモンから取り寄せる。
+    """
+
+    def __init__(
+        self,
+        client: DaemonClient,
+        fallback: Callable[[], ReportService],
+        *,
+        with_body: bool = False,
+        preview: int = 0,
+    ) -> None:
+        """初期化."""
+        self._client = client
+        self._fallback = fallback
+        self._local: ReportService | None = None
+        self._with_body = with_body
+        self._preview = preview
+
+    def list_reports(
+        self,
+        limit: int | None = None,
+        since: datetime | None = None,
+        report_type: ReportType | None = None,
+        author: ReportAuthor | None = None,
+        tags: list[str] | None = None,
+        *,
+        tag_match: TagMatch = "any",
+        exclude_tags: list[str] | None = None,
+        after: ReportCursor | None = None,
+    ) -> list[Report]:
+        """ReportService.list_reports と同じ."""
+        request = self._list_request(limit, since, report_type, author, tags, tag_match, exclude_tags, after)
+        try:
+            response = self._client.call("/list", request, ListResponse)
+        except DaemonUnavailableError as e:
+            return self._fall_back(e).list_reports(
+                limit, since, report_type, author, tags, tag_match=tag_match, exclude_tags=exclude_tags, after=after
+            )
+        return [self._to_report(report) for report in response.reports]
+
+    def stream_reports(
+        self,
+        limit: int | None = None,
+        since: datetime | None = None,
+        report_type: ReportType | None = None,
+        author: ReportAuthor | None = None,
+        tags: list[str] | None = None,
+        *,
+        tag_match: TagMatch = "any",
+        exclude_tags: list[str] | None = None,
+        after: ReportCursor | None = None,
+    ) -> Iterator[Report]:
+        """ReportService.stream_reports と同じ. デーモンが送ってくる順に 1 件ずつ返す.
+
+        応答を読み始める前に繋がらなければ同じプロセスで実行する (読み始めたあとに切れた場合は
+        DaemonUnavailableError)。
+        """
+        request = self._list_request(limit, since, report_type, author, tags, tag_match, exclude_tags, after)
+        try:
+            items = self._client.stream("/list/stream", request, WireReport)
+        except DaemonUnavailableError as e:
+            return self._fall_back(e).stream_reports(
+                limit, since, report_type, author, tags, tag_match=tag_match, exclude_tags=exclude_tags, after=after
+            )
+        return (self._to_report(item) for item in items)
+
+    def search_reports(
+        self,
+        keyword: str,
+        *,
+        search_in_title: bool = True,
+        search_in_body: bool = True,
+        search_in_tags: bool = True,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        all_time: bool = False,
+        limit: int | None = None,
+        order: SearchOrder = "relevance",
+        after: ReportCursor | None = None,
+    ) -> list[SearchHit]:
+        """ReportService.search_reports と同じ."""
+        request = SearchRequest(
+            keyword=keyword,
+            search_in_title=search_in_title,
+            search_in_body=search_in_body,
+            search_in_tags=search_in_tags,
+            since=since,
+            until=until,
+            all_time=all_time,
+            limit=limit,
+            order=order,
+            after=after,
+        )
+        try:
+            response = self._client.call("/search", request, SearchResponse)
+        except DaemonUnavailableError as e:
+            # dict() は model_dump と違い、after を ReportCursor のまま渡す
+            return self._fall_back(e).search_reports(**dict(request))
+        return [
+            SearchHit(
+                report=self._to_report(hit.report),
+                score=hit.score,
+                snippet=Snippet(hit.snippet, tuple(hit.highlights)) if hit.snippet is not None else None,
+            )
+            for hit in response.hits
+        ]
+
+    def get_statistics(self, since: datetime | None = None) -> ReportStats:
+        """ReportService.get_statistics と同じ."""
+        try:
+            return self._client.call("/stats", PeriodRequest(since=since), ReportStats)
+        except DaemonUnavailableError as e:
+            return self._fall_back(e).get_statistics(since)
+
+    def get_timeline(self, group_by: GroupBy, since: datetime | None = None) -> list[tuple[date, int]]:
+        """ReportService.get_timeline と同じ."""
+        try:
+            response = self._client.call("/timeline", PeriodRequest(since=since, group_by=group_by), TimelineResponse)
+        except DaemonUnavailableError as e:
+            return self._fall_back(e).get_timeline(group_by, since)
+        return response.buckets
+
+    def get_crosstab(self, since: datetime | None = None) -> dict[tuple[ReportType, ReportAuthor], int]:
+        """ReportService.get_crosstab と同じ."""
+        try:
+            response = self._client.call("/crosstab", PeriodRequest(since=since), CrosstabResponse)
+        except DaemonUnavailableError as e:
+            return self._fall_back(e).get_crosstab(since)
+        return {(report_type, author): count for report_type, author, count in response.cells}
+
+    def _list_request(  # noqa: PLR0917
+        self,
+        limit: int | None,
+        since: datetime | None,
+        report_type: ReportType | None,
+        author: ReportAuthor | None,
+        tags: list[str] | None,
+        tag_match: TagMatch,
+        exclude_tags: list[str] | None,
+        after: ReportCursor | None,
+    ) -> ListRequest:
+        return ListRequest(
+            limit=limit,
+            since=since,
+            report_type=report_type,
+            author=author,
+            tags=tags,
+            tag_match=tag_match,
+            exclude_tags=exclude_tags,
+            after=after,
+            with_body=self._with_body,
+            preview=self._preview,
+        )
+
+    def _fall_back(self, error: DaemonUnavailableError) -> ReportService:
+        logger.info("%s; running in-process", error)
+        self._client.close()
+        if self._local is None:
+            self._local = self._fallback()
+        return self._local
+
+    def _to_report(self, report: WireReport) -> Report:
+        if report.body is not None:
+            return Report.model_construct(meta=report.meta, body_markdown=report.body)
+        body = _RemoteBody(self._client, report.meta.note_id, report.head, self._preview)
+        return Report.with_lazy_body(report.meta, body)
+
+
+class _RemoteBody:
+    """応答に含まれなかった本文を、アクセスされたときにデーモンから取り寄せる."""
+
+    def __init__(self, client: DaemonClient, note_id: str, head: str, head_length: int) -> None:
+        self._client = client
+        self._note_id = note_id
+        self._head = head
+        self._head_length = head_length
+
+    def read(self) -> str:
+        return self._fetch(None)
+
+    def read_head(self, length: int) -> str:
+        if length <= self._head_length:
+            return self._head[:length]
+        return self._fetch(length)
+
+    def _fetch(self, length: int | None) -> str:
+        params: dict[str, str | int] = {"note_id": self._note_id}
+        if length is not None:
+            params["length"] = length
+        return self._client.call("/body", None, BodyResponse, params=params).body
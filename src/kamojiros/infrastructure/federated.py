@@ -0,0 +1,185 @@
+"""複数の Notes リポジトリを 1 つの ReportRepository としてまとめるモジュール."""
+
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import chain, islice
+from typing import TYPE_CHECKING
+
+from kamojiros.core.catalog import ReportCatalog
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.git.parse_cache import ParseCache
+from kamojiros.interfaces.reports import ReportNotFoundError
+from kamojiros.models import ReportStats
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+    from datetime import datetime
+    from pathlib import Path
+
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.infrastructure.git.committer import GitCommitter
+    from kamojiros.interfaces.reports import ReportQuery, ReportRepository, SearchHit, SearchQuery
+    from kamojiros.models import Report, ReportMeta
+
+
+def root_repositories(notes: NotesSettings, committer: GitCommitter | None = None) -> list[MarkdownReportRepository]:
+    """設定のすべての root について、SQLite 索引付きのリポジトリを組み立てる (先頭が repo_root).
+
+    committer は書き込み先の repo_root のリポジトリにだけ渡す。
+    """
+    return [
+        MarkdownReportRepository.from_settings(notes, committer),
+        *(MarkdownReportRepository.for_root(root, cache=ParseCache.from_settings(notes)) for root in notes.extra_roots),
+    ]
+
+
+def report_repository_from_settings(notes: NotesSettings, committer: GitCommitter | None = None) -> ReportRepository:
+    """設定からリポジトリを組み立てる. extra_roots があれば FederatedReportRepository でまとめる."""
+    return combine_repositories(root_repositories(notes, committer))
+
+
+def combine_repositories(repos: Sequence[ReportRepository]) -> ReportRepository:
+    """複数のリポジトリを FederatedReportRepository でまとめる. 1 つだけならそのまま返す."""
+    if len(repos) == 1:
+        return repos[0]
+    return FederatedReportRepository(repos=repos)
+
+
+def _report_order(report: Report) -> tuple[datetime, str]:
+    """各リポジトリの query / iter_reports と同じ並び順のキー."""
+    return report.meta.updated_at, report.meta.note_id
+
+
+def _normalized(hits: list[SearchHit]) -> list[SearchHit]:
+    """1 つのリポジトリの検索結果のスコアを、最上位を 1 とした値にする. スコアが無い (0 以下) ならそのまま."""
+    top = max((hit.score for hit in hits), default=0.0)
+    if top <= 0:
+        return hits
+    return [replace(hit, score=hit.score / top) for hit in hits]
+
+
+def _started[T](stream: Iterator[T]) -> Iterator[T]:
+    """Stream の最初の 1 件を読んでおき、その 1 件から続けて返す iterator にする."""
+    for first in stream:
+        return chain((first,), stream)
+    return iter(())
+
+
+@dataclass(frozen=True)
+class FederatedReportRepository:
+    """複数の Notes リポジトリをまとめて 1 つのリポジトリとして扱う実装.
+
+    書き込みは先頭 (primary) のリポジトリに行う。
+    読み出しは各リポジトリにスレッドプールで並行に問い合わせ、各リポジトリが同じ順序で返す結果を
+    heapq.merge で k-way マージする。件数制限はマージした結果に掛けるので、limit 件に達したら残りは見ない。
+    """
+
+    repos: Sequence[ReportRepository]  # 先頭が書き込み先
+
+    def save(self, report: Report) -> Path:
+        """Report を書き込み先のリポジトリに保存し、生成されたパスを返す."""
+        return self.repos[0].save(report)
+
+    def save_many(self, reports: Iterable[Report], *, jobs: int = 1) -> list[Path]:
+        """複数の Report を書き込み先のリポジトリにまとめて保存し、生成されたパスを reports の順に返す."""
+        return self.repos[0].save_many(reports, jobs=jobs)
+
+    def get(self, note_id: str) -> Report | None:
+        """note_id の Report をいずれかのリポジトリから取得する. 無ければ None."""
+        return next((report for report in self._map(lambda repo: repo.get(note_id)) if report is not None), None)
+
+    def update(
+        self,
+        note_id: str,
+        *,
+        title: str | None = None,
+        body: str | None = None,
+        tags: list[str] | None = None,
+    ) -> Report:
+        """note_id の Report を持つリポジトリで、指定した項目を書き換えて保存する.
+
+        Report が無ければ ReportNotFoundError。
+        """
+        found = self._map(lambda repo: repo.get(note_id) is not None)
+        owner = next((repo for repo, exists in zip(self.repos, found, strict=True) if exists), None)
+        if owner is None:
+            msg = f"report not found: {note_id}"
+            raise ReportNotFoundError(msg)
+        return owner.update(note_id, title=title, body=body, tags=tags)
+
+    def find_recent(self, since: datetime) -> list[Report]:
+        """指定した日時以降に作成・更新された Report をすべてのリポジトリから取得する."""
+        return list(chain.from_iterable(self._map(lambda repo: repo.find_recent(since))))
+
+    def find_recent_meta(self, since: datetime) -> list[ReportMeta]:
+        """find_recent と同じ条件で、本文を含まないメタデータだけを取得する."""
+        return list(chain.from_iterable(self._map(lambda repo: repo.find_recent_meta(since))))
+
+    def iter_reports(
+        self,
+        since: datetime,
+        until: datetime | None = None,
+        *,
+        newest_first: bool = True,
+    ) -> Iterator[Report]:
+        """指定した期間に更新された Report を新しい順 (または古い順) に遅延で返す.
+
+        各リポジトリの索引の更新と最初の 1 件の読み出しはスレッドプールで並行に済ませ、
+        以降は必要になった分だけ呼び出し元のスレッドで読む。
+        """
+        streams = self._open_streams(lambda repo: repo.iter_reports(since, until, newest_first=newest_first))
+        return heapq.merge(*streams, key=_report_order, reverse=newest_first)
+
+    def query(self, spec: ReportQuery) -> list[Report]:
+        """条件に合う Report を spec の順序で最大 spec.limit 件取得する.
+
+        各リポジトリからも最大 spec.limit 件ずつ取得し、マージした先頭 spec.limit 件を返す。
+        """
+        results = self._map(lambda repo: repo.query(spec))
+        merged = heapq.merge(*results, key=_report_order, reverse=spec.newest_first)
+        return list(islice(merged, spec.limit))
+
+    def iter_query(self, spec: ReportQuery) -> Iterator[Report]:
+        """Query と同じ Report を、各リポジトリの iter_query を heapq.merge でマージしながら 1 件ずつ返す.
+
+        iter_reports と同じく、各リポジトリの最初の 1 件まではスレッドプールで並行に読む。
+        """
+        streams = self._open_streams(lambda repo: repo.iter_query(spec))
+        return islice(heapq.merge(*streams, key=_report_order, reverse=spec.newest_first), spec.limit)
+
+    def search(self, spec: SearchQuery) -> list[SearchHit]:
+        """全文検索し、関連の強い順 (spec.order が recent なら新しい順) に最大 spec.limit 件返す.
+
+        bm25 のスコアは索引ごとの統計 (文書数や平均の長さ) に依るのでリポジトリをまたいで比べられない。
+        関連の強い順では、各リポジトリのスコアをそのリポジトリの最上位を 1 とした値にしてからマージする。
+        """
+        results = self._map(lambda repo: repo.search(spec))
+        if spec.order == "recent":
+            merged = heapq.merge(*results, key=lambda hit: _report_order(hit.report), reverse=True)
+        else:
+            merged = heapq.merge(*map(_normalized, results), key=lambda hit: hit.score, reverse=True)
+        return list(islice(merged, spec.limit))
+
+    def stats(self, since: datetime, until: datetime) -> ReportStats:
+        """作成日時が since から until まで (両端を含む) の Report をすべてのリポジトリについて集計する."""
+        return ReportStats.combine(
+            self._map(lambda repo: repo.stats(since, until)), period_start=since, period_end=until
+        )
+
+    def catalog(self, since: datetime | None = None) -> ReportCatalog:
+        """すべてのリポジトリの Report をまとめたカタログを返す."""
+        return ReportCatalog.concat(self._map(lambda repo: repo.catalog(since)))
+
+    def _open_streams(self, open_stream: Callable[[ReportRepository], Iterator[Report]]) -> list[Iterator[Report]]:
+        """各リポジトリの stream を開き、最初の 1 件 (索引の更新を含む) まで _map で並行に読んでおく."""
+        return self._map(lambda repo: _started(open_stream(repo)))
+
+    def _map[T](self, func: Callable[[ReportRepository], T]) -> list[T]:
+        """各リポジトリに対して func をスレッドプールで並行に実行し、リポジトリの順に結果を返す."""
+        if len(self.repos) == 1:
+            return [func(self.repos[0])]
+        with ThreadPoolExecutor(max_workers=len(self.repos)) as pool:
+            return list(pool.map(func, self.repos))
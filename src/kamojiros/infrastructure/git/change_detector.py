@@ -0,0 +1,87 @@
+"""ローカルの git を使って Notes リポジトリの変更ファイルを検出するモジュール."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GitSnapshot:
+    """ある時点のコミットと、そのコミットから作業ツリーが変わっているパス."""
+
+    commit: str
+    dirty_paths: frozenset[str]
+
+
+class GitChangeDetector:
+    """Git の差分から、前回の索引以降に変わった可能性のあるパスを求める.
+
+    パスはすべて notes_repo_root からの相対パス (POSIX 形式) で扱う。
+    git が使えない場合は各メソッドが None を返すので、呼び出し側はファイル走査に戻ること。
+    """
+
+    def __init__(self, repo_root: Path, git_executable: str, pathspec: str) -> None:
+        """初期化."""
+        self.repo_root = repo_root
+        self._git = git_executable
+        self._pathspec = pathspec
+
+    @classmethod
+    def discover(cls, repo_root: Path, pathspec: str) -> GitChangeDetector | None:
+        """repo_root が git の作業ツリーで、git コマンドが使える場合だけ生成する."""
+        git_executable = shutil.which("git")
+        if git_executable is None:
+            return None
+        detector = cls(repo_root, git_executable, pathspec)
+        if detector._run("rev-parse", "--is-inside-work-tree") is None:
+            return None
+        return detector
+
+    def snapshot(self) -> GitSnapshot | None:
+        """HEAD と、HEAD から変更されている (未追跡を含む) パスを取得する."""
+        head = self._run("rev-parse", "--verify", "--quiet", "HEAD^{commit}")
+        if head is None:
+            return None
+        dirty = self._diff_paths("HEAD")
+        if dirty is None:
+            return None
+        return GitSnapshot(commit=head.decode().strip(), dirty_paths=frozenset(dirty))
+
+    def changed_since(self, commit: str) -> set[str] | None:
+        """Commit 以降に変わったパス (コミット済み・作業ツリーの変更・未追跡) を返す."""
+        return self._diff_paths(commit)
+
+    def _diff_paths(self, commit: str) -> set[str] | None:
+        # commit と作業ツリーの差分 (git pull で入ったコミットも、未コミットの変更も含む)
+        diff = self._run("diff", "--name-status", "--no-renames", "--relative", "-z", commit, "--", self._pathspec)
+        untracked = self._run("ls-files", "-z", "--others", "--exclude-standard", "--", self._pathspec)
+        if diff is None or untracked is None:
+            return None
+
+        paths: set[str] = set()
+        # --name-status -z の出力は status と path が NUL 区切りで交互に並ぶ
+        fields = [f for f in diff.decode().split("\0") if f]
+        paths.update(fields[1::2])
+        paths.update(f for f in untracked.decode().split("\0") if f)
+        return paths
+
+    def _run(self, *args: str) -> bytes | None:
+        try:
+            completed = subprocess.run(  # noqa: S603
+                [self._git, "-C", str(self.repo_root), *args],
+                capture_output=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug("git %s failed: %s", " ".join(args), e)
+            return None
+        return completed.stdout
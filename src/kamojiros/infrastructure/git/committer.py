@@ -0,0 +1,164 @@
+"""エージェントが書いたノートを、まとめて git にコミットするモジュール."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+import time
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+
+class GitCommitter:
+    """保存されたパスを溜めておき、batch_size 件ごと、または max_delay 秒ごとに 1 コミットにまとめる.
+
+    ステージは溜めたパスを NUL 区切りで標準入力に渡す 1 回の `git add --pathspec-from-file` で行い、
+    コミットもそのパスだけを対象にする (利用者がステージした他の変更は巻き込まない)。
+    タイマーのスレッドは持たないので、max_delay は add のたびに確かめる。最後に flush (または with を抜ける) こと。
+    git の呼び出しに失敗した場合はログに残し、溜めたパスは次回の flush で再び試す。
+    コミットでは利用者の pre-commit / commit-msg フックも実行する (skip_hooks なら --no-verify で飛ばす)。
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        git_executable: str,
+        *,
+        batch_size: int = 1000,
+        max_delay: float | None = None,
+        push: bool = False,
+        message: str = "Add notes",
+        skip_hooks: bool = False,
+    ) -> None:
+        """初期化."""
+        self.repo_root = repo_root
+        self.batch_size = batch_size
+        self.max_delay = max_delay  # 秒. None なら件数でだけ区切る
+        self.push = push
+        self.message = message
+        self.skip_hooks = skip_hooks  # git commit の pre-commit / commit-msg フックを飛ばす
+        self._git = git_executable
+        self._pending: dict[str, None] = {}  # 追加順を保つ集合 (repo_root からの相対パス)
+        self._first_added: float | None = None
+
+    @classmethod
+    def discover(
+        cls,
+        repo_root: Path,
+        *,
+        batch_size: int = 1000,
+        max_delay: float | None = None,
+        push: bool = False,
+        message: str = "Add notes",
+        skip_hooks: bool = False,
+    ) -> GitCommitter | None:
+        """repo_root が git の作業ツリーで、git コマンドが使える場合だけ生成する."""
+        git_executable = shutil.which("git")
+        if git_executable is None:
+            return None
+        committer = cls(
+            repo_root,
+            git_executable,
+            batch_size=batch_size,
+            max_delay=max_delay,
+            push=push,
+            message=message,
+            skip_hooks=skip_hooks,
+        )
+        if committer._run("rev-parse", "--is-inside-work-tree") is None:
+            return None
+        return committer
+
+    @property
+    def pending(self) -> int:
+        """まだコミットしていないパスの数."""
+        return len(self._pending)
+
+    def add(self, paths: Iterable[Path]) -> str | None:
+        """保存したパスを溜める. 件数か経過時間が上限に達したらコミットし、そのコミットのハッシュを返す."""
+        for path in paths:
+            self._pending[path.relative_to(self.repo_root).as_posix()] = None
+        if self._pending and self._first_added is None:
+            self._first_added = time.monotonic()
+
+        if len(self._pending) >= self.batch_size or self._window_elapsed():
+            return self.flush()
+        return None
+
+    def flush(self, message: str | None = None) -> str | None:
+        """溜めたパスを 1 コミットにし、push する設定なら push する.
+
+        コミットのハッシュを返す。溜めたパスが無い・変更が無い・git に失敗した場合は None。
+        """
+        if not self._pending:
+            return None
+        pathspec = "".join(f"{path}\0" for path in self._pending).encode()
+        from_stdin = ("--pathspec-from-file=-", "--pathspec-file-nul")
+
+        if self._run("add", *from_stdin, stdin=pathspec) is None:
+            logger.warning("git add failed; %d notes stay pending", len(self._pending))
+            return None
+        # 既にコミット済みの内容と同じパスだけなら、git commit は失敗するのでコミットしない
+        # (--relative で、repo_root が作業ツリーのサブディレクトリでも _pending と同じ repo_root からのパスにする)
+        staged = self._run("diff", "--cached", "--name-only", "--no-renames", "--relative", "-z")
+        if staged is not None and self._pending.keys().isdisjoint(staged.decode().split("\0")):
+            self._clear()
+            return None
+        no_verify = ("--no-verify",) if self.skip_hooks else ()
+        committed = self._run(
+            "commit", "--quiet", *no_verify, "--message", message or self.message, *from_stdin, stdin=pathspec
+        )
+        head = self._run("rev-parse", "HEAD") if committed is not None else None
+        if head is None:
+            logger.warning("git commit failed; %d notes stay pending", len(self._pending))
+            return None
+
+        count = len(self._pending)
+        self._clear()
+        commit = head.decode().strip()
+        logger.info("Committed %d notes as %s", count, commit)
+        if self.push and self._run("push", "--quiet") is None:
+            logger.warning("git push failed after committing %s", commit)
+        return commit
+
+    def __enter__(self) -> Self:
+        """With を抜けるときに残りをコミットする."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """溜めたパスをコミットする."""
+        self.flush()
+
+    def _window_elapsed(self) -> bool:
+        if self.max_delay is None or self._first_added is None:
+            return False
+        return time.monotonic() - self._first_added >= self.max_delay
+
+    def _clear(self) -> None:
+        self._pending.clear()
+        self._first_added = None
+
+    def _run(self, *args: str, stdin: bytes | None = None) -> bytes | None:
+        try:
+            completed = subprocess.run(  # noqa: S603
+                [self._git, "-C", str(self.repo_root), *args],
+                input=stdin,
+                capture_output=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.debug("git %s failed: %s", " ".join(args), e)
+            return None
+        return completed.stdout
@@ -0,0 +1,206 @@
+"""Markdown ファイルのフロントマターと本文を読み分けるモジュール.
+
+ファイルは次の形式を想定する。
+
+    ---
+    <YAML>
+    ---
+
+    <本文>
+
+フロントマターの YAML は、MarkdownReportRepository.save が書き出す形
+(ブロック形式の mapping、値はプレーンかシングルクォートの 1 行スカラーか、その 1 段のリスト) であれば
+専用のパーサで読み、それ以外 (手で編集されたファイルなど) は libyaml の C 実装、
+それも無ければ純 Python の YAML パーサで読む。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import yaml
+from yaml.resolver import Resolver
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO
+
+# libyaml が使えれば C 実装を使う
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+_KEY_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# プレーンスカラーの先頭に来ると特別な意味を持つ文字
+_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+_IMPLICIT_RESOLVERS = Resolver.yaml_implicit_resolvers
+_STR_TAG = "tag:yaml.org,2002:str"
+
+_DELIMITER = b"---"
+_CLOSING = b"\n---"
+_READ_CHUNK = 4096
+# UTF-8 は 1 文字最大 4 バイト
+_MAX_UTF8_BYTES = 4
+
+
+def read_front_matter(file_path: Path) -> tuple[str, int] | None:
+    """フロントマター部分だけを読み、(YAML テキスト, 本文の開始バイト位置) を返す.
+
+    本文は読まない。区切りが見つからなければ None。
+    """
+    buf = bytearray()
+    with file_path.open("rb") as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            buf += chunk
+            found = find_front_matter(buf)
+            if found is not None or not chunk:
+                return found
+
+
+def find_front_matter(data: bytes | bytearray) -> tuple[str, int] | None:
+    """読み込み済みのファイルの内容からフロントマターを探し、(YAML テキスト, 本文の開始バイト位置) を返す.
+
+    区切りが見つからなければ None。
+    """
+    start = data.find(_DELIMITER)
+    if start < 0:
+        return None
+    end = data.find(_CLOSING, start + len(_DELIMITER))
+    if end < 0:
+        return None
+    return data[start + len(_DELIMITER) : end + 1].decode("utf-8"), end + len(_CLOSING)
+
+
+@dataclass(frozen=True)
+class MarkdownBody:
+    """ファイル上の本文を、必要になったときにオフセット指定で読み出す.
+
+    offset は本文の開始バイト位置 (閉じ区切り '---' の直後)。
+    不明な場合や、ファイルが書き換わって位置がずれている場合はフロントマターを読み直して求める。
+    """
+
+    path: Path
+    offset: int | None = None
+
+    def read(self) -> str:
+        """本文全体を読む."""
+        with self.path.open("rb") as f:
+            f.seek(self._resolve_offset(f))
+            return f.read().decode("utf-8").strip()
+
+    def read_head(self, length: int) -> str:
+        """本文の先頭 length 文字だけを読む."""
+        data = bytearray()
+        with self.path.open("rb") as f:
+            f.seek(self._resolve_offset(f))
+            while True:
+                chunk = f.read(length * _MAX_UTF8_BYTES + len(_CLOSING))
+                if not chunk:
+                    return data.decode("utf-8").strip()[:length]
+                data += chunk
+                # 末尾で切れた多バイト文字は捨てる
+                head = data.decode("utf-8", errors="ignore").lstrip()
+                if len(head.rstrip()) >= length:
+                    return head[:length]
+
+    def _resolve_offset(self, f: BinaryIO) -> int:
+        if self.offset is not None and self.offset >= len(_CLOSING):
+            f.seek(self.offset - len(_CLOSING))
+            if f.read(len(_CLOSING)) == _CLOSING:
+                return self.offset
+
+        found = read_front_matter(self.path)
+        if found is None:
+            msg = f"front matter not found: {self.path}"
+            raise ValueError(msg)
+        return found[1]
+
+
+def dump_front_matter(front_matter: dict[str, Any]) -> str:
+    """フロントマターを YAML テキストにする (末尾に改行が付く)."""
+    return yaml.dump(front_matter, Dumper=_SafeDumper, sort_keys=False, allow_unicode=True)
+
+
+def load_front_matter(fm_text: str) -> Any:  # noqa: ANN401
+    """フロントマターの YAML テキストを読む.
+
+    save が書き出す形ならば専用パーサで、そうでなければ YAML パーサで読む。
+    結果は yaml.safe_load と同じになる。
+    """
+    parsed = parse_own_front_matter(fm_text)
+    if parsed is not None:
+        return parsed
+    return yaml.load(fm_text, Loader=_SafeLoader)  # noqa: S506
+
+
+def parse_own_front_matter(fm_text: str) -> dict[str, Any] | None:  # noqa: C901
+    """Save が書き出す形のフロントマターだけを読む専用パーサ.
+
+    想定外の構文を見つけたら None を返すので、呼び出し側で YAML パーサに切り替えること。
+    """
+    result: dict[str, Any] = {}
+    # 直前の "key:" (値なし) の key. 続く "- item" はその key のリストになる
+    list_key: str | None = None
+
+    for line in fm_text.splitlines():
+        if not line:
+            continue
+
+        if line.startswith("- "):
+            if list_key is None:
+                return None
+            item = _parse_scalar(line[2:])
+            if item is None:
+                return None
+            # 要素が 1 つも無い "key:" は YAML では null になるので、最初の要素でリストにする
+            if result[list_key] is None:
+                result[list_key] = []
+            result[list_key].append(item)
+            continue
+
+        key, sep, raw_value = line.partition(":")
+        if not sep or not _KEY_PATTERN.fullmatch(key) or key in result:
+            return None
+
+        if not raw_value:
+            list_key = key
+            result[key] = None
+            continue
+
+        list_key = None
+        if not raw_value.startswith(" "):
+            return None
+        value_text = raw_value[1:]
+        if value_text == "[]":
+            result[key] = []
+            continue
+        value = _parse_scalar(value_text)
+        if value is None:
+            return None
+        result[key] = value
+
+    return result
+
+
+def _parse_scalar(text: str) -> str | None:  # noqa: PLR0911
+    """1 行のプレーン / シングルクォートスカラーを文字列として読む. 判断できなければ None."""
+    if not text or text != text.strip():
+        return None
+
+    if text[0] == "'":
+        if len(text) < 2 or text[-1] != "'":  # noqa: PLR2004
+            return None
+        inner = text[1:-1]
+        if "'" in inner.replace("''", ""):
+            return None
+        return inner.replace("''", "'")
+
+    if text[0] in _INDICATORS or ": " in text or " #" in text or text.endswith(":"):
+        return None
+    # プレーンスカラーが文字列以外 (数値, bool, null, 日時など) に解決される場合は YAML パーサに任せる
+    for tag, pattern in _IMPLICIT_RESOLVERS.get(text[0], ()):
+        if tag != _STR_TAG and pattern.match(text):
+            return None
+    return text
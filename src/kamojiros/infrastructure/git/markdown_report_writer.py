@@ -2,48 +2,640 @@
 
 from __future__ import annotations
 
+import calendar
+import contextlib
+import heapq
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, ClassVar
+from datetime import UTC, date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import yaml
-from pydantic import HttpUrl
 
-from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+from kamojiros.core.catalog import ReportCatalog
+from kamojiros.core.fulltext import contains_all, make_snippet, query_terms, to_match_query
+from kamojiros.core.time import now_jst
+from kamojiros.infrastructure.git.change_detector import GitChangeDetector
+from kamojiros.infrastructure.git.front_matter import (
+    MarkdownBody,
+    dump_front_matter,
+    load_front_matter,
+    read_front_matter,
+)
+from kamojiros.infrastructure.git.pack import (
+    PACK_FILE,
+    JournalBody,
+    JournalPack,
+    PackedBody,
+    PackedNote,
+    find_packed,
+    pack_path,
+    write_pack,
+)
+from kamojiros.infrastructure.git.parse_cache import CachedBody, ParseCache
+from kamojiros.infrastructure.sqlite.report_index import FileState, FullText, IndexedReport, SqliteReportIndex
+from kamojiros.interfaces.reports import ReportNotFoundError, ReportQuery, SearchHit
+from kamojiros.models import Report, ReportMeta, ReportStats
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Iterable, Iterator
+
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.core.fulltext import Snippet
+    from kamojiros.infrastructure.git.committer import GitCommitter
+    from kamojiros.interfaces.reports import ReportCursor, SearchField, SearchQuery
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 索引の状態として保存するキー
+_GIT_COMMIT_KEY = "git_commit"
+_GIT_DIRTY_PATHS_KEY = "git_dirty_paths"
+
+# docs/journal/YYYY/MM/DD/<note_id>.md
+_JOURNAL_PATH_DEPTH = 6
+# make_note_id が付ける note_id の日付の接頭辞 (YYYY-MM-DD)
+_NOTE_ID_DATE_LENGTH = 10
+
+# rebuild_index で 1 トランザクションにまとめて索引に入れる件数
+_REBUILD_BATCH = 2000
+
+# rebuild_index のワーカーが 1 ファイルごとに返す (パス, IndexedReport.to_row のタプル, 全文検索用のテキスト)
+type _ParsedRow = tuple[str, tuple[Any, ...], FullText]
+
+# ノート 1 件の読み出し元. loose ファイルのパスか、月のパックの中の 1 件
+type _NoteSource = Path | PackedNote
+# _load_note に渡せるもの. _scan_journal が返した os.DirEntry をそのまま渡せる
+type _NoteEntry = _NoteSource | os.DirEntry[str]
+
+
+@dataclass(frozen=True)
+class IndexRefreshResult:
+    """索引の更新結果."""
+
+    scanned: int  # stat したファイル数
+    parsed: int  # 再パースしたファイル数
+    deleted: int  # 索引から削除した件数
+    elapsed_seconds: float
+    used_git: bool = False  # git の差分で対象を絞り込んだか
+
+    @property
+    def files_per_second(self) -> float:
+        """1 秒あたりに調べたファイル数."""
+        return self.scanned / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class PackResult:
+    """月のパックの作成結果."""
+
+    months: int  # パックを書いた月の数
+    packed: int  # パックに入れたノートの数 (前からパックにあったものを含む)
+    removed: int  # パックに移して消した loose ファイルの数
+    elapsed_seconds: float
+
 
 @dataclass
 class MarkdownReportRepository:
-    """Kamojiros Notes (Git repo) に Report を保存・読み出しする実装."""
+    """Kamojiros Notes (Git repo) に Report を保存・読み出しする実装.
+
+    index を渡すと、メタデータの読み出しは SQLite 索引から行い、
+    Markdown ファイルは本文が必要なときだけ読む。committer を渡すと、保存したファイルをまとめて git にコミットする。
+    読み込んだノートは cache に (パス, mtime_ns, サイズ) をキーに保持し、変わっていないファイルは読み直さない。
+    """
 
     DOCS: ClassVar[str] = "docs"
     JOURNAL: ClassVar[str] = "journal"
-    _EXPECTED_FRONT_MATTER_PARTS: ClassVar[int] = 3
 
     notes_repo_root: Path  # Kamojiros Notes を clone したルート
+    index: SqliteReportIndex | None
+    git: GitChangeDetector | None
+    committer: GitCommitter | None
+    cache: ParseCache
+    # git の差分で索引を更新したあと、この秒数の間は読み出しのたびの更新を省く (常駐するプロセス用. 0 なら毎回更新する)
+    refresh_interval: float
+    # IndexUpdater が変更を監視して索引に反映している間は True. 読み出しのたびの更新を省く
+    watched: bool
+    _known_dirs: set[Path]  # save_many で作った (あることを確かめた) ディレクトリ
+    _fresh_until: float  # time.monotonic() がこの値になるまで、索引は最新とみなす
+    _sync_lock: threading.Lock  # 索引の更新 (_refresh / apply_changes) をスレッド間で 1 つずつにする
 
-    def __init__(self, notes_repo_root: Path) -> None:
-        """初期化."""
+    def __init__(
+        self,
+        notes_repo_root: Path,
+        index: SqliteReportIndex | None = None,
+        git: GitChangeDetector | None = None,
+        committer: GitCommitter | None = None,
+        cache: ParseCache | None = None,
+    ) -> None:
+        """初期化. cache を省略した場合は既定の上限の ParseCache を使う."""
         self.notes_repo_root = notes_repo_root
+        self.index = index
+        self.git = git
+        self.committer = committer
+        self.cache = cache if cache is not None else ParseCache()
+        self.refresh_interval = 0.0
+        self.watched = False
+        self._known_dirs = set()
+        self._fresh_until = 0.0
+        self._sync_lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """ロックを除いて pickle する (rebuild_index のワーカーへ渡すため)."""
+        state = self.__dict__.copy()
+        del state["_sync_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Pickle から戻し、ロックを作り直す."""
+        self.__dict__.update(state)
+        self._sync_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, notes: NotesSettings, committer: GitCommitter | None = None) -> MarkdownReportRepository:
+        """設定から書き込み先 (repo_root) の SQLite 索引付きのリポジトリを組み立てる."""
+        return cls.for_root(
+            notes.repo_root, notes.index_path, committer=committer, cache=ParseCache.from_settings(notes)
+        )
+
+    @classmethod
+    def for_root(
+        cls,
+        repo_root: Path,
+        index_path: Path | None = None,
+        committer: GitCommitter | None = None,
+        cache: ParseCache | None = None,
+    ) -> MarkdownReportRepository:
+        """Root の Notes リポジトリを SQLite 索引付きで開く.
+
+        index_path を省略した場合は root/.kamojiros/index.db を使う。
+        """
+        index = SqliteReportIndex.for_notes_repo(repo_root) if index_path is None else SqliteReportIndex(index_path)
+        git = GitChangeDetector.discover(repo_root, pathspec=f"{cls.DOCS}/{cls.JOURNAL}")
+        return cls(notes_repo_root=repo_root, index=index, git=git, committer=committer, cache=cache)
 
     def save(self, report: Report) -> Path:
         """Report を保存し、生成されたパスを返す."""
-        docs_root = self.notes_repo_root / self.DOCS
+        return self.save_many([report])[0]
+
+    def save_many(self, reports: Iterable[Report], *, jobs: int = 1) -> list[Path]:
+        """複数の Report をまとめて保存し、生成されたパスを reports の順に返す.
+
+        各ファイルは同じディレクトリの一時ファイルに書いて fsync してから os.replace で置き換えるので、
+        途中で失敗しても書きかけのファイルは残らない。一時ファイルは jobs 個のスレッドで並行に書き、
+        ディレクトリの fsync は置き換えたあとにディレクトリごとに 1 回だけ行う。
+        作ったディレクトリは覚えておき、同じディレクトリに mkdir し直さない。索引は 1 トランザクションで更新する。
+        committer があれば、保存したパスを渡してコミットを待たせる。同じ note_id の Report が複数あれば後のものが残る。
+        """
+        pending = [self._render(report) for report in reports]
+        for write in pending:
+            self._ensure_dir(write.file_path.parent)
+
+        try:
+            if jobs > 1 and len(pending) > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    states = list(pool.map(_write_temp, pending))
+            else:
+                states = [_write_temp(write) for write in pending]
+        except BaseException:
+            for write in pending:
+                write.temp_path.unlink(missing_ok=True)
+            # 外でディレクトリが消された場合に備え、次回は mkdir からやり直す
+            self._known_dirs.clear()
+            raise
+
+        for write, state in zip(pending, states, strict=True):
+            write.temp_path.replace(write.file_path)
+            # 書いた内容をそのまま持っておけば、直後の読み出しでファイルを読まずに済む
+            body = write.report.body_markdown.strip()
+            self.cache.put(os.fspath(write.file_path), state, write.report.meta, write.body_offset, body)
+        for dir_path in {write.file_path.parent for write in pending}:
+            _fsync_dir(dir_path)
+
+        if self.index is not None:
+            entries: dict[str, IndexedReport] = {}
+            texts: dict[str, FullText] = {}
+            for write, state in zip(pending, states, strict=True):
+                meta = write.report.meta
+                rel_path = write.file_path.relative_to(self.notes_repo_root).as_posix()
+                entries[rel_path] = IndexedReport.from_meta(
+                    meta,
+                    path=rel_path,
+                    day=meta.created_at.date().isoformat(),
+                    state=state,
+                    body_offset=write.body_offset,
+                )
+                texts[rel_path] = FullText.from_meta(meta, write.report.body_markdown)
+            self.index.upsert(entries.values(), texts)
+        paths = [write.file_path for write in pending]
+        if self.committer is not None:
+            self.committer.add(paths)
+        return paths
+
+    def get(self, note_id: str) -> Report | None:
+        """note_id の Report を取得する. 無ければ None.
+
+        make_note_id が付ける日付の接頭辞 (YYYY-MM-DD) からパスを直接求め、無ければその月のパック、索引の順に引く。
+        どちらの場合もファイルから読むので、索引が古くても最新の内容を返す。本文は初回アクセス時に読み込む。
+        """
+        source = self._locate(note_id)
+        if source is None:
+            return None
+        report = self._load_report(source)
+        if report is None or report.meta.note_id != note_id:
+            return None
+        return report
+
+    def update(
+        self,
+        note_id: str,
+        *,
+        title: str | None = None,
+        body: str | None = None,
+        tags: list[str] | None = None,
+    ) -> Report:
+        """note_id の Report の指定した項目を書き換え、updated_at を現在時刻にして保存する.
+
+        索引は updated_at の順に引けるので、作成日の古い Report も更新すれば最近の Report として見つかる。
+        Report が無ければ ReportNotFoundError。
+        """
+        old_source = self._locate(note_id)
+        report = self._load_report(old_source) if old_source is not None else None
+        if old_source is None or report is None or report.meta.note_id != note_id:
+            msg = f"report not found: {note_id}"
+            raise ReportNotFoundError(msg)
+
+        changes: dict[str, Any] = {"updated_at": now_jst()}
+        if title is not None:
+            changes["title"] = title
+        if tags is not None:
+            changes["tags"] = tags
+        updated = Report(
+            meta=report.meta.model_copy(update=changes),
+            body_markdown=report.body_markdown if body is None else body,
+        )
+        new_path = self.save(updated)
+
+        # 作成日のディレクトリ以外に置かれていたファイルは、save が書いた新しいパスに移したことになる.
+        # パックの中のノートは書き換えられないので、save が書いた loose ファイルが優先されるだけ
+        if isinstance(old_source, Path) and new_path != old_source:
+            old_source.unlink()
+            self.cache.invalidate(os.fspath(old_source))
+            if self.index is not None:
+                self.index.delete([old_source.relative_to(self.notes_repo_root).as_posix()])
+        return updated
+
+    def find_recent(self, since: datetime) -> list[Report]:
+        """指定した日時以降に作成・更新された Report を取得する.
+
+        本文は初回アクセス時に読み込む。
+        """
+        if self.index is None:
+            return self._scan_recent(since)
+
+        return [self._report_from_entry(entry) for entry in self._find_recent_entries(self.index, since)]
+
+    def find_recent_meta(self, since: datetime) -> list[ReportMeta]:
+        """find_recent と同じ条件で、本文を読まずにメタデータだけを取得する."""
+        if self.index is None:
+            return [report.meta for report in self._scan_recent(since)]
+
+        return [entry.to_meta() for entry in self._find_recent_entries(self.index, since)]
+
+    def iter_reports(
+        self,
+        since: datetime,
+        until: datetime | None = None,
+        *,
+        newest_first: bool = True,
+    ) -> Iterator[Report]:
+        """更新日時が since 以降 (until 以前) の Report を updated_at の新しい順 (または古い順) に遅延で返す.
+
+        索引がある場合は索引から updated_at の順に引くので、作成日が since より前でも期間内に更新された Report を含む。
+        無い場合は since から until までの作成日ディレクトリのフロントマターをすべて読み、
+        (updated_at, note_id) で並べてから返す (作成日の後で編集されたノートも、更新日時の位置に並ぶ)。
+        どちらの場合も本文は初回アクセス時に読み込む。
+        """
+        last_day = (until or datetime.now(tz=since.tzinfo)).date()
+
+        if self.index is not None:
+            self._refresh(self.index, since.date(), last_day)
+            for entry in self.index.iter_recent(since, last_day.isoformat(), until=until, newest_first=newest_first):
+                yield self._report_from_entry(entry)
+            return
+
+        reports = [
+            report
+            for _, _, entry in self._scan_journal(since.date(), last_day)
+            if (report := self._load_report(entry)) is not None
+            and report.meta.updated_at >= since
+            and (until is None or report.meta.updated_at <= until)
+        ]
+        reports.sort(key=lambda r: (r.meta.updated_at, r.meta.note_id), reverse=newest_first)
+        yield from reports
+
+    def query(self, spec: ReportQuery) -> list[Report]:
+        """条件に合う Report を spec の順序で最大 spec.limit 件取得する.
 
+        索引がある場合は絞り込み・並べ替え・件数制限を SQLite で行う。
+        無い場合は日付範囲外のディレクトリを読み飛ばし、フロントマターだけで絞り込んでから
+        ヒープで上位 limit 件を選ぶ。どちらの場合も本文は初回アクセス時に読み込む。
+        新しい順で spec.after がある場合は、カーソルの日付より後に作成されたディレクトリも読み飛ばす
+        (ページを進めるほど読む範囲が古い側へ移る)。
+        """
+        first_day, last_day = _day_range(spec.since, spec.until, spec.after if spec.newest_first else None)
+
+        if self.index is not None:
+            self._refresh(self.index, first_day, last_day)
+            entries = self.index.query(spec, last_day.isoformat() if last_day is not None else None)
+            return [self._report_from_entry(entry) for entry in entries]
+
+        candidates = self._scan_matching(spec, first_day, last_day)
+
+        def sort_key(candidate: tuple[ReportMeta, CachedBody]) -> tuple[datetime, str]:
+            return candidate[0].updated_at, candidate[0].note_id
+
+        if spec.limit is None:
+            selected = sorted(candidates, key=sort_key, reverse=spec.newest_first)
+        elif spec.newest_first:
+            selected = heapq.nlargest(spec.limit, candidates, key=sort_key)
+        else:
+            selected = heapq.nsmallest(spec.limit, candidates, key=sort_key)
+        return [Report.with_lazy_body(meta, body) for meta, body in selected]
+
+    def iter_query(self, spec: ReportQuery) -> Iterator[Report]:
+        """Query と同じ Report を 1 件ずつ遅延で返す.
+
+        索引がある場合は SQLite のカーソルから 1 行ずつ Report を作るので、件数が多くても使うメモリは一定。
+        無い場合は query で並べ替えたものを返す。
+        """
+        if self.index is None:
+            yield from self.query(spec)
+            return
+        first_day, last_day = _day_range(spec.since, spec.until, spec.after if spec.newest_first else None)
+        self._refresh(self.index, first_day, last_day)
+        for entry in self.index.query(spec, last_day.isoformat() if last_day is not None else None):
+            yield self._report_from_entry(entry)
+
+    def search(self, spec: SearchQuery) -> list[SearchHit]:
+        """全文検索し、関連の強い順 (spec.order が recent なら新しい順) に最大 spec.limit 件返す.
+
+        索引がある場合は文字 bigram の FTS5 索引で検索し、bm25 で順位を付ける。
+        無い場合は期間内のファイルを新しい順に読み、正規化したテキストの部分一致で絞り込む (スコアは 0)。
+        """
+        terms = query_terms(spec.keyword)
+        match_query = to_match_query(spec.keyword)
+        if match_query is None:
+            return []
+
+        if self.index is not None:
+            self._refresh(self.index, *_day_range(spec.since, spec.until, spec.after))
+            ranked = self.index.search(
+                match_query,
+                columns=spec.fields,
+                since=spec.since,
+                until=spec.until,
+                limit=spec.limit,
+                order=spec.order,
+                after=spec.after,
+            )
+            hits: Iterable[tuple[Report, float]] = ((self._report_from_entry(entry), score) for entry, score in ranked)
+        else:
+            # 新しい順に読むので、order が relevance でも recent と同じ順になる
+            reports = self.query(ReportQuery(since=spec.since, until=spec.until, after=spec.after))
+            matched = ((r, 0.0) for r in reports if contains_all(_searchable_text(r, spec.fields), terms))
+            hits = islice(matched, spec.limit)
+
+        return [SearchHit(report=r, score=score, snippet=_find_snippet(r, spec.fields, terms)) for r, score in hits]
+
+    def stats(self, since: datetime, until: datetime) -> ReportStats:
+        """作成日時が since から until まで (両端を含む) の Report を種別・作成者・タグ別に集計する.
+
+        索引がある場合は日ごとの集計を足し合わせるので、Report を読み込まない。
+        """
+        first_day, last_day = _created_day_range(since, until)
+        if self.index is not None:
+            self._refresh(self.index, first_day, last_day)
+            counts = self.index.stat_counts(since, until)
+            return ReportStats.from_counts(
+                total_count=counts.total,
+                by_type=counts.by_type,
+                by_author=counts.by_author,
+                tag_counts=counts.by_tag,
+                period_start=since,
+                period_end=until,
+            )
+
+        metas = [
+            meta
+            for meta, _ in self._scan_matching(ReportQuery(since=since), first_day, last_day)
+            if since <= meta.created_at <= until
+        ]
+        return ReportStats.from_metas(metas, period_start=since, period_end=until)
+
+    def catalog(self, since: datetime | None = None) -> ReportCatalog:
+        """Report のメタデータを列ごとに持つカタログを返す.
+
+        索引がある場合は索引と同じ世代のスナップショットを mmap して返すので、Report を読み込まない。
+        since を渡した場合、git が使えなくても索引の更新は作成日が since 以降になりうる日付の
+        ディレクトリだけを走査する (since を渡さなければ docs/journal 全体を走査する)。
+        索引が無い場合は、その日付の範囲のノートだけでカタログを作る。
+        """
+        first_day = _created_day_range(since, None)[0] if since is not None else None
+        if self.index is not None:
+            self._refresh(self.index, first_day)
+            return self.index.catalog()
+        return ReportCatalog.from_metas(meta for meta, _ in self._scan_matching(ReportQuery(), first_day, None))
+
+    def refresh_index(self) -> IndexRefreshResult:
+        """追加・変更・削除されたファイルだけを索引に反映する.
+
+        git が使える場合は前回索引したコミットからの差分だけを調べ、
+        使えない場合は docs/journal 全体を走査する。
+        どちらの場合もファイルの変更は (mtime_ns, size, inode) の比較で検知し、変わったものだけを再パースする。
+        """
+        if self.index is None:
+            msg = "index is not configured"
+            raise RuntimeError(msg)
+        return self._refresh(self.index, force=True)
+
+    def apply_changes(self, rel_paths: Iterable[str]) -> IndexRefreshResult:
+        """変更を監視して見つけたパス (notes_repo_root からの相対パス) だけを索引に反映する.
+
+        ノートとパックのファイルは git の差分と同じくファイル状態で突き合わせ、
+        ディレクトリ (docs/journal/YYYY[/MM[/DD]]) はその日付範囲全体を走査し直す (ディレクトリごとの移動・削除)。
+        """
+        if self.index is None:
+            msg = "index is not configured"
+            raise RuntimeError(msg)
+        started = time.perf_counter()
+        candidates = set(rel_paths)
+        ranges = [day_range for rel_path in candidates if (day_range := self._journal_range(rel_path)) is not None]
+        with self._sync_lock:
+            return self._sync_paths(self.index, candidates, started, ranges, used_git=False)
+
+    def rebuild_index(self, jobs: int | None = None) -> IndexRefreshResult:
+        """索引を空にし、docs/journal 全体を読み直して作り直す.
+
+        年月ディレクトリ (docs/journal/YYYY/MM) ごとに jobs 個のワーカープロセスへ振り分けて
+        フロントマターと本文を読み、結果を _REBUILD_BATCH 件ずつ 1 トランザクションで索引に入れる。
+        ワーカーは pydantic モデルではなく索引行のタプルを返す。jobs が 1 の場合は同じプロセスで読む。
+        jobs を省略した場合は CPU 数。
+        """
+        if self.index is None:
+            msg = "index is not configured"
+            raise RuntimeError(msg)
+        started = time.perf_counter()
+        # 読んでいる間に変更されたファイルは、次回の refresh で差分として拾う
+        snapshot = self.git.snapshot() if self.git is not None else None
+        months = [
+            (int(year_entry.name), int(month_entry.name))
+            for year_entry in _scandir_numeric(self.notes_repo_root / self.DOCS / self.JOURNAL)
+            for month_entry in _scandir_numeric(year_entry.path)
+        ]
+
+        self.index.clear()
+        scanned = parsed = 0
+        batch: list[_ParsedRow] = []
+        for month_scanned, rows in self._read_months(months, jobs or os.cpu_count() or 1):
+            scanned += month_scanned
+            parsed += len(rows)
+            batch.extend(rows)
+            if len(batch) >= _REBUILD_BATCH:
+                self._flush_rebuild_batch(self.index, batch)
+        self._flush_rebuild_batch(self.index, batch)
+
+        if snapshot is not None:
+            self.index.set_state(
+                {
+                    _GIT_COMMIT_KEY: snapshot.commit,
+                    _GIT_DIRTY_PATHS_KEY: json.dumps(sorted(snapshot.dirty_paths)),
+                }
+            )
+        return IndexRefreshResult(
+            scanned=scanned,
+            parsed=parsed,
+            deleted=0,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    def pack_months(self, before: date) -> PackResult:
+        """Before の月より前の (閉じた) 月の loose ファイルを、月ごとのパック (YYYY/MM/journal.pack) にまとめる.
+
+        既にパックがある月は、パックの中のノートと loose ファイル (こちらが優先) を合わせて書き直す。
+        loose ファイルの無い月には何もしない。パックを書いてから loose ファイルと空になった日ディレクトリを消し、
+        索引がある場合はその月を索引に反映する。
+        """
+        started = time.perf_counter()
+        first_open_month = before.replace(day=1)
+        months = packed = removed = 0
+        for year_entry in _scandir_numeric(self.notes_repo_root / self.DOCS / self.JOURNAL):
+            for month_entry in _scandir_numeric(year_entry.path):
+                try:
+                    month = date(int(year_entry.name), int(month_entry.name), 1)
+                except ValueError:
+                    continue
+                if month >= first_open_month:
+                    continue
+                month_packed, month_removed = self._pack_month_dir(Path(month_entry.path))
+                if not month_removed:
+                    continue
+                months += 1
+                packed += month_packed
+                removed += month_removed
+                if self.index is not None:
+                    self._sync_index(self.index, month, _month_end(month))
+        return PackResult(months=months, packed=packed, removed=removed, elapsed_seconds=time.perf_counter() - started)
+
+    def _pack_month_dir(self, month_dir: Path) -> tuple[int, int]:
+        """1 か月分の loose ファイルをパックに入れ、(パックの件数, 消した loose ファイルの数) を返す."""
+        loose: list[tuple[str, Path]] = []
+        for day_entry in _scandir_numeric(month_dir):
+            with os.scandir(day_entry.path) as entries:
+                md_entries = [e for e in entries if e.name.endswith(".md") and e.is_file()]
+            loose.extend((f"{day_entry.name}/{e.name}", Path(e.path)) for e in md_entries)
+        if not loose:
+            return 0, 0
+
+        notes: dict[str, tuple[str, str, bytes]] = {}
+        pack = JournalPack.open(pack_path(month_dir))
+        if pack is not None:
+            notes.update((entry.name, (entry.note_id, entry.name, pack.read(entry))) for entry in pack)
+        for name, file_path in loose:
+            loaded = self._load_note(file_path)
+            note_id = loaded.meta.note_id if loaded is not None else file_path.stem
+            notes[name] = (note_id, name, file_path.read_bytes())
+        count = write_pack(pack_path(month_dir), notes.values())
+
+        # パックを書き終えてから loose ファイルを消すので、途中で止まってもノートは失われない
+        for _, file_path in loose:
+            file_path.unlink()
+        for day_dir in {file_path.parent for _, file_path in loose}:
+            self._known_dirs.discard(day_dir)
+            with contextlib.suppress(OSError):
+                day_dir.rmdir()
+        _fsync_dir(month_dir)
+        return count, len(loose)
+
+    def _read_months(self, months: list[tuple[int, int]], jobs: int) -> Iterator[tuple[int, list[_ParsedRow]]]:
+        """年月ごとに _read_month_for_index を実行し、年月の順に結果を返す."""
+        # ワーカーへは索引と git を持たない (pickle できる) リポジトリを渡す
+        reader = MarkdownReportRepository(notes_repo_root=self.notes_repo_root)
+        if jobs == 1 or len(months) <= 1:
+            yield from (reader._read_month_for_index(year, month) for year, month in months)
+            return
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(
+                reader._read_month_for_index, [year for year, _ in months], [month for _, month in months]
+            )
+
+    def _read_month_for_index(self, year: int, month: int) -> tuple[int, list[_ParsedRow]]:
+        """1 か月分のノートを読み、(走査したファイル数, 索引に入れる行) を返す. ワーカープロセスで実行される."""
+        first_day = date(year, month, 1)
+        last_day = date(year, month, calendar.monthrange(year, month)[1])
+        scanned = 0
+        rows: list[_ParsedRow] = []
+        for day, rel_path, entry in self._scan_journal(first_day, last_day):
+            scanned += 1
+            state = _note_state(entry)
+            loaded = self._load_for_index(entry, state)
+            if loaded is None:
+                continue
+            meta, body_offset, full_text = loaded
+            entry_row = IndexedReport.from_meta(
+                meta, path=rel_path, day=day.isoformat(), state=state, body_offset=body_offset
+            ).to_row()
+            rows.append((rel_path, entry_row, full_text))
+        return scanned, rows
+
+    @staticmethod
+    def _flush_rebuild_batch(index: SqliteReportIndex, batch: list[_ParsedRow]) -> None:
+        """溜めた行を 1 トランザクションで索引に入れ、batch を空にする."""
+        index.upsert_rows((row for _, row, _ in batch), {path: text for path, _, text in batch})
+        batch.clear()
+
+    def _render(self, report: Report) -> _PendingWrite:
+        """Report を保存先のパスとファイルの内容にする."""
         meta = report.meta
         created = meta.created_at
 
         # docs/journal/YYYY/MM/DD/
-        dir_path = docs_root / self.JOURNAL / f"{created.year:04d}" / f"{created.month:02d}" / f"{created.day:02d}"
-        dir_path.mkdir(parents=True, exist_ok=True)
-
+        dir_path = (
+            self.notes_repo_root
+            / self.DOCS
+            / self.JOURNAL
+            / f"{created.year:04d}"
+            / f"{created.month:02d}"
+            / f"{created.day:02d}"
+        )
         file_path = dir_path / f"{meta.note_id}.md"
 
         front_matter = {
@@ -57,59 +649,543 @@ class MarkdownReportRepository:
             "source_urls": [str(u) for u in meta.source_urls],
         }
 
-        fm_yaml = yaml.safe_dump(front_matter, sort_keys=False, allow_unicode=True)
-        content = f"---\n{fm_yaml}---\n\n{report.body_markdown.rstrip()}\n"
+        fm_yaml = dump_front_matter(front_matter)
+        header = f"---\n{fm_yaml}---".encode()
+        content = header + f"\n\n{report.body_markdown.rstrip()}\n".encode()
+        # 一時ファイルは .md で終わらないので、書きかけのものが走査や索引に拾われることはない
+        temp_path = dir_path / f".{file_path.name}.{secrets.token_hex(4)}.tmp"
+        return _PendingWrite(
+            report=report, file_path=file_path, temp_path=temp_path, content=content, body_offset=len(header)
+        )
 
-        file_path.write_text(content, encoding="utf-8")
-        return file_path
+    def _ensure_dir(self, dir_path: Path) -> None:
+        """ディレクトリを作る. 一度作った (確かめた) ディレクトリは覚えておき、次からは何もしない."""
+        if dir_path in self._known_dirs:
+            return
+        dir_path.mkdir(parents=True, exist_ok=True)
+        self._known_dirs.add(dir_path)
 
-    def find_recent(self, since: datetime) -> list[Report]:
-        """指定した日時以降に作成・更新された Report を取得する."""
-        reports: list[Report] = []
-        docs_root = self.notes_repo_root / self.DOCS
-        journal_root = docs_root / self.JOURNAL
+    def _locate(self, note_id: str) -> _NoteSource | None:
+        """note_id のノートを、note_id の日付の接頭辞から求めたパス・その月のパック・索引の順に探す."""
+        # note_id はファイル名になるので、ディレクトリをまたぐものは受け付けない
+        if not note_id or "/" in note_id or "\\" in note_id or note_id.startswith("."):
+            return None
+        try:
+            day = date.fromisoformat(note_id[:_NOTE_ID_DATE_LENGTH])
+        except ValueError:
+            pass
+        else:
+            month_dir = self.notes_repo_root / self.DOCS / self.JOURNAL / f"{day.year:04d}" / f"{day.month:02d}"
+            file_path = month_dir / f"{day.day:02d}" / f"{note_id}.md"
+            if file_path.is_file():
+                return file_path
+            pack = JournalPack.open(pack_path(month_dir))
+            packed = pack.find(note_id) if pack is not None else None
+            # パックより新しい loose ファイルが作成日のディレクトリにあれば、そちらを返す
+            if packed is not None:
+                overlay = month_dir / packed.entry.name
+                return overlay if overlay.is_file() else packed
 
-        # since から現在までの日付ディレクトリを走査
-        current_date = since.date()
+        entry = self.index.find_by_note_id(note_id) if self.index is not None else None
+        if entry is None:
+            return None
+        file_path = self.notes_repo_root / entry.path
+        if file_path.is_file():
+            return file_path
+        return find_packed(file_path)
+
+    def _find_recent_entries(self, index: SqliteReportIndex, since: datetime) -> list[IndexedReport]:
         today = datetime.now(tz=since.tzinfo).date()
+        self._refresh(index, since.date(), today)
+        return index.find_recent(since, today.isoformat())
+
+    def _refresh(
+        self,
+        index: SqliteReportIndex,
+        first_day: date | None = None,
+        last_day: date | None = None,
+        *,
+        force: bool = False,
+    ) -> IndexRefreshResult:
+        """索引を最新にする. git が使えなければ日付範囲内だけを走査する.
+
+        git の差分で更新してから refresh_interval 秒の間と、watched の間は、force でなければ何もしない。
+        別のスレッドが更新している間は、それが終わるのを待ってから判断する。
+        """
+        with self._sync_lock:
+            return self._refresh_locked(index, first_day, last_day, force=force)
+
+    def _refresh_locked(
+        self, index: SqliteReportIndex, first_day: date | None, last_day: date | None, *, force: bool
+    ) -> IndexRefreshResult:
+        if not force and (self.watched or (self.git is not None and time.monotonic() < self._fresh_until)):
+            return IndexRefreshResult(scanned=0, parsed=0, deleted=0, elapsed_seconds=0.0, used_git=True)
+        snapshot = self.git.snapshot() if self.git is not None else None
+        if self.git is None or snapshot is None:
+            return self._sync_index(index, first_day, last_day)
+
+        result = self._sync_index_with_git(index, self.git)
+        if result is None:
+            # 基準となるコミットがまだ無い (または辿れない) ので、全体を走査して基準点を作る
+            result = self._sync_index(index)
+
+        # 次回は snapshot.commit からの差分と、この時点で作業ツリーが変わっていたパスだけを調べればよい
+        index.set_state(
+            {
+                _GIT_COMMIT_KEY: snapshot.commit,
+                _GIT_DIRTY_PATHS_KEY: json.dumps(sorted(snapshot.dirty_paths)),
+            }
+        )
+        self._fresh_until = time.monotonic() + self.refresh_interval
+        return result
+
+    def _sync_index_with_git(self, index: SqliteReportIndex, git: GitChangeDetector) -> IndexRefreshResult | None:
+        """前回索引したコミットからの差分に含まれるパスだけを索引に反映する."""
+        started = time.perf_counter()
+        last_commit = index.get_state(_GIT_COMMIT_KEY)
+        if last_commit is None:
+            return None
+        candidates = git.changed_since(last_commit)
+        if candidates is None:
+            return None
+        # 前回作業ツリーで変更されていたパスは、その後元に戻されて差分に出ないことがある
+        candidates.update(json.loads(index.get_state(_GIT_DIRTY_PATHS_KEY) or "[]"))
+        return self._sync_paths(index, candidates, started, used_git=True)
+
+    def _sync_paths(
+        self,
+        index: SqliteReportIndex,
+        candidates: set[str],
+        started: float,
+        ranges: Iterable[tuple[date, date]] = (),
+        *,
+        used_git: bool,
+    ) -> IndexRefreshResult:
+        """候補のパスのノートと、ranges の日付範囲を索引に反映する."""
+        indexed = index.file_states_for(candidates)
+        changed: list[IndexedReport] = []
+        texts: dict[str, FullText] = {}
+        removed: list[str] = []
+        scanned = parsed = 0
 
-        while current_date <= today:
-            day_dir = (
-                journal_root / f"{current_date.year:04d}" / f"{current_date.month:02d}" / f"{current_date.day:02d}"
+        for rel_path in sorted(candidates):
+            day = self._journal_day(rel_path)
+            if day is None:
+                continue
+            found = self._stat_note(rel_path)
+            if found is None:
+                if rel_path in indexed:
+                    removed.append(rel_path)
+                continue
+            source, state = found
+
+            scanned += 1
+            if indexed.get(rel_path) == state:
+                continue
+
+            parsed += 1
+            loaded = self._load_for_index(source, state)
+            if loaded is None:
+                if rel_path in indexed:
+                    removed.append(rel_path)
+                continue
+            meta, body_offset, texts[rel_path] = loaded
+            changed.append(
+                IndexedReport.from_meta(meta, path=rel_path, day=day.isoformat(), state=state, body_offset=body_offset)
             )
-            if day_dir.exists():
-                for md_file in day_dir.glob("*.md"):
-                    report = self._load_report(md_file)
-                    if report and report.meta.updated_at >= since:
-                        reports.append(report)
 
-            current_date += timedelta(days=1)
+        index.upsert(changed, texts)
+        index.delete(removed)
+        # 書き換わったパックは、その月全体をファイル状態で突き合わせる
+        packed_months = sorted(
+            {month for rel_path in candidates if (month := self._pack_file_month(rel_path)) is not None}
+        )
+        range_results = [
+            self._sync_index(index, first_day, last_day)
+            for first_day, last_day in [*ranges, *((month, _month_end(month)) for month in packed_months)]
+        ]
+        return IndexRefreshResult(
+            scanned=scanned + sum(r.scanned for r in range_results),
+            parsed=parsed + sum(r.parsed for r in range_results),
+            deleted=len(removed) + sum(r.deleted for r in range_results),
+            elapsed_seconds=time.perf_counter() - started,
+            used_git=used_git,
+        )
 
-        return reports
+    def _stat_note(self, rel_path: str) -> tuple[_NoteSource, FileState] | None:
+        """相対パスのノートの読み出し元とファイル状態を返す. 無ければ None.
 
-    def _load_report(self, file_path: Path) -> Report | None:
+        loose ファイルが無ければ、パックされたものとして月のパックから探す。
+        """
+        file_path = self.notes_repo_root / rel_path
         try:
-            content = file_path.read_text(encoding="utf-8")
-            parts = content.split("---", 2)
-            if len(parts) < self._EXPECTED_FRONT_MATTER_PARTS:
-                return None
-
-            fm_text = parts[1]
-            body = parts[2]
-
-            fm = yaml.safe_load(fm_text)
-
-            meta = ReportMeta(
-                note_id=fm["note_id"],
-                title=fm["title"],
-                created_at=datetime.fromisoformat(fm["created_at"]),
-                updated_at=datetime.fromisoformat(fm["updated_at"]),
-                type=ReportType(fm["type"]),
-                author=ReportAuthor(fm["author"]),
-                tags=fm.get("tags", []),
-                source_urls=[HttpUrl(u) for u in fm.get("source_urls", [])],
+            stat = file_path.stat()
+        except FileNotFoundError:
+            packed = find_packed(file_path)
+            return (packed, _note_state(packed)) if packed is not None else None
+        return file_path, FileState(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _scan_matching(
+        self,
+        spec: ReportQuery,
+        first_day: date | None,
+        last_day: date | None,
+    ) -> Iterator[tuple[ReportMeta, CachedBody]]:
+        """日付範囲内のフロントマターを読み、条件に合うものを (メタデータ, 本文の読み出し元) で返す."""
+        for _, _, entry in self._scan_journal(first_day, last_day):
+            loaded = self._load_note(entry)
+            if loaded is None:
+                continue
+            if spec.matches(loaded.meta):
+                yield loaded.meta, loaded.body
+
+    def _scan_recent(self, since: datetime) -> list[Report]:
+        reports: list[Report] = []
+        today = datetime.now(tz=since.tzinfo).date()
+
+        # since から現在までの日付ディレクトリを走査
+        for _, _, entry in self._scan_journal(since.date(), today):
+            report = self._load_report(entry)
+            if report and report.meta.updated_at >= since:
+                reports.append(report)
+
+        return reports
+
+    def _sync_index(
+        self,
+        index: SqliteReportIndex,
+        first_day: date | None = None,
+        last_day: date | None = None,
+    ) -> IndexRefreshResult:
+        """日付範囲内の索引を、ファイルの (mtime_ns, size, inode) と突き合わせて最新にする."""
+        started = time.perf_counter()
+        indexed = index.file_states(
+            first_day.isoformat() if first_day else None,
+            last_day.isoformat() if last_day else None,
+        )
+        changed: list[IndexedReport] = []
+        texts: dict[str, FullText] = {}
+        alive: set[str] = set()
+        scanned = parsed = 0
+
+        for day, rel_path, entry in self._scan_journal(first_day, last_day):
+            scanned += 1
+            state = _note_state(entry)
+            if indexed.get(rel_path) == state:
+                alive.add(rel_path)
+                continue
+
+            parsed += 1
+            loaded = self._load_for_index(entry, state)
+            if loaded is None:
+                continue
+            alive.add(rel_path)
+            meta, body_offset, texts[rel_path] = loaded
+            changed.append(
+                IndexedReport.from_meta(meta, path=rel_path, day=day.isoformat(), state=state, body_offset=body_offset)
             )
-            return Report(meta=meta, body_markdown=body.strip())
-        except (yaml.YAMLError, ValueError, KeyError, TypeError) as e:
-            logger.debug("Failed to load report from %s: %s", file_path, e)
+
+        removed = indexed.keys() - alive
+        index.upsert(changed, texts)
+        index.delete(removed)
+        return IndexRefreshResult(
+            scanned=scanned,
+            parsed=parsed,
+            deleted=len(removed),
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    def _scan_journal(
+        self,
+        first_day: date | None = None,
+        last_day: date | None = None,
+    ) -> Iterator[tuple[date, str, os.DirEntry[str] | PackedNote]]:
+        """docs/journal/YYYY/MM/DD/*.md を os.scandir で、パックした月はパックのヘッダから列挙する.
+
+        (ディレクトリの日付, notes_repo_root からの相対パス, DirEntry か PackedNote) を返す。
+        パックの中のノートの相対パスはパックする前の loose ファイルのパスで、
+        同じパスの loose ファイルがあればそちらを返す。
+        日付範囲外の年・月・日ディレクトリは中に入らずに読み飛ばす。
+        """
+        first = first_day or date.min
+        last = last_day or date.max
+
+        for year_entry in _scandir_numeric(self.notes_repo_root / self.DOCS / self.JOURNAL):
+            year = int(year_entry.name)
+            if not first.year <= year <= last.year:
+                continue
+            for month_entry in _scandir_numeric(year_entry.path):
+                month = int(month_entry.name)
+                if not (first.year, first.month) <= (year, month) <= (last.year, last.month):
+                    continue
+                yield from self._scan_month(year_entry.name, month_entry, first, last)
+
+    def _scan_month(
+        self,
+        year_name: str,
+        month_entry: os.DirEntry[str],
+        first: date,
+        last: date,
+    ) -> Iterator[tuple[date, str, os.DirEntry[str] | PackedNote]]:
+        """1 か月分の loose ファイルとパックの中のノートを、日ディレクトリごとに列挙する."""
+        month_rel = f"{self.DOCS}/{self.JOURNAL}/{year_name}/{month_entry.name}"
+        year, month = int(year_name), int(month_entry.name)
+
+        day_dirs: dict[str, os.DirEntry[str] | None] = {e.name: e for e in _scandir_numeric(month_entry.path)}
+        packed: dict[str, list[PackedNote]] = {}
+        pack = JournalPack.open(pack_path(Path(month_entry.path)))
+        if pack is not None:
+            for pack_entry in pack:
+                day_name = pack_entry.name.partition("/")[0]
+                packed.setdefault(day_name, []).append(PackedNote(pack, pack_entry))
+                day_dirs.setdefault(day_name, None)
+
+        for day_name, day_entry in day_dirs.items():
+            try:
+                day = date(year, month, int(day_name))
+            except ValueError:
+                continue
+            if not first <= day <= last:
+                continue
+
+            files: dict[str, os.DirEntry[str] | PackedNote] = {
+                note.entry.name.partition("/")[2]: note for note in packed.get(day_name, ())
+            }
+            if day_entry is not None:
+                with os.scandir(day_entry.path) as entries:
+                    files.update((e.name, e) for e in entries if e.name.endswith(".md") and e.is_file())
+            for name, entry in files.items():
+                yield day, f"{month_rel}/{day_name}/{name}", entry
+
+    def _journal_day(self, rel_path: str) -> date | None:
+        """docs/journal/YYYY/MM/DD/*.md 形式の相対パスからディレクトリの日付を取り出す."""
+        parts = rel_path.split("/")
+        if len(parts) != _JOURNAL_PATH_DEPTH or parts[:2] != [self.DOCS, self.JOURNAL] or not parts[-1].endswith(".md"):
+            return None
+        try:
+            return date(int(parts[2]), int(parts[3]), int(parts[4]))
+        except ValueError:
+            return None
+
+    def _pack_file_month(self, rel_path: str) -> date | None:
+        """docs/journal/YYYY/MM/journal.pack 形式の相対パスから、その月の初日を取り出す."""
+        parts = rel_path.split("/")
+        if len(parts) != _JOURNAL_PATH_DEPTH - 1 or parts[:2] != [self.DOCS, self.JOURNAL] or parts[-1] != PACK_FILE:
+            return None
+        try:
+            return date(int(parts[2]), int(parts[3]), 1)
+        except ValueError:
+            return None
+
+    def _journal_range(self, rel_path: str) -> tuple[date, date] | None:
+        """docs/journal/YYYY[/MM[/DD]] 形式のディレクトリの相対パスから、その日付範囲を取り出す."""
+        parts = rel_path.split("/")
+        numbers = parts[2:]
+        if parts[:2] != [self.DOCS, self.JOURNAL] or not numbers or not all(part.isdigit() for part in numbers):
+            return None
+        try:
+            match [int(part) for part in numbers]:
+                case [year]:
+                    return date(year, 1, 1), date(year, 12, 31)
+                case [year, month]:
+                    first_day = date(year, month, 1)
+                    return first_day, _month_end(first_day)
+                case [year, month, day]:
+                    return date(year, month, day), date(year, month, day)
+                case _:
+                    return None
+        except ValueError:
             return None
+
+    def _report_from_entry(self, entry: IndexedReport) -> Report:
+        """索引行から Report を作る. 本文は初回アクセス時に、索引したファイル状態をキーにキャッシュから引く."""
+        meta = entry.to_meta()
+        path = self.notes_repo_root / entry.path
+        state = FileState(entry.mtime_ns, entry.size, entry.inode)
+        source = JournalBody(path, entry.body_offset)
+        body = CachedBody(self.cache, os.fspath(path), state, meta, entry.body_offset, source)
+        return Report.with_lazy_body(meta, body)
+
+    def _load_report(self, source: _NoteEntry, state: FileState | None = None) -> Report | None:
+        """フロントマターだけを読んで Report を作る. 本文は初回アクセス時に読み込む."""
+        loaded = self._load_note(source, state)
+        if loaded is None:
+            return None
+        return Report.with_lazy_body(loaded.meta, loaded.body)
+
+    def _load_for_index(
+        self, source: _NoteEntry, state: FileState | None = None
+    ) -> tuple[ReportMeta, int, FullText] | None:
+        """索引に入れるメタデータ・本文の開始バイト位置・全文検索用のテキストを読む."""
+        loaded = self._load_note(source, state)
+        if loaded is None:
+            return None
+        try:
+            body = loaded.body.read()
+        except (OSError, ValueError) as e:
+            logger.debug("Failed to read body from %s: %s", source, e)
+            return None
+        return loaded.meta, loaded.body_offset, FullText.from_meta(loaded.meta, body)
+
+    def _load_note(self, entry: _NoteEntry, state: FileState | None = None) -> _LoadedNote | None:
+        """フロントマターだけを読み、メタデータと本文の読み出し元を返す.
+
+        ファイル状態 (state を省略した場合は求める) が cache に保持しているものと同じなら、ファイルを読まずに返す。
+        パックの中のノートは、loose ファイルと同じ論理パスとパックのファイル状態をキーにする。
+        """
+        source: _NoteSource
+        try:
+            if isinstance(entry, PackedNote):
+                source, key = entry, os.path.join(entry.pack.path.parent, entry.entry.name)  # noqa: PTH118
+                state = _note_state(entry)
+            elif isinstance(entry, Path):
+                source, key = entry, os.fspath(entry)
+                if state is None:
+                    stat = entry.stat()
+                    state = FileState(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            else:
+                # キャッシュが効けば Path は作るだけで、文字列にはしない
+                source, key = Path(entry.path), entry.path
+                state = state or _note_state(entry)
+
+            cached = self.cache.get(key, state)
+            if cached is not None:
+                meta, body_offset = cached
+            else:
+                found = read_front_matter(source) if isinstance(source, Path) else source.read_front_matter()
+                if found is None:
+                    return None
+
+                fm_text, body_offset = found
+
+                fm = load_front_matter(fm_text)
+
+                # ファイルは手で編集されうるので、型変換も含めて pydantic で一度に検証する
+                meta = ReportMeta.model_validate(fm)
+                self.cache.put(key, state, meta, body_offset)
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            logger.debug("Failed to load report from %s: %s", entry, e)
+            return None
+        body = CachedBody(self.cache, key, state, meta, body_offset, _body_source(source, body_offset))
+        return _LoadedNote(meta=meta, body_offset=body_offset, body=body)
+
+
+@dataclass(frozen=True)
+class _LoadedNote:
+    """_load_note で読んだノート 1 件."""
+
+    meta: ReportMeta
+    body_offset: int  # 本文の開始バイト位置
+    body: CachedBody
+
+
+@dataclass(frozen=True)
+class _PendingWrite:
+    """save_many で書き込む 1 ファイル分の内容."""
+
+    report: Report
+    file_path: Path
+    temp_path: Path  # file_path と同じディレクトリの一時ファイル
+    content: bytes
+    body_offset: int  # 本文の開始バイト位置
+
+
+def _write_temp(write: _PendingWrite) -> FileState:
+    """内容を一時ファイルに書いて fsync し、そのファイル状態を返す. スレッドプールで実行される.
+
+    os.replace はファイルの inode と mtime を変えないので、返した状態は置き換えたあとのファイルのものと同じになる。
+    """
+    with write.temp_path.open("xb") as f:
+        f.write(write.content)
+        f.flush()
+        os.fsync(f.fileno())
+        stat = os.fstat(f.fileno())
+    return FileState(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """ディレクトリを fsync し、中で行った os.replace を確定させる. 対応していない環境では何もしない."""
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _note_state(entry: os.DirEntry[str] | PackedNote) -> FileState:
+    """索引に記録するファイル状態.
+
+    パックの中のノートは、パックファイルの mtime_ns と inode にノートの長さを組み合わせる。
+    """
+    if isinstance(entry, PackedNote):
+        return FileState(entry.pack.mtime_ns, entry.entry.length, entry.pack.inode)
+    stat = entry.stat()
+    return FileState(stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _body_source(source: _NoteSource, body_offset: int) -> MarkdownBody | PackedBody:
+    """本文を遅延して読み出すためのオブジェクトを作る."""
+    if isinstance(source, PackedNote):
+        return PackedBody(source, body_offset)
+    return MarkdownBody(source, body_offset)
+
+
+def _month_end(month: date) -> date:
+    """Month と同じ月の末日."""
+    return month.replace(day=calendar.monthrange(month.year, month.month)[1])
+
+
+def _day_range(
+    since: datetime | None, until: datetime | None, before: ReportCursor | None = None
+) -> tuple[date | None, date | None]:
+    """updated_at が since から until まで (before があればそれより古い) の Report の作成日が入りうる日付の範囲."""
+    first_day = since.date() if since is not None else None
+    upper = [bound for bound in (until, before.updated_at if before is not None else None) if bound is not None]
+    # 作成日は updated_at 以前だが、タイムゾーンの違いで日付が 1 日ずれうる
+    last_day = min(upper).date() + timedelta(days=1) if upper else None
+    return first_day, last_day
+
+
+def _created_day_range(since: datetime, until: datetime | None) -> tuple[date, date | None]:
+    """created_at が since から until まで (until が None なら上限なし) の Report の作成日が入りうる日付の範囲.
+
+    作成日 (ノート自身のタイムゾーンでの日付) は UTC での日付と高々 1 日しかずれないので、
+    両端を UTC の日付にして前後に 1 日広げる。
+    """
+    first_day = since.astimezone(UTC).date() - timedelta(days=1)
+    return first_day, until.astimezone(UTC).date() + timedelta(days=1) if until is not None else None
+
+
+def _searchable_text(report: Report, fields: frozenset[SearchField]) -> str:
+    """検索対象のフィールドを 1 つのテキストにまとめる. 本文は対象の場合だけ読む."""
+    parts: list[str] = []
+    if "title" in fields:
+        parts.append(report.meta.title)
+    if "body" in fields:
+        parts.append(report.body_markdown)
+    if "tags" in fields:
+        parts.extend(report.meta.tags)
+    return "\n".join(parts)
+
+
+def _find_snippet(report: Report, fields: frozenset[SearchField], terms: list[str]) -> Snippet | None:
+    """本文 (無ければタイトル) の一致箇所を切り出す."""
+    if "body" in fields and (snippet := make_snippet(report.body_markdown, terms)) is not None:
+        return snippet
+    if "title" in fields:
+        return make_snippet(report.meta.title, terms)
+    return None
+
+
+def _scandir_numeric(path: str | Path) -> list[os.DirEntry[str]]:
+    """数字だけの名前を持つサブディレクトリを列挙する. 存在しなければ空."""
+    try:
+        with os.scandir(path) as entries:
+            return [e for e in entries if e.name.isdigit() and e.is_dir()]
+    except FileNotFoundError:
+        return []
@@ -0,0 +1,249 @@
+"""閉じた月の docs/journal/YYYY/MM を 1 ファイルにまとめたパックを読み書きするモジュール.
+
+パックは月ディレクトリ直下の journal.pack で、形式は次のとおり (整数はリトルエンディアン)。
+
+    MAGIC (8 バイト) | ヘッダ長 (u32) | ヘッダ (JSON) | 各ノートの Markdown ファイルの内容を連結したもの
+
+ヘッダは {"notes": [[note_id, 名前, オフセット, 長さ], ...]} で、名前は月ディレクトリからの相対パス (DD/<note_id>.md)、
+オフセットはヘッダの直後からのバイト位置。各ノートの内容は元の Markdown ファイルと同じバイト列なので、
+フロントマターと本文の開始位置は loose ファイルと同じになる。
+パックは読み込み専用で、パックした月に保存したノートは DD/<note_id>.md の loose ファイルとして書かれ、
+パックの同じ名前のノートより優先される。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import secrets
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from kamojiros.infrastructure.git.front_matter import MarkdownBody, find_front_matter
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+PACK_FILE = "journal.pack"
+
+_MAGIC = b"KJPACK1\n"
+_HEADER_LENGTH = struct.Struct("<I")
+# UTF-8 は 1 文字最大 4 バイト
+_MAX_UTF8_BYTES = 4
+# 同時に mmap しておくパックの数
+_OPEN_PACKS = 64
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    """パックの中のノート 1 件の位置."""
+
+    note_id: str
+    name: str  # 月ディレクトリからの相対パス (DD/<note_id>.md)
+    offset: int  # パックの先頭からのバイト位置
+    length: int
+
+    @property
+    def day(self) -> int:
+        """日ディレクトリの日."""
+        return int(self.name.partition("/")[0])
+
+
+class JournalPack:
+    """Mmap したパックファイル. ノートは名前と note_id のどちらからでも引ける."""
+
+    def __init__(self, path: Path, data: mmap.mmap, entries: list[PackEntry], stat: os.stat_result) -> None:
+        """初期化."""
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.inode = stat.st_ino
+        self._data = data
+        self._by_name = {entry.name: entry for entry in entries}
+        self._by_note_id = {entry.note_id: entry for entry in entries}
+
+    @classmethod
+    def open(cls, path: Path) -> JournalPack | None:
+        """パックを mmap して開く. 無い・壊れている場合は None.
+
+        同じファイル (パス, mtime_ns, サイズ, inode) は一度だけ開き、以降は開いたものを返す。
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return _open_pack(str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def __len__(self) -> int:
+        """ノートの件数."""
+        return len(self._by_name)
+
+    def __iter__(self) -> Iterator[PackEntry]:
+        """ノートを名前の順に返す."""
+        return iter(sorted(self._by_name.values(), key=lambda entry: entry.name))
+
+    def get(self, name: str) -> PackedNote | None:
+        """名前 (DD/<note_id>.md) のノートを返す. 無ければ None."""
+        entry = self._by_name.get(name)
+        return PackedNote(self, entry) if entry is not None else None
+
+    def find(self, note_id: str) -> PackedNote | None:
+        """note_id のノートを返す. 無ければ None."""
+        entry = self._by_note_id.get(note_id)
+        return PackedNote(self, entry) if entry is not None else None
+
+    def read(self, entry: PackEntry, start: int = 0, end: int | None = None) -> bytes:
+        """ノートの内容の [start:end] をファイル上のオフセットから直接読む."""
+        stop = entry.length if end is None else min(end, entry.length)
+        return self._data[entry.offset + start : entry.offset + stop]
+
+
+@dataclass(frozen=True)
+class PackedNote:
+    """パックの中のノート 1 件."""
+
+    pack: JournalPack
+    entry: PackEntry
+
+    def read_front_matter(self) -> tuple[str, int] | None:
+        """フロントマター部分を読み、(YAML テキスト, 本文の開始バイト位置) を返す. 区切りが無ければ None."""
+        return find_front_matter(self.pack.read(self.entry))
+
+    def read_bytes(self) -> bytes:
+        """ノートの内容 (元の Markdown ファイルと同じバイト列) を読む."""
+        return self.pack.read(self.entry)
+
+
+@dataclass(frozen=True)
+class PackedBody:
+    """パックの中のノートの本文を、必要になったときにオフセット指定で読み出す."""
+
+    note: PackedNote
+    offset: int  # ノートの内容の中での本文の開始バイト位置
+
+    def read(self) -> str:
+        """本文全体を読む."""
+        return self.note.pack.read(self.note.entry, self.offset).decode("utf-8").strip()
+
+    def read_head(self, length: int) -> str:
+        """本文の先頭 length 文字だけを読む."""
+        end = self.offset + length * _MAX_UTF8_BYTES
+        chunk = self.note.pack.read(self.note.entry, self.offset, end)
+        if end >= self.note.entry.length:
+            return chunk.decode("utf-8").strip()[:length]
+        # 末尾で切れた多バイト文字は捨てる
+        head = chunk.decode("utf-8", errors="ignore").lstrip()
+        if len(head.rstrip()) >= length:
+            return head[:length]
+        return self.read()[:length]
+
+
+@dataclass(frozen=True)
+class JournalBody:
+    """索引した 1 件の本文を、loose ファイルがあればそこから、無ければ月のパックから読む."""
+
+    path: Path  # loose ファイルのパス (docs/journal/YYYY/MM/DD/<note_id>.md)
+    offset: int
+
+    def read(self) -> str:
+        """本文全体を読む."""
+        return self._source().read()
+
+    def read_head(self, length: int) -> str:
+        """本文の先頭 length 文字だけを読む."""
+        return self._source().read_head(length)
+
+    def _source(self) -> MarkdownBody | PackedBody:
+        if self.path.is_file():
+            return MarkdownBody(self.path, self.offset)
+        note = find_packed(self.path)
+        if note is None:
+            msg = f"note not found in files or packs: {self.path}"
+            raise FileNotFoundError(msg)
+        return PackedBody(note, self.offset)
+
+
+def pack_path(month_dir: Path) -> Path:
+    """月ディレクトリのパックファイルのパス."""
+    return month_dir / PACK_FILE
+
+
+def find_packed(note_path: Path) -> PackedNote | None:
+    """Loose ファイルのパス (docs/journal/YYYY/MM/DD/<note_id>.md) に当たるノートを月のパックから探す."""
+    pack = JournalPack.open(pack_path(note_path.parent.parent))
+    if pack is None:
+        return None
+    return pack.get(f"{note_path.parent.name}/{note_path.name}")
+
+
+def write_pack(path: Path, notes: Iterable[tuple[str, str, bytes]]) -> int:
+    """(note_id, 名前, 内容) の列をパックに書き、書いた件数を返す.
+
+    一時ファイルに書いて fsync してから置き換えるので、途中で失敗しても元のパックは壊れない。
+    """
+    ordered = sorted(notes, key=lambda note: note[1])
+    header_notes: list[list[str | int]] = []
+    offset = 0
+    for note_id, name, content in ordered:
+        header_notes.append([note_id, name, offset, len(content)])
+        offset += len(content)
+    header = json.dumps({"notes": header_notes}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        with tmp_path.open("xb") as f:
+            f.write(_MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+            for _, _, content in ordered:
+                f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(ordered)
+
+
+@lru_cache(maxsize=_OPEN_PACKS)
+def _open_pack(path: str, _mtime_ns: int, _size: int, _inode: int) -> JournalPack | None:
+    """パックを mmap してヘッダを読む. 引数の mtime_ns / サイズ / inode はキャッシュのキーにだけ使う."""
+    try:
+        with Path(path).open("rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+    except (OSError, ValueError) as e:
+        logger.debug("Failed to open pack %s: %s", path, e)
+        return None
+
+    try:
+        entries = _read_entries(data)
+    except (ValueError, LookupError, TypeError, struct.error) as e:
+        logger.debug("Failed to load pack %s: %s", path, e)
+        data.close()
+        return None
+    return JournalPack(Path(path), data, entries, stat)
+
+
+def _read_entries(data: mmap.mmap) -> list[PackEntry]:
+    """パックのヘッダからノートの位置を読む."""
+    prefix = len(_MAGIC) + _HEADER_LENGTH.size
+    if data[: len(_MAGIC)] != _MAGIC:
+        msg = "not a journal pack"
+        raise ValueError(msg)
+    (header_length,) = _HEADER_LENGTH.unpack(data[len(_MAGIC) : prefix])
+    header = json.loads(data[prefix : prefix + header_length])
+    data_start = prefix + header_length
+    entries = [
+        PackEntry(note_id=note_id, name=name, offset=data_start + offset, length=length)
+        for note_id, name, offset, length in header["notes"]
+    ]
+    if any(entry.offset + entry.length > len(data) for entry in entries):
+        msg = "truncated journal pack"
+        raise ValueError(msg)
+    return entries
@@ -0,0 +1,182 @@
+"""読み込んだノートを、ファイルの同一性 (パス, mtime_ns, サイズ) をキーにプロセス内に保持する LRU キャッシュ.
+
+キーのパスは文字列で持つ (Path のハッシュは文字列の数倍遅く、キャッシュが効いたときの大半を占めるため)。
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from kamojiros.models import ReportMeta
+
+if TYPE_CHECKING:
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.infrastructure.sqlite.report_index import FileState
+    from kamojiros.models import BodySource
+
+# ReportMeta 1 件が使うおおよそのメモリ (バイト). 本文以外はこの値で見積もる
+_META_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class ParseCacheStats:
+    """キャッシュの利用状況."""
+
+    hits: int  # フロントマターか本文をキャッシュから返した回数
+    misses: int  # ファイルから読む必要があった回数
+    entries: int
+    approx_bytes: int  # 保持しているノートのおおよそのメモリ
+
+    @property
+    def hit_rate(self) -> float:
+        """キャッシュから返した割合."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    mtime_ns: int
+    size: int
+    meta: ReportMeta
+    body_offset: int
+    body: str | None = None
+
+    @property
+    def approx_bytes(self) -> int:
+        return _META_BYTES + (sys.getsizeof(self.body) if self.body is not None else 0)
+
+
+class ParseCache:
+    """検証済みの ReportMeta・本文の開始バイト位置・(読んでいれば) 本文を、ノートのパスごとに 1 件保持する.
+
+    引くときにはファイルの (mtime_ns, サイズ) を渡し、保持しているものと違えば古いものとして捨てる。
+    件数が max_entries を、おおよそのメモリが max_bytes を超えたら、最近使われていないものから捨てる。
+    max_entries が 0 ならキャッシュしない。複数のスレッドから使ってよい。
+    pickle すると上限だけを持つ空のキャッシュになる (ワーカープロセスへ渡す場合)。
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """初期化."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, notes: NotesSettings) -> ParseCache:
+        """設定の上限でキャッシュを作る."""
+        return cls(max_entries=notes.parse_cache_entries, max_bytes=notes.parse_cache_bytes)
+
+    def __reduce__(self) -> tuple[type[ParseCache], tuple[int, int]]:
+        """上限だけを pickle する."""
+        return type(self), (self.max_entries, self.max_bytes)
+
+    def __len__(self) -> int:
+        """保持している件数."""
+        return len(self._entries)
+
+    def get(self, path: str, state: FileState) -> tuple[ReportMeta, int] | None:
+        """(ReportMeta, 本文の開始バイト位置) を返す. 無い・ファイルが変わっている場合は None.
+
+        返す ReportMeta は呼び出しごとの複製なので、書き換えてもキャッシュには影響しない。
+        """
+        with self._lock:
+            entry = self._lookup(path, state)
+            if entry is None:
+                return None
+            return _detached(entry.meta), entry.body_offset
+
+    def get_body(self, path: str, state: FileState) -> str | None:
+        """読み込み済みの本文を返す. 無い・ファイルが変わっている場合は None."""
+        with self._lock:
+            entry = self._lookup(path, state, need_body=True)
+            return entry.body if entry is not None else None
+
+    def put(self, path: str, state: FileState, meta: ReportMeta, body_offset: int, body: str | None = None) -> None:
+        """読み込んだノートの複製を保持する. 同じ状態のものを保持していて body を省いた場合は、その本文を残す."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old.approx_bytes
+                if body is None and (old.mtime_ns, old.size) == (state.mtime_ns, state.size):
+                    body = old.body
+            entry = _Entry(state.mtime_ns, state.size, _detached(meta), body_offset, body)
+            self._entries[path] = entry
+            self._bytes += entry.approx_bytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.approx_bytes
+
+    def invalidate(self, path: str) -> None:
+        """パスのノートを捨てる."""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry.approx_bytes
+
+    def clear(self) -> None:
+        """すべて捨て、利用状況の回数も 0 に戻す."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = self._hits = self._misses = 0
+
+    def stats(self) -> ParseCacheStats:
+        """利用状況を返す."""
+        with self._lock:
+            return ParseCacheStats(
+                hits=self._hits, misses=self._misses, entries=len(self._entries), approx_bytes=self._bytes
+            )
+
+    def _lookup(self, path: str, state: FileState, *, need_body: bool = False) -> _Entry | None:
+        entry = self._entries.get(path)
+        if entry is not None and (entry.mtime_ns, entry.size) != (state.mtime_ns, state.size):
+            # 書き換えられたファイルの古い内容
+            del self._entries[path]
+            self._bytes -= entry.approx_bytes
+            entry = None
+        if entry is None or (need_body and entry.body is None):
+            self._misses += 1
+            return None
+        self._entries.move_to_end(path)
+        self._hits += 1
+        return entry
+
+
+def _detached(meta: ReportMeta) -> ReportMeta:
+    """リストのフィールドまで複製した ReportMeta. 検証済みのものの複製なので検証は省く."""
+    return ReportMeta.from_trusted({**meta.__dict__, "tags": list(meta.tags), "source_urls": list(meta.source_urls)})
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """本文を source から読み、ParseCache に保持する. 2 回目からはキャッシュから返す."""
+
+    cache: ParseCache
+    path: str  # キャッシュのキー (loose ファイルのパス. パックの中のノートも同じ論理パス)
+    state: FileState
+    meta: ReportMeta
+    body_offset: int
+    source: BodySource
+
+    def read(self) -> str:
+        """本文全体を読む."""
+        body = self.cache.get_body(self.path, self.state)
+        if body is None:
+            body = self.source.read()
+            self.cache.put(self.path, self.state, self.meta, self.body_offset, body)
+        return body
+
+    def read_head(self, length: int) -> str:
+        """本文の先頭 length 文字だけを読む. 本文全体をまだ読んでいなければ先頭だけを読む."""
+        body = self.cache.get_body(self.path, self.state)
+        return body[:length] if body is not None else self.source.read_head(length)
@@ -0,0 +1,229 @@
+"""Notes リポジトリの docs/journal の変更を監視し、バックグラウンドで索引に反映するモジュール.
+
+watchfiles が入っていれば OS の通知 (Linux では inotify) を使い、
+無ければ一定の間隔でファイルの状態を見比べるポーリングを使う。
+エディタの保存や git pull のように続けて起きた変更は、debounce 秒の間まとめてから 1 回で索引に反映する。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.git.pack import PACK_FILE
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+    from pathlib import Path
+
+    from kamojiros.config.settings import NotesSettings
+    from kamojiros.infrastructure.git.markdown_report_writer import IndexRefreshResult
+
+logger = logging.getLogger(__name__)
+
+# watchfiles が変更の無いまま返ってくるまでのミリ秒. 最初に返ってきた時点で監視が始まっている
+_NATIVE_TIMEOUT_MS = 200
+# watchfiles が変更をまとめる間に、変更が止んだかを確かめる間隔のミリ秒
+_NATIVE_STEP_MS = 50
+# docs/journal の下の YYYY/MM/DD
+_MAX_DIR_DEPTH = 3
+
+# ファイルの状態. mtime_ns・サイズ・inode の組
+type _State = tuple[int, int, int]
+
+
+class JournalWatcher:
+    """docs/journal の変更を、notes_repo_root からの相対パスの集合にまとめて返す.
+
+    返すのはノート (*.md)・パック (journal.pack)・日付のディレクトリのパスだけで、
+    書き込み途中の一時ファイル (.<名前>.tmp) などは含めない。
+    """
+
+    def __init__(
+        self,
+        notes_repo_root: Path,
+        *,
+        debounce: float = 0.2,
+        poll_interval: float = 1.0,
+        force_polling: bool = False,
+    ) -> None:
+        """初期化. force_polling なら watchfiles があってもポーリングを使う."""
+        self.notes_repo_root = notes_repo_root
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+
+    @property
+    def journal_dir(self) -> Path:
+        """監視するディレクトリ."""
+        return self.notes_repo_root / MarkdownReportRepository.DOCS / MarkdownReportRepository.JOURNAL
+
+    def watch(self, stop: threading.Event, on_ready: Callable[[], None]) -> Iterator[set[str]]:
+        """変更のまとまりを返し続ける. stop がセットされると終わる.
+
+        on_ready は監視を始めたところで 1 回呼ぶ。それ以降の変更は取りこぼさない。
+        docs/journal がまだ無い場合は、作られるのを見つけられるようにポーリングを使う。
+        """
+        if not self.force_polling and self.journal_dir.is_dir() and find_spec("watchfiles") is not None:
+            return self._watch_native(stop, on_ready)
+        return self._poll(stop, on_ready)
+
+    def _watch_native(self, stop: threading.Event, on_ready: Callable[[], None]) -> Iterator[set[str]]:
+        import watchfiles  # noqa: PLC0415 - 開発環境以外では入っていないことがある
+
+        ready = False
+        for changes in watchfiles.watch(
+            self.journal_dir,
+            watch_filter=None,
+            debounce=int(self.debounce * 1000),
+            step=_NATIVE_STEP_MS,
+            stop_event=stop,
+            rust_timeout=_NATIVE_TIMEOUT_MS,
+            yield_on_timeout=True,
+        ):
+            if not ready:
+                ready = True
+                on_ready()
+            paths = {rel_path for _, path in changes if (rel_path := self._relevant(path)) is not None}
+            if paths:
+                yield paths
+
+    def _poll(self, stop: threading.Event, on_ready: Callable[[], None]) -> Iterator[set[str]]:
+        previous = self._states()
+        on_ready()
+        while not stop.wait(self.poll_interval):
+            current = self._states()
+            changed = _diff(previous, current)
+            # 変更が続いている間は debounce 秒ごとに見直し、止むまでまとめる
+            while changed and not stop.wait(self.debounce):
+                latest = self._states()
+                more = _diff(current, latest)
+                current = latest
+                if not more:
+                    break
+                changed |= more
+            previous = current
+            if changed:
+                yield changed
+
+    def _states(self) -> dict[str, _State]:
+        """docs/journal の下のノートとパックのファイル状態."""
+        states: dict[str, _State] = {}
+        for dir_path, _, names in os.walk(self.journal_dir):
+            for name in names:
+                path = os.path.join(dir_path, name)  # noqa: PTH118 - 数千件を stat するので Path を作らない
+                rel_path = self._relevant(path)
+                if rel_path is None:
+                    continue
+                try:
+                    stat = os.stat(path)  # noqa: PTH116
+                except FileNotFoundError:
+                    continue
+                states[rel_path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return states
+
+    def _relevant(self, path: str) -> str | None:
+        """索引に関係するパスなら notes_repo_root からの相対パスを、そうでなければ None を返す."""
+        rel_path = os.path.relpath(path, self.notes_repo_root).replace(os.sep, "/")
+        parts = rel_path.split("/")
+        if parts[:2] != [MarkdownReportRepository.DOCS, MarkdownReportRepository.JOURNAL]:
+            return None
+        name = parts[-1]
+        if name.startswith("."):
+            return None
+        if name.endswith(".md") or name == PACK_FILE:
+            return rel_path
+        if 1 <= len(parts) - 2 <= _MAX_DIR_DEPTH and all(part.isdigit() for part in parts[2:]):
+            return rel_path
+        return None
+
+
+class IndexUpdater:
+    """各 root の docs/journal の変更を、バックグラウンドのスレッドで索引に反映し続ける.
+
+    start で監視を始めてから索引を一度最新にし、以降は変更のまとまりごとに apply_changes する。
+    動いている間は各リポジトリの watched を True にして、読み出しのたびの索引の更新を省く。
+    on_change は索引に反映するたびに、バックグラウンドのスレッドから呼ぶ。
+    """
+
+    def __init__(
+        self,
+        repos: Sequence[MarkdownReportRepository],
+        on_change: Callable[[MarkdownReportRepository, IndexRefreshResult], None] | None = None,
+        *,
+        debounce: float = 0.2,
+        poll_interval: float = 1.0,
+        force_polling: bool = False,
+    ) -> None:
+        """初期化."""
+        self.repos = repos
+        self.on_change = on_change
+        self._watchers = [
+            JournalWatcher(
+                repo.notes_repo_root, debounce=debounce, poll_interval=poll_interval, force_polling=force_polling
+            )
+            for repo in repos
+        ]
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @classmethod
+    def from_settings(
+        cls,
+        notes: NotesSettings,
+        repos: Sequence[MarkdownReportRepository],
+        on_change: Callable[[MarkdownReportRepository, IndexRefreshResult], None] | None = None,
+    ) -> IndexUpdater:
+        """設定の間隔で監視する."""
+        return cls(repos, on_change, debounce=notes.watch_debounce, poll_interval=notes.watch_poll_interval)
+
+    def start(self) -> None:
+        """監視を始め、すべての root の索引を最新にするまで待つ."""
+        for repo, watcher in zip(self.repos, self._watchers, strict=True):
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=self._run, args=(repo, watcher, ready), name=f"kamojiros-watch-{repo.notes_repo_root}"
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+            while not ready.wait(0.1):
+                if not thread.is_alive():
+                    msg = f"failed to start watching {watcher.journal_dir}"
+                    raise RuntimeError(msg)
+
+    def stop(self) -> None:
+        """監視をやめ、読み出しのたびに索引を更新する動作に戻す."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+        for repo in self.repos:
+            repo.watched = False
+
+    def _run(self, repo: MarkdownReportRepository, watcher: JournalWatcher, ready: threading.Event) -> None:
+        def on_ready() -> None:
+            repo.refresh_index()
+            repo.watched = True
+            ready.set()
+
+        for rel_paths in watcher.watch(self._stop, on_ready):
+            try:
+                result = repo.apply_changes(rel_paths)
+            except Exception:
+                # 反映できなかった変更は、読み出しのたびの更新で拾い直す
+                logger.exception("Failed to apply changes under %s; refreshing on every read", watcher.journal_dir)
+                repo.watched = False
+                continue
+            logger.debug("Applied %d changed paths under %s: %s", len(rel_paths), watcher.journal_dir, result)
+            if self.on_change is not None:
+                self.on_change(repo, result)
+
+
+def _diff(before: dict[str, _State], after: dict[str, _State]) -> set[str]:
+    """追加・変更・削除されたパス."""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
@@ -0,0 +1,69 @@
+"""取り込み (kamojiros import) 用に、Markdown のディレクトリや JSONL のダンプから Report を読むモジュール."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import yaml
+
+from kamojiros.infrastructure.git.front_matter import MarkdownBody, load_front_matter, read_front_matter
+from kamojiros.models import Report, ReportMeta
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# JSONL のダンプとして読む拡張子
+JSONL_SUFFIXES = frozenset({".jsonl", ".ndjson"})
+
+
+def iter_report_source(source: Path) -> Iterator[Report | None]:
+    """取り込み元から Report を 1 件ずつ読む.
+
+    source がディレクトリなら配下の *.md (フロントマター付き) を、ファイルなら 1 行 1 件の JSONL を読む。
+    読めない・検証に失敗したものは None を返すので、呼び出し側で読み飛ばした件数を数えられる。
+    """
+    if source.is_dir():
+        return iter_markdown_reports(source)
+    if source.suffix in JSONL_SUFFIXES:
+        return iter_jsonl_reports(source)
+    msg = f"unsupported import source (expected a directory or a .jsonl file): {source}"
+    raise ValueError(msg)
+
+
+def iter_markdown_reports(directory: Path) -> Iterator[Report | None]:
+    """ディレクトリ配下の *.md をパス順に読む. フロントマターが ReportMeta として読めなければ None."""
+    for file_path in sorted(directory.rglob("*.md")):
+        try:
+            found = read_front_matter(file_path)
+            if found is None:
+                logger.debug("Front matter not found in %s", file_path)
+                yield None
+                continue
+            fm_text, body_offset = found
+            meta = ReportMeta.model_validate(load_front_matter(fm_text))
+            body = MarkdownBody(file_path, body_offset).read()
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            logger.debug("Failed to load report from %s: %s", file_path, e)
+            yield None
+            continue
+        yield Report(meta=meta, body_markdown=body)
+
+
+def iter_jsonl_reports(path: Path) -> Iterator[Report | None]:
+    """1 行に 1 件、Report の JSON ({"meta": {...}, "body_markdown": "..."}) が並んだファイルを読む.
+
+    空行は読み飛ばし、検証に失敗した行は None。
+    """
+    with path.open(encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield Report.model_validate_json(line)
+            except ValueError as e:
+                logger.debug("Failed to load report from %s:%d: %s", path, line_no, e)
+                yield None
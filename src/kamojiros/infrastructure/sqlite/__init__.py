@@ -0,0 +1 @@
+"""SQLite Infrastructure Package."""
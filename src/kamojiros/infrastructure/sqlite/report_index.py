@@ -0,0 +1,671 @@
+"""Report のメタデータを SQLite に索引するモジュール.
+
+Markdown ファイルが正本であり、ここに保存するのはそのキャッシュにすぎない。
+スキーマが変わった場合はテーブルを作り直し、呼び出し側で再索引する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from pydantic import HttpUrl
+from sqlalchemy import JSON, Column, Index, bindparam, delete, event, func, intersect, text, tuple_, union
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Field, Session, SQLModel, col, create_engine, select
+
+from kamojiros.config.settings import STATE_DIR
+from kamojiros.core.catalog import ReportCatalog
+from kamojiros.core.fulltext import to_bigram_text
+from kamojiros.core.time import to_epoch_us
+from kamojiros.interfaces.reports import tag_prefix
+from kamojiros.models import ReportAuthor, ReportMeta, ReportType
+
+if TYPE_CHECKING:
+    import sqlite3
+    from collections.abc import Collection, Iterable, Iterator, Mapping, Sequence
+    from pathlib import Path
+
+    from sqlalchemy import ColumnElement
+    from sqlmodel.sql.expression import SelectOfScalar
+
+    from kamojiros.interfaces.reports import ReportCursor, ReportQuery, SearchOrder
+
+SCHEMA_VERSION = 7
+
+# IN 句に一度に渡すパラメータ数の上限
+_SQL_CHUNK = 500
+
+# query が SQLite から一度に取り出す行数. すべての行をまとめて読み込まず、この件数ずつ読みながら返す
+_QUERY_BATCH = 256
+
+# 全文検索用の FTS5 テーブル. 各列には kamojiros.core.fulltext.to_bigram_text で分割したテキストを入れる
+_FTS_TABLE = "report_fts"
+_FTS_COLUMNS = ("title", "body", "tags")
+# bm25 の列ごとの重み (path, title, body, tags の順)
+_FTS_WEIGHTS = "0.0, 3.0, 1.0, 2.0"
+
+# 索引行を書き換えるたびに新しい値にする状態キー. カタログのスナップショットが古いかどうかの判定に使う
+_GENERATION_KEY = "generation"
+
+
+class IndexedReport(SQLModel, table=True):
+    """索引された Report 1 件分のメタデータ."""
+
+    __tablename__: ClassVar[str] = "indexed_report"  # pyright: ignore[reportIncompatibleVariableOverride]
+    # updated_at の順に並べる query / iter_recent が、並べ替えずに索引を辿れるようにする
+    __table_args__ = (Index("ix_indexed_report_updated_ts_note_id", "updated_ts", "note_id"),)
+
+    path: str = Field(primary_key=True)  # notes_repo_root からの相対パス (POSIX 形式)
+    doc_id: int = Field(unique=True)  # パスから決まる整数 ID (全文検索とタグの転置リストで使う)
+    day: str = Field(index=True)  # ディレクトリ上の日付 (YYYY-MM-DD)
+    note_id: str = Field(index=True)
+    title: str
+    type: str
+    author: str
+    tags: list[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    source_urls: list[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    created_at: str  # ISO 8601 (タイムゾーンを保持するため文字列で持つ)
+    updated_at: str
+    created_ts: int = Field(index=True)  # エポックからのマイクロ秒
+    updated_ts: int  # (updated_ts, note_id) の複合インデックスがある
+    mtime_ns: int
+    size: int
+    inode: int
+    body_offset: int  # 本文の開始バイト位置
+
+    @classmethod
+    def from_meta(
+        cls,
+        meta: ReportMeta,
+        *,
+        path: str,
+        day: str,
+        state: FileState,
+        body_offset: int,
+    ) -> IndexedReport:
+        """メタデータとファイル状態から索引行を作る."""
+        return cls(
+            path=path,
+            doc_id=_doc_id(path),
+            day=day,
+            note_id=meta.note_id,
+            title=meta.title,
+            type=meta.type.value,
+            author=meta.author.value,
+            tags=list(meta.tags),
+            source_urls=[str(u) for u in meta.source_urls],
+            created_at=meta.created_at.isoformat(),
+            updated_at=meta.updated_at.isoformat(),
+            created_ts=to_epoch_us(meta.created_at),
+            updated_ts=to_epoch_us(meta.updated_at),
+            mtime_ns=state.mtime_ns,
+            size=state.size,
+            inode=state.inode,
+            body_offset=body_offset,
+        )
+
+    def to_row(self) -> tuple[Any, ...]:
+        """列の値を定義順に並べたタプルにする (プロセス間で受け渡すため). upsert_rows で索引に入れられる."""
+        return tuple(self.model_dump().values())
+
+    def to_meta(self) -> ReportMeta:
+        """索引行から ReportMeta を復元する.
+
+        索引には検証済みの ReportMeta から作った値しか入らないので、検証を省く。
+        """
+        return ReportMeta.from_trusted(
+            {
+                "note_id": self.note_id,
+                "title": self.title,
+                "created_at": datetime.fromisoformat(self.created_at),
+                "updated_at": datetime.fromisoformat(self.updated_at),
+                "type": ReportType(self.type),
+                "author": ReportAuthor(self.author),
+                "tags": [sys.intern(tag) for tag in self.tags],
+                "source_urls": [HttpUrl(u) for u in self.source_urls],
+            }
+        )
+
+
+class Tag(SQLModel, table=True):
+    """タグ名の辞書. 転置リストではタグを名前ではなく tag_id で持つ."""
+
+    __tablename__: ClassVar[str] = "tag"  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    tag_id: int | None = Field(default=None, primary_key=True)
+    name: str = Field(unique=True)
+
+
+class TagPosting(SQLModel, table=True):
+    """タグ -> Report の転置リスト.
+
+    主キー (tag_id, doc_id) の順に格納されるので、タグごとの doc_id が整列した状態で読める。
+    """
+
+    __tablename__: ClassVar[str] = "tag_posting"  # pyright: ignore[reportIncompatibleVariableOverride]
+    __table_args__ = ({"sqlite_with_rowid": False},)
+
+    tag_id: int = Field(primary_key=True)
+    doc_id: int = Field(primary_key=True, index=True)
+
+
+class DailyStat(SQLModel, table=True):
+    """作成日ごとの件数の集計 (種別・作成者・タグ別).
+
+    索引行の追加・更新・削除と同じトランザクションで増減させるので、常に索引行を数えた結果と一致する。
+    """
+
+    __tablename__: ClassVar[str] = "daily_stat"  # pyright: ignore[reportIncompatibleVariableOverride]
+    __table_args__ = ({"sqlite_with_rowid": False},)
+
+    day: str = Field(primary_key=True)  # IndexedReport.day と同じ作成日 (YYYY-MM-DD)
+    dimension: str = Field(primary_key=True)  # "type" / "author" / "tag"
+    value: str = Field(primary_key=True)
+    count: int
+
+
+@dataclass(frozen=True)
+class StatCounts:
+    """期間内の Report の件数 (種別・作成者・タグ別)."""
+
+    by_type: Counter[str]
+    by_author: Counter[str]
+    by_tag: Counter[str]
+
+    @property
+    def total(self) -> int:
+        """Report の件数 (各 Report は種別をちょうど 1 つ持つ)."""
+        return self.by_type.total()
+
+
+class IndexState(SQLModel, table=True):
+    """索引全体の状態 (スキーマバージョンなど) を保持する key-value."""
+
+    __tablename__: ClassVar[str] = "index_state"  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    key: str = Field(primary_key=True)
+    value: str
+
+
+@dataclass(frozen=True)
+class FullText:
+    """全文検索用に bigram 分割したテキスト."""
+
+    title: str
+    body: str
+    tags: str
+
+    @classmethod
+    def from_meta(cls, meta: ReportMeta, body: str) -> FullText:
+        """メタデータと本文から作る."""
+        return cls(
+            title=to_bigram_text(meta.title),
+            body=to_bigram_text(body),
+            tags=to_bigram_text("\n".join(meta.tags)),
+        )
+
+    def columns(self) -> dict[str, str]:
+        """FTS5 テーブルの列ごとの値."""
+        return {"title": self.title, "body": self.body, "tags": self.tags}
+
+
+@dataclass(frozen=True)
+class FileState:
+    """変更検知に使うファイルの状態."""
+
+    mtime_ns: int
+    size: int
+    inode: int
+
+
+class SqliteReportIndex:
+    """Report のメタデータ索引 (SQLite)."""
+
+    DEFAULT_DIR: ClassVar[str] = STATE_DIR
+    DEFAULT_FILE: ClassVar[str] = "index.db"
+    CATALOG_FILE: ClassVar[str] = "catalog.bin"
+
+    def __init__(self, db_path: Path) -> None:
+        """初期化. スキーマが古い場合は作り直す."""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._engine = create_engine(f"sqlite:///{db_path}")
+        event.listen(self._engine, "connect", _set_sqlite_pragmas)
+        self._ensure_schema()
+
+    @classmethod
+    def for_notes_repo(cls, notes_repo_root: Path) -> SqliteReportIndex:
+        """既定の場所 (notes_repo_root/.kamojiros/index.db) の索引を開く."""
+        index_dir = notes_repo_root / cls.DEFAULT_DIR
+        index_dir.mkdir(parents=True, exist_ok=True)
+        # 索引は Git 管理しない
+        gitignore = index_dir / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("*\n", encoding="utf-8")
+        return cls(index_dir / cls.DEFAULT_FILE)
+
+    def file_states(self, first_day: str | None = None, last_day: str | None = None) -> dict[str, FileState]:
+        """日付範囲 (YYYY-MM-DD, 両端を含む) に索引済みのファイル状態を返す. 範囲省略時は全件."""
+        stmt = select(IndexedReport.path, IndexedReport.mtime_ns, IndexedReport.size, IndexedReport.inode)
+        if first_day is not None:
+            stmt = stmt.where(IndexedReport.day >= first_day)
+        if last_day is not None:
+            stmt = stmt.where(IndexedReport.day <= last_day)
+        with Session(self._engine) as session:
+            return {path: FileState(mtime_ns, size, inode) for path, mtime_ns, size, inode in session.exec(stmt)}
+
+    def file_states_for(self, paths: Iterable[str]) -> dict[str, FileState]:
+        """指定したパスのうち索引済みのもののファイル状態を返す."""
+        path_list = list(paths)
+        states: dict[str, FileState] = {}
+        with Session(self._engine) as session:
+            for start in range(0, len(path_list), _SQL_CHUNK):
+                stmt = select(
+                    IndexedReport.path, IndexedReport.mtime_ns, IndexedReport.size, IndexedReport.inode
+                ).where(col(IndexedReport.path).in_(path_list[start : start + _SQL_CHUNK]))
+                states.update(
+                    (path, FileState(mtime_ns, size, inode)) for path, mtime_ns, size, inode in session.exec(stmt)
+                )
+        return states
+
+    def get_state(self, key: str) -> str | None:
+        """索引の状態値を取得する."""
+        with Session(self._engine) as session:
+            state = session.get(IndexState, key)
+            return state.value if state is not None else None
+
+    def set_state(self, values: dict[str, str]) -> None:
+        """索引の状態値をまとめて保存する."""
+        with Session(self._engine) as session:
+            for key, value in values.items():
+                session.merge(IndexState(key=key, value=value))
+            session.commit()
+
+    def upsert(self, entries: Iterable[IndexedReport], texts: Mapping[str, FullText]) -> None:
+        """索引行と全文検索用のテキストを追加・更新する. texts はパスごとの分割済みテキスト."""
+        self._upsert([entry.model_dump() for entry in entries], texts)
+
+    def upsert_rows(self, rows: Iterable[tuple[Any, ...]], texts: Mapping[str, FullText]) -> None:
+        """IndexedReport.to_row で作ったタプルを 1 つのトランザクションで追加・更新する."""
+        fields = tuple(IndexedReport.model_fields)
+        self._upsert([dict(zip(fields, row, strict=True)) for row in rows], texts)
+
+    def clear(self) -> None:
+        """索引行と状態値をすべて削除する (スキーマバージョンは残す)."""
+        with Session(self._engine) as session:
+            for model in (TagPosting, Tag, DailyStat, IndexedReport):
+                session.execute(delete(model))
+            session.execute(delete(IndexState).where(col(IndexState.key) != "schema_version"))
+            session.execute(text(f"DELETE FROM {_FTS_TABLE}"))  # noqa: S608
+            _next_generation(session)
+            session.commit()
+
+    def delete(self, paths: Iterable[str]) -> None:
+        """索引行を削除する."""
+        path_list = list(paths)
+        if not path_list:
+            return
+        with Session(self._engine) as session:
+            delta = _rollup_delta(_stat_keys(session, path_list), sign=-1)
+            for start in range(0, len(path_list), _SQL_CHUNK):
+                chunk = path_list[start : start + _SQL_CHUNK]
+                session.execute(delete(IndexedReport).where(col(IndexedReport.path).in_(chunk)))
+            _apply_rollup_delta(session, delta)
+            _delete_tag_postings(session, [_doc_id(path) for path in path_list])
+            _delete_fts(session, path_list)
+            _next_generation(session)
+            session.commit()
+
+    def stat_counts(self, since: datetime, until: datetime) -> StatCounts:
+        """作成日時が since から until まで (両端を含む) の Report を種別・作成者・タグ別に数える.
+
+        日付はノート自身のタイムゾーンでの作成日なので、UTC での日付と高々 1 日ずれる。
+        そこで since と until の UTC での日付それぞれの前後 1 日 (端の日) は索引行を作成日時で数え、
+        それより内側の日だけ日ごとの集計を足し合わせる。
+        したがって費用は期間の日数に比例し、期間内の Report の件数にはよらない。
+        """
+        first_day = since.astimezone(UTC).date()
+        last_day = until.astimezone(UTC).date()
+        edge_days = {(day + timedelta(days=shift)).isoformat() for day in (first_day, last_day) for shift in (-1, 0, 1)}
+        counts = StatCounts(by_type=Counter(), by_author=Counter(), by_tag=Counter())
+        by_dimension = {"type": counts.by_type, "author": counts.by_author, "tag": counts.by_tag}
+
+        rollup = (
+            select(DailyStat.dimension, DailyStat.value, func.sum(DailyStat.count))
+            .where(
+                DailyStat.day > (first_day + timedelta(days=1)).isoformat(),
+                DailyStat.day < (last_day - timedelta(days=1)).isoformat(),
+            )
+            .group_by(col(DailyStat.dimension), col(DailyStat.value))
+        )
+        edges = select(IndexedReport.type, IndexedReport.author, IndexedReport.tags).where(
+            col(IndexedReport.day).in_(edge_days),
+            IndexedReport.created_ts >= to_epoch_us(since),
+            IndexedReport.created_ts <= to_epoch_us(until),
+        )
+        with Session(self._engine) as session:
+            for dimension, value, count in session.exec(rollup):
+                by_dimension[dimension][value] += count
+            for report_type, author, tags in session.exec(edges):
+                counts.by_type[report_type] += 1
+                counts.by_author[author] += 1
+                counts.by_tag.update(set(tags))
+        return counts
+
+    def catalog(self) -> ReportCatalog:
+        """索引全体のメタデータを列ごとに持つカタログを返す.
+
+        索引と同じディレクトリのスナップショット (catalog.bin) が索引と同じ世代ならそれを mmap して返し、
+        古ければ索引から作り直してスナップショットを書き出す。
+        """
+        snapshot_path = self.db_path.with_name(self.CATALOG_FILE)
+        # sqlmodel の select は 4 列までしか型付けされないので、SQLAlchemy の select を使う
+        stmt = sa_select(
+            col(IndexedReport.created_ts),
+            col(IndexedReport.updated_ts),
+            col(IndexedReport.type),
+            col(IndexedReport.author),
+            col(IndexedReport.tags),
+            col(IndexedReport.title),
+            col(IndexedReport.note_id),
+        ).order_by(col(IndexedReport.created_ts))
+        with Session(self._engine) as session:
+            state = session.get(IndexState, _GENERATION_KEY)
+            generation = state.value if state is not None else ""
+            catalog = ReportCatalog.load(snapshot_path)
+            if catalog is not None and catalog.generation == generation:
+                return catalog
+            catalog = ReportCatalog.from_rows(session.execute(stmt), generation=generation)
+        catalog.save(snapshot_path)
+        return catalog
+
+    def search(
+        self,
+        match_query: str,
+        *,
+        columns: Collection[str] = _FTS_COLUMNS,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int | None = None,
+        order: SearchOrder = "relevance",
+        after: ReportCursor | None = None,
+    ) -> list[tuple[IndexedReport, float]]:
+        """FTS5 の MATCH 式で全文検索し、(索引行, スコア) を bm25 の関連が強い順 (order が recent なら新しい順) に返す.
+
+        スコアは bm25 の符号を反転したもので、大きいほど関連が強い。
+        since / until の条件は ReportQuery と同じく updated_at に掛け、after は (updated_at, note_id) が
+        カーソルより古いものに絞り込む。
+        期間の絞り込みも MATCH と同じ SQL の中で行うので、期間外の Report は読み込まない。
+        """
+        if set(columns) != set(_FTS_COLUMNS):
+            match_query = f"{{{' '.join(c for c in _FTS_COLUMNS if c in columns)}}} : ({match_query})"
+        sql = (
+            f"SELECT {_FTS_TABLE}.path, bm25({_FTS_TABLE}, {_FTS_WEIGHTS}) AS rank "  # noqa: S608
+            f"FROM {_FTS_TABLE} JOIN indexed_report ON indexed_report.path = {_FTS_TABLE}.path "
+            f"WHERE {_FTS_TABLE} MATCH :match_query"
+        )
+        params: dict[str, object] = {"match_query": match_query}
+        if since is not None:
+            sql += " AND indexed_report.updated_ts >= :since_ts"
+            params["since_ts"] = to_epoch_us(since)
+        if until is not None:
+            sql += " AND indexed_report.updated_ts <= :until_ts"
+            params["until_ts"] = to_epoch_us(until)
+        if after is not None:
+            sql += " AND (indexed_report.updated_ts, indexed_report.note_id) < (:after_ts, :after_id)"
+            params["after_ts"] = to_epoch_us(after.updated_at)
+            params["after_id"] = after.note_id
+        if order == "recent":
+            sql += " ORDER BY indexed_report.updated_ts DESC, indexed_report.note_id DESC"
+        else:
+            sql += " ORDER BY rank"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+
+        with Session(self._engine) as session:
+            ranked = [(path, -rank) for path, rank in session.execute(text(sql), params)]
+            entries: dict[str, IndexedReport] = {}
+            paths = [path for path, _ in ranked]
+            for start in range(0, len(paths), _SQL_CHUNK):
+                stmt = select(IndexedReport).where(col(IndexedReport.path).in_(paths[start : start + _SQL_CHUNK]))
+                entries.update((entry.path, entry) for entry in session.exec(stmt))
+        return [(entries[path], score) for path, score in ranked if path in entries]
+
+    def find_by_note_id(self, note_id: str) -> IndexedReport | None:
+        """note_id の索引行を返す. 無ければ None."""
+        with Session(self._engine) as session:
+            return session.exec(select(IndexedReport).where(IndexedReport.note_id == note_id)).first()
+
+    def find_recent(self, since: datetime, last_day: str) -> list[IndexedReport]:
+        """作成日が last_day 以前で、since 以降に更新された行を返す (作成日が古くても最近更新されたものを含む)."""
+        return list(self.iter_recent(since, last_day))
+
+    def iter_recent(
+        self,
+        since: datetime,
+        last_day: str,
+        *,
+        until: datetime | None = None,
+        newest_first: bool = True,
+    ) -> Iterator[IndexedReport]:
+        """find_recent と同じ条件の行を updated_at の順に遅延で返す."""
+        stmt = select(IndexedReport).where(
+            IndexedReport.day <= last_day,
+            IndexedReport.updated_ts >= to_epoch_us(since),
+        )
+        if until is not None:
+            stmt = stmt.where(IndexedReport.updated_ts <= to_epoch_us(until))
+        if newest_first:
+            stmt = stmt.order_by(col(IndexedReport.updated_ts).desc(), col(IndexedReport.note_id).desc())
+        else:
+            stmt = stmt.order_by(col(IndexedReport.updated_ts), col(IndexedReport.note_id))
+        with Session(self._engine) as session:
+            yield from session.exec(stmt)
+
+    def query(self, spec: ReportQuery, last_day: str | None = None) -> Iterator[IndexedReport]:
+        """検索条件に合う行を、絞り込み・並べ替え・件数制限まで SQLite で行って返す.
+
+        last_day を指定すると、作成日がその日 (YYYY-MM-DD) より後の行を対象外にする。
+        行は _QUERY_BATCH 件ずつカーソルから読むので、件数が多くても使うメモリは一定。
+        """
+        stmt = select(IndexedReport)
+        if spec.since is not None:
+            stmt = stmt.where(IndexedReport.updated_ts >= to_epoch_us(spec.since))
+        if spec.until is not None:
+            stmt = stmt.where(IndexedReport.updated_ts <= to_epoch_us(spec.until))
+        if last_day is not None:
+            stmt = stmt.where(IndexedReport.day <= last_day)
+        if spec.report_type is not None:
+            stmt = stmt.where(IndexedReport.type == spec.report_type.value)
+        if spec.author is not None:
+            stmt = stmt.where(IndexedReport.author == spec.author.value)
+        stmt = stmt.where(*_tag_conditions(spec))
+        if spec.after is not None:
+            # (updated_ts, note_id) の複合インデックスを範囲で辿る
+            key = tuple_(col(IndexedReport.updated_ts), col(IndexedReport.note_id))
+            after = tuple_(to_epoch_us(spec.after.updated_at), spec.after.note_id)
+            stmt = stmt.where(key < after if spec.newest_first else key > after)
+        if spec.newest_first:
+            stmt = stmt.order_by(col(IndexedReport.updated_ts).desc(), col(IndexedReport.note_id).desc())
+        else:
+            stmt = stmt.order_by(col(IndexedReport.updated_ts), col(IndexedReport.note_id))
+        if spec.limit is not None:
+            stmt = stmt.limit(spec.limit)
+        with Session(self._engine) as session:
+            yield from session.exec(stmt.execution_options(yield_per=_QUERY_BATCH))
+
+    def _upsert(self, rows: list[dict[str, Any]], texts: Mapping[str, FullText]) -> None:
+        if not rows:
+            return
+        stmt = insert(IndexedReport)
+        table = SQLModel.metadata.tables[IndexedReport.__tablename__]
+        updatable = [c.name for c in table.columns if c.name != "path"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["path"],
+            set_={name: stmt.excluded[name] for name in updatable},
+        )
+        fts_rows = [
+            {"rowid": _doc_id(row["path"]), "path": row["path"], **texts[row["path"]].columns()} for row in rows
+        ]
+        with Session(self._engine) as session:
+            delta = _rollup_delta(_stat_keys(session, [row["path"] for row in rows]), sign=-1)
+            delta.update(_rollup_delta(((row["day"], row["type"], row["author"], row["tags"]) for row in rows), sign=1))
+            session.execute(stmt, rows)
+            _apply_rollup_delta(session, delta)
+            _delete_tag_postings(session, [row["doc_id"] for row in rows])
+            _insert_tag_postings(session, rows)
+            _delete_fts(session, [row["path"] for row in rows])
+            session.execute(
+                text(
+                    f"INSERT INTO {_FTS_TABLE} (rowid, path, title, body, tags) "  # noqa: S608
+                    "VALUES (:rowid, :path, :title, :body, :tags)"
+                ),
+                fts_rows,
+            )
+            _next_generation(session)
+            session.commit()
+
+    def _ensure_schema(self) -> None:
+        tables = [
+            SQLModel.metadata.tables[model.__tablename__]
+            for model in (IndexedReport, Tag, TagPosting, DailyStat, IndexState)  # pyright: ignore[reportAttributeAccessIssue]
+        ]
+        SQLModel.metadata.create_all(self._engine, tables=tables)
+        with Session(self._engine) as session:
+            version = session.get(IndexState, "schema_version")
+            if version is not None and version.value == str(SCHEMA_VERSION):
+                return
+
+        # 索引はキャッシュなので、スキーマが変わったら捨てて作り直す
+        SQLModel.metadata.drop_all(self._engine, tables=tables)
+        SQLModel.metadata.create_all(self._engine, tables=tables)
+        with Session(self._engine) as session:
+            session.execute(text(f"DROP TABLE IF EXISTS {_FTS_TABLE}"))
+            # bigram は英数字・かな・漢字だけからなるので、unicode61 でそのまま 1 トークンになる
+            session.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE {_FTS_TABLE} USING fts5("
+                    "path UNINDEXED, title, body, tags, tokenize = 'unicode61 remove_diacritics 0')"
+                )
+            )
+            session.add(IndexState(key="schema_version", value=str(SCHEMA_VERSION)))
+            session.commit()
+
+
+def _doc_id(path: str) -> int:
+    """パスから FTS5 の rowid を決める (パスが同じなら常に同じ値になる)."""
+    return int.from_bytes(hashlib.blake2b(path.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def _next_generation(session: Session) -> None:
+    """索引の世代を進める. 値は重複しないランダムな文字列なので、索引を作り直しても過去の世代と一致しない."""
+    session.merge(IndexState(key=_GENERATION_KEY, value=uuid.uuid4().hex))
+
+
+def _stat_keys(session: Session, paths: list[str]) -> list[tuple[str, str, str, Sequence[str]]]:
+    """索引済みの行の (作成日, 種別, 作成者, タグ) を取得する."""
+    keys: list[tuple[str, str, str, Sequence[str]]] = []
+    for start in range(0, len(paths), _SQL_CHUNK):
+        stmt = select(IndexedReport.day, IndexedReport.type, IndexedReport.author, IndexedReport.tags).where(
+            col(IndexedReport.path).in_(paths[start : start + _SQL_CHUNK])
+        )
+        keys.extend(session.exec(stmt))
+    return keys
+
+
+def _rollup_delta(keys: Iterable[tuple[str, str, str, Sequence[str]]], sign: int) -> Counter[tuple[str, str, str]]:
+    """(作成日, 種別, 作成者, タグ) の列を、日ごとの集計 (作成日, 軸, 値) の増減にする."""
+    delta: Counter[tuple[str, str, str]] = Counter()
+    for day, report_type, author, tags in keys:
+        delta[day, "type", report_type] += sign
+        delta[day, "author", author] += sign
+        for tag in set(tags):
+            delta[day, "tag", tag] += sign
+    return delta
+
+
+def _apply_rollup_delta(session: Session, delta: Counter[tuple[str, str, str]]) -> None:
+    rows = [
+        {"day": day, "dimension": dimension, "value": value, "count": count}
+        for (day, dimension, value), count in delta.items()
+        if count != 0
+    ]
+    if not rows:
+        return
+    stmt = insert(DailyStat)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "dimension", "value"],
+        set_={"count": col(DailyStat.count) + stmt.excluded.count},
+    )
+    session.execute(stmt, rows)
+    days = list({row["day"] for row in rows})
+    for start in range(0, len(days), _SQL_CHUNK):
+        session.execute(
+            delete(DailyStat).where(col(DailyStat.day).in_(days[start : start + _SQL_CHUNK]), col(DailyStat.count) <= 0)
+        )
+
+
+def _tag_conditions(spec: ReportQuery) -> list[ColumnElement[bool]]:
+    """タグの条件を、転置リストの積 (all)・和 (any)・差 (exclude_tags) で求めた doc_id への条件にする."""
+    doc_id = col(IndexedReport.doc_id)
+    conditions: list[ColumnElement[bool]] = [doc_id.not_in(_tag_postings(pattern)) for pattern in spec.exclude_tags]
+    if not spec.tags:
+        return conditions
+    postings = [_tag_postings(pattern) for pattern in spec.tags]
+    if len(postings) == 1:
+        conditions.append(doc_id.in_(postings[0]))
+    elif spec.tag_match == "all":
+        conditions.append(doc_id.in_(intersect(*postings)))
+    else:
+        conditions.append(doc_id.in_(union(*postings)))
+    return conditions
+
+
+def _tag_postings(pattern: str) -> SelectOfScalar[int]:
+    """タグの転置リスト (doc_id) を引く SELECT. 末尾が '*' のパターンは前方一致する全タグの和になる."""
+    stmt = select(TagPosting.doc_id).join(Tag, col(Tag.tag_id) == col(TagPosting.tag_id))
+    prefix = tag_prefix(pattern)
+    if prefix is None:
+        return stmt.where(Tag.name == pattern)
+    # name の一意インデックスを範囲検索で使う (U+10FFFF はどの文字よりも後ろに並ぶ)
+    return stmt.where(Tag.name >= prefix, Tag.name < prefix + "\U0010ffff")
+
+
+def _insert_tag_postings(session: Session, rows: list[dict[str, Any]]) -> None:
+    names = {tag for row in rows for tag in row["tags"]}
+    if not names:
+        return
+    session.execute(insert(Tag).on_conflict_do_nothing(index_elements=["name"]), [{"name": n} for n in names])
+    tag_ids: dict[str, int] = {}
+    name_list = list(names)
+    for start in range(0, len(name_list), _SQL_CHUNK):
+        stmt = select(Tag.name, Tag.tag_id).where(col(Tag.name).in_(name_list[start : start + _SQL_CHUNK]))
+        tag_ids.update((name, tag_id) for name, tag_id in session.execute(stmt) if tag_id is not None)
+    postings = [{"tag_id": tag_ids[tag], "doc_id": row["doc_id"]} for row in rows for tag in set(row["tags"])]
+    session.execute(insert(TagPosting), postings)
+
+
+def _delete_tag_postings(session: Session, doc_ids: list[int]) -> None:
+    for start in range(0, len(doc_ids), _SQL_CHUNK):
+        session.execute(delete(TagPosting).where(col(TagPosting.doc_id).in_(doc_ids[start : start + _SQL_CHUNK])))
+
+
+def _delete_fts(session: Session, paths: list[str]) -> None:
+    stmt = text(f"DELETE FROM {_FTS_TABLE} WHERE rowid IN :rowids").bindparams(bindparam("rowids", expanding=True))  # noqa: S608
+    for start in range(0, len(paths), _SQL_CHUNK):
+        session.execute(stmt, {"rowids": [_doc_id(path) for path in paths[start : start + _SQL_CHUNK]]})
+
+
+def _set_sqlite_pragmas(dbapi_connection: sqlite3.Connection, _connection_record: object) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
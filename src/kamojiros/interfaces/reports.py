@@ -2,13 +2,163 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Protocol
+import base64
+from dataclasses import dataclass
+from datetime import datetime  # noqa: TC003 - ReportCursor を pydantic のモデルのフィールドに使う
+from typing import TYPE_CHECKING, Literal, Protocol
+
+from kamojiros.core.time import from_epoch_us, to_epoch_us
 
 if TYPE_CHECKING:
-    from datetime import datetime
+    from collections.abc import Iterable, Iterator
     from pathlib import Path
 
-    from kamojiros.models import Report
+    from kamojiros.core.catalog import ReportCatalog
+    from kamojiros.core.fulltext import Snippet
+    from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportStats, ReportType
+
+type TagMatch = Literal["any", "all"]
+type SearchField = Literal["title", "body", "tags"]
+type SearchOrder = Literal["relevance", "recent"]  # relevance: 関連の強い順, recent: updated_at の新しい順
+
+ALL_SEARCH_FIELDS: frozenset[SearchField] = frozenset({"title", "body", "tags"})
+
+
+class ReportNotFoundError(LookupError):
+    """指定した note_id の Report が見つからない."""
+
+
+@dataclass(frozen=True)
+class ReportCursor:
+    """一覧の続きを読む位置. 最後に返した Report の (updated_at, note_id).
+
+    encode した文字列は不透明なトークンとして CLI の --after などで受け渡す。
+    """
+
+    updated_at: datetime
+    note_id: str
+
+    @classmethod
+    def of(cls, meta: ReportMeta) -> ReportCursor:
+        """Meta の Report の次から続けるカーソル."""
+        return cls(meta.updated_at, meta.note_id)
+
+    @classmethod
+    def decode(cls, token: str) -> ReportCursor:
+        """Encode したトークンからカーソルを復元する. 不正なトークンなら ValueError."""
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        updated_us, _, note_id = raw.partition(":")
+        msg = f"invalid cursor: {token!r}"
+        if not note_id:
+            raise ValueError(msg)
+        try:
+            updated_at = from_epoch_us(int(updated_us))
+        except OverflowError:
+            # datetime で表せない範囲の時刻 (手で作ったトークンなど)
+            raise ValueError(msg) from None
+        return cls(updated_at, note_id)
+
+    def encode(self) -> str:
+        """URL やコマンドラインにそのまま書けるトークンにする."""
+        raw = f"{to_epoch_us(self.updated_at)}:{self.note_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def passed(self, meta: ReportMeta, *, newest_first: bool = True) -> bool:
+        """Meta の Report が、(updated_at, note_id) の順でこのカーソルより後に並ぶか."""
+        key, mine = (meta.updated_at, meta.note_id), (self.updated_at, self.note_id)
+        return key < mine if newest_first else key > mine
+
+
+@dataclass(frozen=True)
+class ReportQuery:
+    """Report の検索条件.
+
+    since / until は updated_at に対する条件 (両端を含む) で、作成日が古くても最近更新された Report は対象になる。
+    ただし索引が無い場合は作成日が since の日付以降のディレクトリだけを読む。None の条件は絞り込まない。
+    after はキーセットによるページングで、このカーソルより後に並ぶ Report だけを対象にする。
+    """
+
+    since: datetime | None = None
+    until: datetime | None = None
+    report_type: ReportType | None = None
+    author: ReportAuthor | None = None
+    tags: tuple[str, ...] = ()  # 末尾が '*' のタグ (例: 'python/*') は前方一致
+    tag_match: TagMatch = "any"  # any: いずれかのタグを含む, all: すべてのタグを含む
+    exclude_tags: tuple[str, ...] = ()  # いずれかを含むものを除く
+    newest_first: bool = True  # updated_at (同時刻なら note_id) の降順に並べる
+    limit: int | None = None
+    after: ReportCursor | None = None
+
+    def matches(self, meta: ReportMeta) -> bool:
+        """メタデータが条件を満たすかどうか."""
+        if self.since is not None and meta.updated_at < self.since:
+            return False
+        if self.until is not None and meta.updated_at > self.until:
+            return False
+        if self.after is not None and not self.after.passed(meta, newest_first=self.newest_first):
+            return False
+        if self.report_type is not None and meta.type != self.report_type:
+            return False
+        if self.author is not None and meta.author != self.author:
+            return False
+        return self._matches_tags(meta.tags)
+
+    def _matches_tags(self, tags: list[str]) -> bool:
+        if any(_has_tag(tags, pattern) for pattern in self.exclude_tags):
+            return False
+        if not self.tags:
+            return True
+        found = (_has_tag(tags, pattern) for pattern in self.tags)
+        return all(found) if self.tag_match == "all" else any(found)
+
+
+def tag_prefix(pattern: str) -> str | None:
+    """タグのパターンが前方一致 (末尾が '*') なら接頭辞を、そうでなければ None を返す."""
+    return pattern[:-1] if pattern.endswith("*") else None
+
+
+def _has_tag(tags: list[str], pattern: str) -> bool:
+    prefix = tag_prefix(pattern)
+    if prefix is None:
+        return pattern in tags
+    return any(tag.startswith(prefix) for tag in tags)
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """全文検索の条件.
+
+    keyword は正規化 (NFKC + casefold) したうえで部分一致させる。空白や記号で区切られた語はすべてを含むものが一致する。
+    since / until は ReportQuery と同じく updated_at に対する条件 (両端を含む)。None の条件は絞り込まない。
+    after は order が recent のときのページングで、このカーソルより古い Report だけを対象にする。
+    関連の強い順の結果はカーソルで続きを読めないので、order が relevance で after を渡すと ValueError。
+    """
+
+    keyword: str
+    fields: frozenset[SearchField] = ALL_SEARCH_FIELDS
+    since: datetime | None = None
+    until: datetime | None = None
+    limit: int | None = None
+    order: SearchOrder = "relevance"
+    after: ReportCursor | None = None
+
+    def __post_init__(self) -> None:
+        """ページングのカーソル after が order と矛盾しないことを確かめる."""
+        if self.after is not None and self.order != "recent":
+            msg = f"after requires order='recent', not {self.order!r}"
+            raise ValueError(msg)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """全文検索の結果 1 件.
+
+    score は大きいほど関連が強い。snippet は本文 (本文が検索対象でなければタイトル) の一致箇所。
+    """
+
+    report: Report
+    score: float
+    snippet: Snippet | None
 
 
 class ReportRepository(Protocol):
@@ -18,6 +168,69 @@ class ReportRepository(Protocol):
         """Report を保存し、生成されたパスを返す."""
         ...
 
+    def save_many(self, reports: Iterable[Report], *, jobs: int = 1) -> list[Path]:
+        """複数の Report をまとめて保存し、生成されたパスを reports の順に返す.
+
+        jobs はファイルを並行に書くスレッド数。
+        """
+        ...
+
+    def get(self, note_id: str) -> Report | None:
+        """note_id の Report を取得する. 無ければ None."""
+        ...
+
+    def update(
+        self,
+        note_id: str,
+        *,
+        title: str | None = None,
+        body: str | None = None,
+        tags: list[str] | None = None,
+    ) -> Report:
+        """note_id の Report の指定した項目を書き換え、updated_at を現在時刻にして保存する.
+
+        Report が無ければ ReportNotFoundError。
+        """
+        ...
+
     def find_recent(self, since: datetime) -> list[Report]:
         """指定した日時以降に作成・更新された Report を取得する."""
         ...
+
+    def find_recent_meta(self, since: datetime) -> list[ReportMeta]:
+        """find_recent と同じ条件で、本文を含まないメタデータだけを取得する."""
+        ...
+
+    def iter_reports(
+        self,
+        since: datetime,
+        until: datetime | None = None,
+        *,
+        newest_first: bool = True,
+    ) -> Iterator[Report]:
+        """指定した期間に更新された Report を新しい順 (または古い順) に遅延で返す."""
+        ...
+
+    def query(self, spec: ReportQuery) -> list[Report]:
+        """条件に合う Report を spec の順序で最大 spec.limit 件取得する."""
+        ...
+
+    def iter_query(self, spec: ReportQuery) -> Iterator[Report]:
+        """Query と同じ Report を、すべてを読み終える前から 1 件ずつ遅延で返す."""
+        ...
+
+    def search(self, spec: SearchQuery) -> list[SearchHit]:
+        """全文検索し、spec.order の順 (既定は関連の強い順) に最大 spec.limit 件返す."""
+        ...
+
+    def stats(self, since: datetime, until: datetime) -> ReportStats:
+        """作成日時が since から until まで (両端を含む) の Report を種別・作成者・タグ別に集計する."""
+        ...
+
+    def catalog(self, since: datetime | None = None) -> ReportCatalog:
+        """Report のメタデータを列ごとに持つカタログを返す (集計用).
+
+        since を渡した場合、作成日時が since 以降の Report だけが最新であることを保証する
+        (索引の更新をその範囲に絞るので、それより前の Report は古いままのことがある)。
+        """
+        ...
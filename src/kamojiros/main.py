@@ -1,25 +1,48 @@
-"""Kamojiros CLI メインエントリーポイント."""
+"""Kamojiros CLI メインエントリーポイント.
+
+コマンドのモジュールは、そのコマンドを実行するときに初めて読み込む (--help だけなら typer しか読み込まない)。
+"""
 
 from __future__ import annotations
 
+from typing import ClassVar
+
 import typer
 
-from kamojiros.cli.create import create
-from kamojiros.cli.list import list_reports
-from kamojiros.cli.search import search
-from kamojiros.cli.stats import stats
+from kamojiros.cli.lazy import LazyCommand, LazyTyperGroup
+
+
+class _Commands(LazyTyperGroup):
+    # コマンド登録
+    lazy_commands: ClassVar[dict[str, LazyCommand]] = {
+        "create": LazyCommand("kamojiros.cli.create:create", "Create a new report"),
+        "list": LazyCommand("kamojiros.cli.list:list_reports", "List reports"),
+        "search": LazyCommand("kamojiros.cli.search:search", "Search reports by keyword"),
+        "stats": LazyCommand("kamojiros.cli.stats:stats", "Show statistics"),
+        "import": LazyCommand(
+            "kamojiros.cli.imports:import_reports", "Import notes from a Markdown directory or a JSONL dump"
+        ),
+        "compact": LazyCommand(
+            "kamojiros.cli.compact:compact", "Pack closed months of the journal into one file per month"
+        ),
+        "serve": LazyCommand(
+            "kamojiros.cli.serve:serve", "Keep the index warm and answer list/search/stats over a Unix socket"
+        ),
+        "index": LazyCommand("kamojiros.cli.index:index_app", "Manage the metadata index"),
+    }
+
 
 app = typer.Typer(
     name="kamojiros",
     help="Kamojiros - Personal Research Agent",
     no_args_is_help=True,
+    cls=_Commands,
 )
 
-# コマンド登録
-app.command(name="create", help="Create a new report")(create)
-app.command(name="list", help="List reports")(list_reports)
-app.command(name="search", help="Search reports by keyword")(search)
-app.command(name="stats", help="Show statistics")(stats)
+
+@app.callback()
+def _root() -> None:
+    """コマンドを lazy_commands から引くために、app をグループにする."""
 
 
 def main() -> None:
@@ -1,9 +1,14 @@
 """Kamojiros Notes のノートを表すモデル群."""
 
+from collections import Counter
 from datetime import datetime  # noqa: TC003
 from enum import StrEnum
+from typing import TYPE_CHECKING, Any, Protocol
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, PrivateAttr, SerializerFunctionWrapHandler, model_serializer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
 
 
 class ReportType(StrEnum):
@@ -38,13 +43,88 @@ class ReportMeta(BaseModel):
     tags: list[str] = []
     source_urls: list[HttpUrl] = []
 
+    @classmethod
+    def from_trusted(cls, values: dict[str, Any]) -> ReportMeta:
+        """検証済みの値 (索引など自前で書いたデータ) から検証を省いて作る.
+
+        values にはすべてのフィールドを、型を変換した状態で渡すこと。
+        """
+        return _construct_trusted(cls, values)
+
+
+class BodySource(Protocol):
+    """本文を遅延して読み出すためのインターフェイス."""
+
+    def read(self) -> str:
+        """本文全体を読む."""
+        ...
+
+    def read_head(self, length: int) -> str:
+        """本文の先頭 length 文字だけを読む."""
+        ...
+
 
 class Report(BaseModel):
-    """Kamojiros Notes のノート."""
+    """Kamojiros Notes のノート.
+
+    with_lazy_body で作った場合、body_markdown は初回アクセス時に読み込まれる。
+    """
 
     meta: ReportMeta
     body_markdown: str
 
+    _body_source: BodySource | None = PrivateAttr(default=None)
+
+    @classmethod
+    def with_lazy_body(cls, meta: ReportMeta, body_source: BodySource) -> Report:
+        """本文を初回アクセス時に body_source から読み込む Report を作る."""
+        return _construct_trusted(cls, {"meta": meta}, private={"_body_source": body_source})
+
+    @property
+    def is_body_loaded(self) -> bool:
+        """本文が読み込み済みかどうか."""
+        return "body_markdown" in self.__dict__
+
+    def body_preview(self, length: int) -> str:
+        """本文の先頭 length 文字を返す. 未読み込みなら先頭だけを読む."""
+        if self.is_body_loaded or self._body_source is None:
+            return self.body_markdown[:length]
+        return self._body_source.read_head(length)
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> dict[str, Any]:
+        # シリアライズ前に遅延読み込みの本文を確定させる
+        _ = self.body_markdown
+        return handler(self)
+
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+            """未読み込みの body_markdown へのアクセス時に本文を読み込む."""
+            if name == "body_markdown" and self.__pydantic_private__ is not None:
+                body_source = self.__pydantic_private__.get("_body_source")
+                if body_source is not None:
+                    body = body_source.read()
+                    self.__dict__["body_markdown"] = body
+                    self.__pydantic_fields_set__.add("body_markdown")
+                    return body
+            return super().__getattr__(name)
+
+
+def _construct_trusted[M: BaseModel](
+    model: type[M], values: dict[str, Any], private: dict[str, Any] | None = None
+) -> M:
+    """検証を省いてモデルを作る.
+
+    model_construct と同じ状態のインスタンスになるが、既定値や別名の処理をしないぶん速い。
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", private)
+    return instance
+
 
 class ReportStats(BaseModel):
     """レポート統計情報."""
@@ -55,38 +135,89 @@ class ReportStats(BaseModel):
     by_type: dict[str, int]
     by_author: dict[str, int]
     top_tags: dict[str, int]
+    # すべてのタグの件数. combine で足し合わせるためだけに持ち、JSON などには書き出さない
+    tag_counts: dict[str, int] = Field(default_factory=dict, exclude=True)
 
     @classmethod
     def from_reports(cls, reports: list[Report], period_start: datetime, period_end: datetime) -> ReportStats:
         """レポートリストから統計を生成する."""
+        return cls.from_metas([r.meta for r in reports], period_start=period_start, period_end=period_end)
+
+    @classmethod
+    def from_metas(cls, metas: list[ReportMeta], period_start: datetime, period_end: datetime) -> ReportStats:
+        """メタデータのリストから統計を生成する."""
         type_counts: dict[str, int] = {}
         author_counts: dict[str, int] = {}
         tag_counts: dict[str, int] = {}
 
-        for r in reports:
+        for m in metas:
             # Type
-            t = r.meta.type.value
+            t = m.type.value
             type_counts[t] = type_counts.get(t, 0) + 1
 
             # Author
-            a = r.meta.author.value
+            a = m.author.value
             author_counts[a] = author_counts.get(a, 0) + 1
 
             # Tags
-            for tag in r.meta.tags:
+            for tag in m.tags:
                 tag_counts[tag] = tag_counts.get(tag, 0) + 1
 
+        return cls.from_counts(
+            total_count=len(metas),
+            by_type=type_counts,
+            by_author=author_counts,
+            tag_counts=tag_counts,
+            period_start=period_start,
+            period_end=period_end,
+        )
+
+    @classmethod
+    def from_counts(
+        cls,
+        *,
+        total_count: int,
+        by_type: Mapping[str, int],
+        by_author: Mapping[str, int],
+        tag_counts: Mapping[str, int],
+        period_start: datetime,
+        period_end: datetime,
+    ) -> ReportStats:
+        """集計済みの件数から統計を生成する."""
         # タグを頻度順にソートして上位10件
         sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
         top_tags = dict(sorted_tags[:10])
 
         return cls(
-            total_count=len(reports),
+            total_count=total_count,
             period_start=period_start,
             period_end=period_end,
-            by_type=type_counts,
-            by_author=author_counts,
+            by_type=dict(by_type),
+            by_author=dict(by_author),
             top_tags=top_tags,
+            tag_counts=dict(tag_counts),
+        )
+
+    @classmethod
+    def combine(cls, stats: Iterable[ReportStats], period_start: datetime, period_end: datetime) -> ReportStats:
+        """同じ期間について別々に集計した統計を足し合わせる."""
+        total_count = 0
+        by_type: Counter[str] = Counter()
+        by_author: Counter[str] = Counter()
+        tag_counts: Counter[str] = Counter()
+        for s in stats:
+            total_count += s.total_count
+            by_type.update(s.by_type)
+            by_author.update(s.by_author)
+            tag_counts.update(s.tag_counts)
+
+        return cls.from_counts(
+            total_count=total_count,
+            by_type=by_type,
+            by_author=by_author,
+            tag_counts=tag_counts,
+            period_start=period_start,
+            period_end=period_end,
         )
 
 
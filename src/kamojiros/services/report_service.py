@@ -7,10 +7,22 @@ from typing import TYPE_CHECKING
 
 from kamojiros.core.naming import make_note_id
 from kamojiros.core.time import now_jst
+from kamojiros.interfaces.reports import ReportQuery, SearchQuery
 from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportStats, ReportType
 
 if TYPE_CHECKING:
-    from kamojiros.interfaces.reports import ReportRepository
+    from collections.abc import Iterator
+    from datetime import date
+
+    from kamojiros.core.catalog import GroupBy
+    from kamojiros.interfaces.reports import (
+        ReportCursor,
+        ReportRepository,
+        SearchField,
+        SearchHit,
+        SearchOrder,
+        TagMatch,
+    )
 
 
 class ReportService:
@@ -54,32 +66,40 @@ class ReportService:
         report_type: ReportType | None = None,
         author: ReportAuthor | None = None,
         tags: list[str] | None = None,
+        *,
+        tag_match: TagMatch = "any",
+        exclude_tags: list[str] | None = None,
+        after: ReportCursor | None = None,
     ) -> list[Report]:
-        """レポート一覧を取得する（フィルタリング付き）."""
-        # sinceが指定されていない場合は過去30日間
-        if since is None:
-            since = now_jst() - timedelta(days=30)
-
-        reports = self._report_repo.find_recent(since)
-
-        # フィルタリング
-        if report_type is not None:
-            reports = [r for r in reports if r.meta.type == report_type]
-
-        if author is not None:
-            reports = [r for r in reports if r.meta.author == author]
-
-        if tags:
-            reports = [r for r in reports if any(tag in r.meta.tags for tag in tags)]
-
-        # 新しい順にソート
-        reports = sorted(reports, key=lambda r: r.meta.updated_at, reverse=True)
-
-        # limit適用
-        if limit is not None:
-            reports = reports[:limit]
+        """レポート一覧を取得する（フィルタリング付き）.
+
+        tags は tag_match が any ならいずれか、all ならすべてを含むものに絞り込み、exclude_tags を含むものは除く。
+        末尾が '*' のタグは前方一致する。after を指定すると、前のページの最後のレポートの次から返す。
+        """
+        return self._report_repo.query(
+            _list_query(
+                limit, since, report_type, author, tags, tag_match=tag_match, exclude_tags=exclude_tags, after=after
+            )
+        )
 
-        return reports
+    def stream_reports(
+        self,
+        limit: int | None = None,
+        since: datetime | None = None,
+        report_type: ReportType | None = None,
+        author: ReportAuthor | None = None,
+        tags: list[str] | None = None,
+        *,
+        tag_match: TagMatch = "any",
+        exclude_tags: list[str] | None = None,
+        after: ReportCursor | None = None,
+    ) -> Iterator[Report]:
+        """list_reports と同じレポートを、リポジトリから読んだ順に 1 件ずつ返す (すべてをメモリに載せない)."""
+        return self._report_repo.iter_query(
+            _list_query(
+                limit, since, report_type, author, tags, tag_match=tag_match, exclude_tags=exclude_tags, after=after
+            )
+        )
 
     def search_reports(
         self,
@@ -88,40 +108,88 @@ class ReportService:
         search_in_title: bool = True,
         search_in_body: bool = True,
         search_in_tags: bool = True,
-    ) -> list[Report]:
-        """キーワードでレポートを検索する."""
-        # 過去1年分を検索対象とする
-        since = now_jst() - timedelta(days=365)
-        reports = self._report_repo.find_recent(since)
-
-        keyword_lower = keyword.lower()
-        results = []
-
-        for report in reports:
-            match = False
-
-            if search_in_title and keyword_lower in report.meta.title.lower():
-                match = True
+        since: datetime | None = None,
+        until: datetime | None = None,
+        all_time: bool = False,
+        limit: int | None = None,
+        order: SearchOrder = "relevance",
+        after: ReportCursor | None = None,
+    ) -> list[SearchHit]:
+        """キーワードでレポートを全文検索し、関連の強い順 (order が recent なら新しい順) に返す.
+
+        since も all_time も指定しない場合は過去 1 年分を検索対象とする。
+        after は order が recent のときだけ指定でき、前のページの最後のレポートより古いものを返す
+        (関連の強い順で after を指定すると ValueError)。
+        """
+        if since is None and not all_time:
+            since = now_jst() - timedelta(days=365)
+
+        fields: set[SearchField] = set()
+        if search_in_title:
+            fields.add("title")
+        if search_in_body:
+            fields.add("body")
+        if search_in_tags:
+            fields.add("tags")
+
+        spec = SearchQuery(
+            keyword=keyword,
+            fields=frozenset(fields),
+            since=since,
+            until=until,
+            limit=limit,
+            order=order,
+            after=after,
+        )
+        return self._report_repo.search(spec)
 
-            if search_in_body and keyword_lower in report.body_markdown.lower():
-                match = True
+    def get_statistics(self, since: datetime | None = None) -> ReportStats:
+        """統計情報を取得する."""
+        if since is None:
+            since = now_jst() - timedelta(days=30)
 
-            if search_in_tags:
-                for tag in report.meta.tags:
-                    if keyword_lower in tag.lower():
-                        match = True
-                        break
+        return self._report_repo.stats(since, now_jst())
 
-            if match:
-                results.append(report)
+    def get_timeline(self, group_by: GroupBy, since: datetime | None = None) -> list[tuple[date, int]]:
+        """作成件数を日・週・月ごとに数える (件数 0 の区切りも含む)."""
+        if since is None:
+            since = now_jst() - timedelta(days=30)
 
-        # 新しい順にソート
-        return sorted(results, key=lambda r: r.meta.updated_at, reverse=True)
+        return self._report_repo.catalog(since).timeline(since, now_jst(), group_by)
 
-    def get_statistics(self, since: datetime | None = None) -> ReportStats:
-        """統計情報を取得する."""
+    def get_crosstab(self, since: datetime | None = None) -> dict[tuple[ReportType, ReportAuthor], int]:
+        """作成件数を種別 x 作成者ごとに数える."""
         if since is None:
             since = now_jst() - timedelta(days=30)
 
-        reports = self._report_repo.find_recent(since)
-        return ReportStats.from_reports(reports, period_start=since, period_end=now_jst())
+        return self._report_repo.catalog(since).crosstab(since, now_jst())
+
+
+def _list_query(
+    limit: int | None,
+    since: datetime | None,
+    report_type: ReportType | None,
+    author: ReportAuthor | None,
+    tags: list[str] | None,
+    *,
+    tag_match: TagMatch,
+    exclude_tags: list[str] | None,
+    after: ReportCursor | None,
+) -> ReportQuery:
+    """list_reports / stream_reports の条件. since が無ければ過去 30 日間."""
+    # sinceが指定されていない場合は過去30日間
+    if since is None:
+        since = now_jst() - timedelta(days=30)
+
+    # フィルタリング・並べ替え・limit はリポジトリ側で行う
+    return ReportQuery(
+        since=since,
+        report_type=report_type,
+        author=author,
+        tags=tuple(tags or ()),
+        tag_match=tag_match,
+        exclude_tags=tuple(exclude_tags or ()),
+        newest_first=True,
+        limit=limit,
+        after=after,
+    )
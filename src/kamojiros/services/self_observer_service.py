@@ -29,11 +29,10 @@ class SelfObserverService:
         now = now_jst()
         since = now - timedelta(hours=24)
 
-        # 直近のレポートを取得
-        recent_reports = self._report_repo.find_recent(since)
-
-        # 集計
-        stats = ReportStats.from_reports(recent_reports, period_start=since, period_end=now)
+        # 直近に作成・更新されたレポートを集計する (古いノートの編集も活動に数えるので、作成日の集計は使わない)
+        # 本文は使わないので、メタデータだけを読む
+        recent_metas = self._report_repo.find_recent_meta(since)
+        stats = ReportStats.from_metas(recent_metas, period_start=since, period_end=now)
 
         # レポート本文作成
         lines = [
@@ -0,0 +1,95 @@
+"""列ごとに持つカタログとスナップショットのテスト."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+
+from kamojiros.core.catalog import CatalogRow, ReportCatalog
+from kamojiros.core.time import JST, to_epoch_us
+from kamojiros.models import ReportAuthor, ReportType
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _row(day: int, report_type: str, author: str, tags: list[str]) -> CatalogRow:
+    created = to_epoch_us(datetime(2025, 3, day, 9, 0, 0, tzinfo=JST))
+    return created, created, report_type, author, tags, f"タイトル {day}", f"note-{day}"
+
+
+def _catalog() -> ReportCatalog:
+    # 作成日時の順に並べ直されることも確かめるため、逆順に渡す
+    return ReportCatalog.from_rows(
+        [
+            _row(31, "life", "user", []),
+            _row(10, "meta", "agent:self_observer", ["python"]),
+            _row(4, "tech", "user", ["python", "cli", "python"]),
+            _row(3, "tech", "user", ["cli"]),
+        ],
+        generation="g1",
+    )
+
+
+def test_catalog_aggregates_by_created_range() -> None:
+    """期間の絞り込み・タグの件数・種別 x 作成者の件数を検証する."""
+    catalog = _catalog()
+    since = datetime(2025, 3, 3, 12, 0, 0, tzinfo=JST)
+    until = datetime(2025, 3, 31, tzinfo=JST)
+
+    assert [catalog.note_ids[i] for i in catalog.span(since, until)] == ["note-4", "note-10"]
+    assert catalog.tag_counts(since, until) == {"python": 2, "cli": 1}
+    assert catalog.crosstab(since, until) == {
+        (ReportType.TECH, ReportAuthor.USER): 1,
+        (ReportType.META, ReportAuthor.SELF_OBSERVER): 1,
+    }
+    assert catalog.stats(since, until).by_type == {"tech": 1, "meta": 1}
+
+
+def test_catalog_timeline_includes_empty_buckets() -> None:
+    """日・週・月ごとの件数が、件数 0 の区切りも含めて返ることを検証する."""
+    catalog = _catalog()
+    since = datetime(2025, 2, 27, tzinfo=JST)
+    until = datetime(2025, 3, 31, 23, 59, tzinfo=JST)
+
+    assert catalog.timeline(since, until, "month") == [(date(2025, 2, 27), 0), (date(2025, 3, 1), 4)]
+    assert catalog.timeline(since, until, "week")[:3] == [
+        (date(2025, 2, 27), 0),
+        (date(2025, 3, 3), 2),
+        (date(2025, 3, 10), 1),
+    ]
+    days = catalog.timeline(since, until, "day")
+    assert len(days) == 33  # noqa: PLR2004
+    assert dict(days)[date(2025, 3, 4)] == 1
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    """スナップショットから mmap で読み込んだカタログが元のカタログと同じ結果を返すことを検証する."""
+    catalog = _catalog()
+    path = tmp_path / "catalog.bin"
+    catalog.save(path)
+
+    loaded = ReportCatalog.load(path)
+
+    assert loaded is not None
+    assert loaded.generation == "g1"
+    assert len(loaded) == len(catalog)
+    assert list(loaded.titles) == list(catalog.titles)
+    assert list(loaded.created_us) == list(catalog.created_us)
+    since = datetime(2025, 3, 1, tzinfo=JST)
+    until = datetime(2025, 3, 31, 23, 59, tzinfo=JST)
+    assert loaded.stats(since, until) == catalog.stats(since, until)
+    assert loaded.timeline(since, until, "week") == catalog.timeline(since, until, "week")
+
+
+def test_broken_snapshot_is_ignored(tmp_path: Path) -> None:
+    """無い・空・途中で切れたスナップショットは読み込まずに None を返すことを検証する."""
+    path = tmp_path / "catalog.bin"
+    assert ReportCatalog.load(path) is None
+
+    path.write_bytes(b"")
+    assert ReportCatalog.load(path) is None
+
+    _catalog().save(path)
+    path.write_bytes(path.read_bytes()[:-16])
+    assert ReportCatalog.load(path) is None
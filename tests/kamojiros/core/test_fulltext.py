@@ -0,0 +1,38 @@
+"""全文検索用の bigram 分割とスニペット生成のテスト."""
+
+from __future__ import annotations
+
+from kamojiros.core.fulltext import contains_all, make_snippet, query_terms, to_bigram_text, to_match_query
+
+
+def test_to_bigram_text_splits_runs_into_bigrams() -> None:
+    """文字の連なりが bigram と末尾の 1 文字に分かれ、記号と空白で区切られることを検証する."""
+    assert to_bigram_text("全文検索") == "全文 文検 検索 索"
+    assert to_bigram_text("Ｐｙｔｈｏｎ/CLI 版") == "py yt th ho on n cl li i 版"  # noqa: RUF001
+
+
+def test_to_match_query_builds_phrases() -> None:
+    """検索語が連なりごとの bigram フレーズと、1 文字の前方一致になることを検証する."""
+    assert to_match_query("検索") == '"検索"'
+    assert to_match_query("全文検索 a") == '"全文 文検 検索" "a"*'
+    assert to_match_query("!!") is None
+
+
+def test_contains_all_matches_normalized_substrings() -> None:
+    """正規化したテキストに全語を含む場合だけ一致することを検証する."""
+    terms = query_terms("ＳＱＬite 索引")  # noqa: RUF001
+    assert contains_all("SQLite の全文索引", terms)
+    assert not contains_all("SQLite の全文検索", terms)
+
+
+def test_make_snippet_highlights_in_original_text() -> None:
+    """スニペットの強調位置が元のテキスト (全角文字を含む) 上の位置になることを検証する."""
+    text = "前置き。" * 30 + "ここでＰｙｔｈｏｎを使う。" + "後書き。" * 30
+
+    snippet = make_snippet(text, query_terms("python"), width=20)
+
+    assert snippet is not None
+    assert len(snippet.text) == 20  # noqa: PLR2004
+    ((start, end),) = snippet.highlights
+    assert snippet.text[start:end] == "Ｐｙｔｈｏｎ"  # noqa: RUF001
+    assert make_snippet(text, query_terms("rust")) is None
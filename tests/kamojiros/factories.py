@@ -0,0 +1,38 @@
+"""テストで保存・検索する Report を作るヘルパー."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+
+def make_report(
+    created_at: datetime,
+    name: str = "note",
+    *,
+    note_id: str | None = None,
+    title: str | None = None,
+    report_type: ReportType = ReportType.TECH,
+    author: ReportAuthor = ReportAuthor.USER,
+    tags: list[str] | None = None,
+    body: str = "本文",
+) -> Report:
+    """created_at に作成・更新された Report を作る.
+
+    note_id を省略した場合は YYYY-MM-DD-HHMM-<種別>-<name>、title を省略した場合は name にする。
+    """
+    meta = ReportMeta(
+        note_id=note_id if note_id is not None else f"{created_at:%Y-%m-%d-%H%M}-{report_type.value}-{name}",
+        title=title if title is not None else name,
+        created_at=created_at,
+        updated_at=created_at,
+        type=report_type,
+        author=author,
+        tags=tags if tags is not None else [],
+        source_urls=[],
+    )
+    return Report(meta=meta, body_markdown=body)
@@ -0,0 +1,120 @@
+"""Git の差分による索引更新のテスト."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.change_detector import GitChangeDetector
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GIT = shutil.which("git")
+
+pytestmark = pytest.mark.skipif(GIT is None, reason="git is not available")
+
+
+def _git(repo_root: Path, *args: str) -> None:
+    assert GIT is not None
+    subprocess.run(  # noqa: S603
+        [GIT, "-C", str(repo_root), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _make_repo(notes_repo_root: Path, index_path: Path) -> MarkdownReportRepository:
+    git = GitChangeDetector.discover(notes_repo_root, pathspec="docs/journal")
+    assert git is not None
+    return MarkdownReportRepository(notes_repo_root=notes_repo_root, index=SqliteReportIndex(index_path), git=git)
+
+
+def test_discover_returns_none_outside_work_tree(tmp_path: Path) -> None:
+    """Git の作業ツリーでなければ None を返すことを検証する."""
+    assert GitChangeDetector.discover(tmp_path, pathspec="docs/journal") is None
+
+
+def test_refresh_index_only_checks_paths_changed_since_last_commit(tmp_path: Path) -> None:
+    """前回索引したコミット以降に変わったパスだけを調べることを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    notes_repo_root.mkdir()
+    _git(notes_repo_root, "init", "-q")
+
+    writer = MarkdownReportRepository(notes_repo_root=notes_repo_root)
+    base = datetime(2024, 1, 1, 9, 0, 0, tzinfo=JST)
+    paths = [
+        writer.save(make_report(base + timedelta(days=i), note_id=f"note-{i}", title=f"note-{i} のタイトル"))
+        for i in range(5)
+    ]
+    _git(notes_repo_root, "add", "-A")
+    _git(notes_repo_root, "commit", "-q", "-m", "initial")
+
+    repo = _make_repo(notes_repo_root, tmp_path / "index.db")
+
+    # 初回は基準点がないので全体を走査する
+    first = repo.refresh_index()
+    assert (first.scanned, first.parsed, first.used_git) == (5, 5, False)
+
+    # git pull 相当: 新しいコミットで 1 件追加、1 件削除
+    writer.save(make_report(base + timedelta(days=10), note_id="note-new"))
+    _git(notes_repo_root, "rm", "-q", str(paths[0]))
+    _git(notes_repo_root, "add", "-A")
+    _git(notes_repo_root, "commit", "-q", "-m", "pull")
+
+    second = repo.refresh_index()
+    assert (second.scanned, second.parsed, second.deleted, second.used_git) == (1, 1, 1, True)
+
+    # 作業ツリーでの編集と、その取り消し
+    original = paths[1].read_text(encoding="utf-8")
+    paths[1].write_text(original.replace("note-1 のタイトル", "編集中"), encoding="utf-8")
+    third = repo.refresh_index()
+    assert (third.scanned, third.parsed) == (1, 1)
+    assert {m.note_id: m.title for m in repo.find_recent_meta(base)}["note-1"] == "編集中"
+
+    _git(notes_repo_root, "checkout", "--", str(paths[1]))
+    fourth = repo.refresh_index()
+    assert (fourth.scanned, fourth.parsed) == (1, 1)
+    assert {m.note_id: m.title for m in repo.find_recent_meta(base)}["note-1"] == "note-1 のタイトル"
+
+    # 何も変わっていなければ何も調べない
+    fifth = repo.refresh_index()
+    assert (fifth.scanned, fifth.parsed, fifth.deleted) == (0, 0, 0)
+
+
+def test_refresh_index_follows_packed_months(tmp_path: Path) -> None:
+    """別の場所でパックされてコミットされた月も、git の差分から索引に反映されることを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    notes_repo_root.mkdir()
+    _git(notes_repo_root, "init", "-q")
+
+    writer = MarkdownReportRepository(notes_repo_root=notes_repo_root)
+    base = datetime(2024, 1, 1, 9, 0, 0, tzinfo=JST)
+    for i in range(3):
+        writer.save(make_report(base + timedelta(days=i), note_id=f"note-{i}", title=f"note-{i} のタイトル"))
+    _git(notes_repo_root, "add", "-A")
+    _git(notes_repo_root, "commit", "-q", "-m", "initial")
+    repo = _make_repo(notes_repo_root, tmp_path / "index.db")
+    repo.refresh_index()
+
+    # git pull 相当: loose ファイルが消え、パックが追加される
+    assert writer.pack_months(datetime(2024, 2, 1, tzinfo=JST).date()).removed == 3  # noqa: PLR2004
+    _git(notes_repo_root, "add", "-A")
+    _git(notes_repo_root, "commit", "-q", "-m", "pack")
+
+    result = repo.refresh_index()
+
+    assert result.used_git
+    assert result.deleted == 0
+    reports = repo.find_recent(base)
+    assert sorted(r.meta.note_id for r in reports) == ["note-0", "note-1", "note-2"]
+    assert all(r.body_markdown == "本文" for r in reports)
+    assert repo.refresh_index().parsed == 0
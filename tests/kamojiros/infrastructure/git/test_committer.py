@@ -0,0 +1,156 @@
+"""保存したノートをまとめて git にコミットする GitCommitter のテスト."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.committer import GitCommitter
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.models import ReportAuthor, ReportType
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GIT = shutil.which("git")
+
+pytestmark = pytest.mark.skipif(GIT is None, reason="git is not available")
+
+
+def _git(repo_root: Path, *args: str) -> str:
+    assert GIT is not None
+    completed = subprocess.run(  # noqa: S603
+        [GIT, "-C", str(repo_root), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return completed.stdout
+
+
+def _init_repo(repo_root: Path) -> None:
+    repo_root.mkdir()
+    _git(repo_root, "init", "--quiet")
+    _git(repo_root, "config", "user.name", "test")
+    _git(repo_root, "config", "user.email", "test@example.com")
+
+
+def test_commits_notes_root_in_subdirectory(tmp_path: Path) -> None:
+    """Notes の root が作業ツリーのサブディレクトリでも、保存したノートがコミットされることを検証する."""
+    work_tree = tmp_path / "work"
+    _init_repo(work_tree)
+    repo_root = work_tree / "notes"
+    repo_root.mkdir()
+    committer = GitCommitter.discover(repo_root)
+    assert committer is not None
+    repo = MarkdownReportRepository(notes_repo_root=repo_root, committer=committer)
+
+    with committer:
+        repo.save(
+            make_report(
+                datetime(2025, 3, 1, 9, tzinfo=JST),
+                "agent-0",
+                report_type=ReportType.META,
+                author=ReportAuthor.SELF_OBSERVER,
+            )
+        )
+    assert committer.pending == 0
+
+    assert _git(work_tree, "status", "--porcelain") == ""
+    assert _git(work_tree, "log", "--format=", "--name-only").split() == [
+        "notes/docs/journal/2025/03/01/2025-03-01-0900-meta-agent-0.md"
+    ]
+
+
+def test_discover_returns_none_outside_work_tree(tmp_path: Path) -> None:
+    """Git の作業ツリーでなければ None を返すことを検証する."""
+    assert GitCommitter.discover(tmp_path) is None
+
+
+def test_commits_saved_notes_in_batches(tmp_path: Path) -> None:
+    """batch_size 件ごとに 1 コミットになり、残りは flush でコミットされることを検証する."""
+    repo_root = tmp_path / "notes"
+    _init_repo(repo_root)
+    # 利用者がステージしただけの変更はコミットに巻き込まない
+    (repo_root / "draft.md").write_text("draft\n")
+    _git(repo_root, "add", "draft.md")
+    committer = GitCommitter.discover(repo_root, batch_size=3, message="Add agent notes")
+    assert committer is not None
+    repo = MarkdownReportRepository(notes_repo_root=repo_root, committer=committer)
+
+    with committer:
+        for i in range(4):
+            repo.save(
+                make_report(
+                    datetime(2025, 3, 1 + i % 2, 9, i, tzinfo=JST),
+                    f"agent-{i}",
+                    report_type=ReportType.META,
+                    author=ReportAuthor.SELF_OBSERVER,
+                )
+            )
+        assert committer.pending == 1
+
+    log = _git(repo_root, "log", "--format=%s", "--name-only").splitlines()
+    assert _git(repo_root, "rev-list", "--count", "HEAD").strip() == "2"
+    assert log.count("Add agent notes") == 2  # noqa: PLR2004
+    assert sum(name.endswith(".md") and "journal" in name for name in log) == 4  # noqa: PLR2004
+    assert _git(repo_root, "diff", "--cached", "--name-only").split() == ["draft.md"]
+
+
+def test_unchanged_notes_are_not_committed_again(tmp_path: Path) -> None:
+    """内容が変わっていないノートを flush しても空のコミットを作らないことを検証する."""
+    repo_root = tmp_path / "notes"
+    _init_repo(repo_root)
+    committer = GitCommitter.discover(repo_root)
+    assert committer is not None
+    repo = MarkdownReportRepository(notes_repo_root=repo_root, committer=committer)
+    report = make_report(
+        datetime(2025, 3, 1, 9, tzinfo=JST), "agent-0", report_type=ReportType.META, author=ReportAuthor.SELF_OBSERVER
+    )
+
+    repo.save(report)
+    first = committer.flush()
+    repo.save(report)
+    second = committer.flush()
+
+    assert first is not None
+    assert second is None
+    assert committer.pending == 0
+    assert _git(repo_root, "rev-list", "--count", "HEAD").strip() == "1"
+
+
+@pytest.mark.parametrize("skip_hooks", [False, True])
+def test_commit_runs_hooks_unless_skipped(tmp_path: Path, *, skip_hooks: bool) -> None:
+    """利用者の commit-msg フックを実行し、skip_hooks のときだけ飛ばすことを検証する."""
+    repo_root = tmp_path / "notes"
+    _init_repo(repo_root)
+    hook = repo_root / ".git" / "hooks" / "commit-msg"
+    hook.write_text("#!/bin/sh\necho rejected >&2\nexit 1\n")
+    hook.chmod(0o755)
+    committer = GitCommitter.discover(repo_root, skip_hooks=skip_hooks)
+    assert committer is not None
+    repo = MarkdownReportRepository(notes_repo_root=repo_root, committer=committer)
+
+    repo.save(
+        make_report(
+            datetime(2025, 3, 1, 9, tzinfo=JST),
+            "agent-0",
+            report_type=ReportType.META,
+            author=ReportAuthor.SELF_OBSERVER,
+        )
+    )
+    commit = committer.flush()
+
+    if skip_hooks:
+        assert commit is not None
+        assert committer.pending == 0
+    else:
+        # フックに拒まれたノートは次回の flush のために残す
+        assert commit is None
+        assert committer.pending == 1
@@ -0,0 +1,152 @@
+"""フロントマターの読み分けと本文の遅延読み込みのテスト."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+import yaml
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.front_matter import (
+    MarkdownBody,
+    dump_front_matter,
+    load_front_matter,
+    parse_own_front_matter,
+    read_front_matter,
+)
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+def _save_report(tmp_path: Path, body: str) -> tuple[Report, Path]:
+    meta = ReportMeta(
+        note_id="2025-11-17-2100-tech-lazy",
+        title="遅延読み込み",
+        created_at=datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST),
+        updated_at=datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST),
+        type=ReportType.TECH,
+        author=ReportAuthor.USER,
+        tags=["lazy"],
+    )
+    report = Report(meta=meta, body_markdown=body)
+    path = MarkdownReportRepository(notes_repo_root=tmp_path).save(report)
+    return report, path
+
+
+def test_read_front_matter_stops_before_body(tmp_path: Path) -> None:
+    """フロントマターと本文の開始位置が返ることを検証する."""
+    _, path = _save_report(tmp_path, "本文です。")
+
+    found = read_front_matter(path)
+
+    assert found is not None
+    fm_text, body_offset = found
+    assert "note_id: 2025-11-17-2100-tech-lazy" in fm_text
+    assert path.read_bytes()[body_offset:].decode("utf-8").strip() == "本文です。"
+
+
+def test_markdown_body_reads_head_of_multibyte_text(tmp_path: Path) -> None:
+    """read_head が多バイト文字を壊さずに先頭だけを返すことを検証する."""
+    body = "日本語の本文。" * 200
+    _, path = _save_report(tmp_path, body)
+
+    source = MarkdownBody(path)
+
+    assert source.read_head(10) == body[:10]
+    assert source.read() == body
+    # 位置がずれていてもフロントマターを読み直して正しい本文を返す
+    assert MarkdownBody(path, offset=7).read() == body
+
+
+def test_loaded_report_reads_body_only_on_access(tmp_path: Path, mocker: MockerFixture) -> None:
+    """本文が初回アクセス時に 1 度だけ読まれることを検証する."""
+    saved, path = _save_report(tmp_path, "# 見出し\n\n本文")
+    read_spy = mocker.spy(MarkdownBody, "read")
+
+    report = MarkdownReportRepository(notes_repo_root=tmp_path)._load_report(path)
+
+    assert report is not None
+    assert report.meta == saved.meta
+    assert not report.is_body_loaded
+    assert report.body_preview(5) == "# 見出し"
+    assert read_spy.call_count == 0
+
+    assert report.body_markdown == saved.body_markdown
+    assert report.model_dump()["body_markdown"] == saved.body_markdown
+    assert read_spy.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "title",
+    [
+        "普通のタイトル",
+        "a: b",
+        "#hash で始まる",
+        "末尾に # コメント風",
+        "'quoted'",
+        "It's",
+        "123",
+        "1.5",
+        "yes",
+        "null",
+        "~",
+        "2025-11-17",
+        "- dash",
+        " 前後に空白 ",
+        "",
+        "とても長いタイトル " * 20,
+        "改行を\n含む",
+    ],
+)
+def test_front_matter_round_trip_matches_yaml(title: str) -> None:
+    """dump_front_matter の出力を読むと元に戻り、yaml.safe_load と同じ結果になることを検証する."""
+    fields = {
+        "note_id": "2025-11-17-2100-tech-codec",
+        "title": title,
+        "created_at": "2025-11-17T21:00:00+09:00",
+        "tags": [title, "python", "true"],
+        "source_urls": ["https://example.com/a?b=c#d"],
+        "empty": [],
+    }
+
+    fm_text = dump_front_matter(fields)
+
+    assert load_front_matter(fm_text) == fields
+    assert yaml.safe_load(fm_text) == fields
+
+
+def test_saved_front_matter_uses_fast_parser(tmp_path: Path) -> None:
+    """Save が書いた通常のファイルは専用パーサで読めることを検証する."""
+    _, path = _save_report(tmp_path, "本文")
+    found = read_front_matter(path)
+    assert found is not None
+
+    parsed = parse_own_front_matter(found[0])
+
+    assert parsed is not None
+    assert parsed == yaml.safe_load(found[0])
+
+
+@pytest.mark.parametrize(
+    "fm_text",
+    [
+        'title: "double quoted"\n',
+        "title: |\n  block\n",
+        "tags: [a, b]\n",
+        "title: x # comment\n",
+        "count: 3\n",
+        "title: a\ntitle: b\n",
+        "title: long\n  continued\n",
+    ],
+)
+def test_hand_edited_front_matter_falls_back_to_yaml(fm_text: str) -> None:
+    """専用パーサが扱わない構文は YAML パーサで読まれることを検証する."""
+    assert parse_own_front_matter(fm_text) is None
+    assert load_front_matter(fm_text) == yaml.safe_load(fm_text)
@@ -1,38 +1,46 @@
 """MarkdownReportWriter の単体テスト."""
 
-from datetime import datetime, timedelta
+from dataclasses import replace
+from datetime import UTC, date, datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 
+import pytest
 import yaml
+from pydantic import HttpUrl
 
 from kamojiros.core.time import JST
 from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
-from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from kamojiros.interfaces.reports import (
+    ALL_SEARCH_FIELDS,
+    ReportCursor,
+    ReportNotFoundError,
+    ReportQuery,
+    SearchQuery,
+)
+from kamojiros.models import ReportAuthor, ReportMeta, ReportType
+from tests.kamojiros.factories import make_report
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from pytest_mock import MockerFixture
 
-def _make_report(created_at: datetime, note_id: str = "2025-11-17-2100-meta-self-observer-test") -> Report:
-    """テスト用の Report を作成するヘルパー."""
-    meta = ReportMeta(
-        note_id=note_id,
-        title="self_observer v0 テストノート",
-        created_at=created_at,
-        updated_at=created_at,
-        type=ReportType.META,
-        author=ReportAuthor.SELF_OBSERVER,
-        tags=["test", "self-observer"],
-        source_urls=[],
-    )
-    body = "# self_observer v0 テスト\n\n本文です。"
-    return Report(meta=meta, body_markdown=body)
+    from kamojiros.interfaces.reports import SearchField
 
 
 def test_save_creates_expected_path_and_file(tmp_path: Path) -> None:
     """docs/journal/YYYY/MM/DD/note_id.md が作成されることを検証する."""
     notes_repo_root = tmp_path / "notes"
-    report = _make_report(datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST))
+    report = make_report(
+        datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST),
+        "self-observer-test",
+        title="self_observer v0 テストノート",
+        report_type=ReportType.META,
+        author=ReportAuthor.SELF_OBSERVER,
+        tags=["test", "self-observer"],
+        body="# self_observer v0 テスト\n\n本文です。",
+    )
 
     repo = MarkdownReportRepository(notes_repo_root=notes_repo_root)
     path = repo.save(report)
@@ -50,7 +58,15 @@ def test_save_writes_front_matter_and_body(tmp_path: Path) -> None:
     """YAML フロントマターと本文が期待どおりに書き込まれることを検証する."""
     notes_repo_root = tmp_path / "notes"
     created_at = datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST)
-    report = _make_report(created_at)
+    report = make_report(
+        created_at,
+        "self-observer-test",
+        title="self_observer v0 テストノート",
+        report_type=ReportType.META,
+        author=ReportAuthor.SELF_OBSERVER,
+        tags=["test", "self-observer"],
+        body="# self_observer v0 テスト\n\n本文です。",
+    )
 
     repo = MarkdownReportRepository(notes_repo_root=notes_repo_root)
     path = repo.save(report)
@@ -90,15 +106,15 @@ def test_find_recent_returns_reports_in_range(tmp_path: Path) -> None:
 
     # 3つのレポートを作成
     # 1. 25時間前 (範囲外)
-    r1 = _make_report(now - timedelta(hours=25), note_id="old-report")
+    r1 = make_report(now - timedelta(hours=25), note_id="old-report")
     repo.save(r1)
 
     # 2. 23時間前 (範囲内)
-    r2 = _make_report(now - timedelta(hours=23), note_id="recent-report-1")
+    r2 = make_report(now - timedelta(hours=23), note_id="recent-report-1")
     repo.save(r2)
 
     # 3. 1時間前 (範囲内)
-    r3 = _make_report(now - timedelta(hours=1), note_id="recent-report-2")
+    r3 = make_report(now - timedelta(hours=1), note_id="recent-report-2")
     repo.save(r3)
 
     # 24時間前以降を検索
@@ -117,3 +133,542 @@ def test_find_recent_returns_reports_in_range(tmp_path: Path) -> None:
     loaded_r3 = next(r for r in reports if r.meta.note_id == "recent-report-2")
     assert loaded_r3.meta.title == r3.meta.title
     assert loaded_r3.body_markdown == r3.body_markdown
+
+
+def test_find_recent_with_index_matches_file_scan(tmp_path: Path) -> None:
+    """索引付きの find_recent がファイル走査と同じ結果を返すことを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    repo = MarkdownReportRepository(
+        notes_repo_root=notes_repo_root,
+        index=SqliteReportIndex(tmp_path / "index.db"),
+    )
+
+    now = datetime.now(tz=JST)
+    repo.save(make_report(now - timedelta(hours=25), note_id="old-report"))
+    saved = make_report(now - timedelta(hours=1), note_id="recent-report")
+    repo.save(saved)
+
+    since = now - timedelta(hours=24)
+    reports = repo.find_recent(since)
+
+    assert [r.meta.note_id for r in reports] == ["recent-report"]
+    assert reports[0].meta == saved.meta
+    assert reports[0].body_markdown == saved.body_markdown
+    assert [m.note_id for m in repo.find_recent_meta(since)] == ["recent-report"]
+
+
+def test_find_recent_with_index_picks_up_external_changes(tmp_path: Path) -> None:
+    """索引の外で追加・変更・削除されたファイルが反映されることを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    index = SqliteReportIndex(tmp_path / "index.db")
+    repo = MarkdownReportRepository(notes_repo_root=notes_repo_root, index=index)
+
+    now = datetime.now(tz=JST)
+    since = now - timedelta(hours=24)
+    edited_path = repo.save(make_report(now - timedelta(hours=2), note_id="edited", title="編集前のタイトル"))
+    removed_path = repo.save(make_report(now - timedelta(hours=2), note_id="removed"))
+    assert {m.note_id for m in repo.find_recent_meta(since)} == {"edited", "removed"}
+
+    # 索引を持たないリポジトリ (git pull やエディタ相当) でファイルを操作する
+    outsider = MarkdownReportRepository(notes_repo_root=notes_repo_root)
+    outsider.save(make_report(now - timedelta(hours=1), note_id="added"))
+    edited_path.write_text(
+        edited_path.read_text(encoding="utf-8").replace("編集前のタイトル", "編集後のタイトル"),
+        encoding="utf-8",
+    )
+    removed_path.unlink()
+
+    metas = {m.note_id: m for m in repo.find_recent_meta(since)}
+    assert set(metas) == {"edited", "added"}
+    assert metas["edited"].title == "編集後のタイトル"
+
+
+def test_refresh_index_reparses_only_changed_files(tmp_path: Path) -> None:
+    """refresh_index が変更のあったファイルだけを再パースすることを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    outsider = MarkdownReportRepository(notes_repo_root=notes_repo_root)
+    base = datetime(2023, 4, 1, 9, 0, 0, tzinfo=JST)
+    paths = [outsider.save(make_report(base + timedelta(days=i), note_id=f"note-{i}")) for i in range(3)]
+
+    repo = MarkdownReportRepository(
+        notes_repo_root=notes_repo_root,
+        index=SqliteReportIndex(tmp_path / "index.db"),
+    )
+
+    first = repo.refresh_index()
+    assert (first.scanned, first.parsed, first.deleted) == (3, 3, 0)
+
+    second = repo.refresh_index()
+    assert (second.scanned, second.parsed, second.deleted) == (3, 0, 0)
+
+    paths[0].write_text(paths[0].read_text(encoding="utf-8") + "追記\n", encoding="utf-8")
+    paths[1].unlink()
+    third = repo.refresh_index()
+    assert (third.scanned, third.parsed, third.deleted) == (2, 1, 1)
+
+
+def test_iter_reports_without_index_orders_by_updated_at(tmp_path: Path) -> None:
+    """索引が無くても、作成日ではなく updated_at の順に返すことを検証する (作成後に編集されたノートを含む)."""
+    notes_repo_root = tmp_path / "notes"
+    repo = MarkdownReportRepository(notes_repo_root=notes_repo_root)
+    now = datetime.now(tz=JST)
+    for days_ago in range(5):
+        for hour in (1, 2):
+            created = now - timedelta(days=days_ago, hours=hour)
+            repo.save(make_report(created, note_id=f"note-{days_ago}-{hour}"))
+    # 4 日前に作成し、いま編集したノート
+    edited = make_report(now - timedelta(days=4, hours=3), note_id="edited")
+    edited.meta.updated_at = now - timedelta(minutes=1)
+    repo.save(edited)
+
+    newest = [r.meta.note_id for r in repo.iter_reports(now - timedelta(days=10))]
+    oldest = [r.meta.note_id for r in repo.iter_reports(now - timedelta(days=10), newest_first=False)]
+
+    assert newest[:3] == ["edited", "note-0-1", "note-0-2"]
+    assert oldest == newest[::-1]
+
+
+def test_iter_reports_with_index_orders_by_updated_at(tmp_path: Path) -> None:
+    """索引付きの iter_reports が updated_at の新しい順に返すことを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    repo = MarkdownReportRepository(
+        notes_repo_root=notes_repo_root,
+        index=SqliteReportIndex(tmp_path / "index.db"),
+    )
+    now = datetime.now(tz=JST)
+    for hours_ago in (30, 5, 50, 1):
+        repo.save(make_report(now - timedelta(hours=hours_ago), note_id=f"note-{hours_ago}"))
+
+    newest = [r.meta.note_id for r in repo.iter_reports(now - timedelta(hours=40))]
+    oldest = [r.meta.note_id for r in repo.iter_reports(now - timedelta(hours=40), newest_first=False)]
+
+    assert newest == ["note-1", "note-5", "note-30"]
+    assert oldest == list(reversed(newest))
+
+
+def test_index_restores_meta_equal_to_validated(tmp_path: Path) -> None:
+    """索引から検証を省いて復元した ReportMeta が、検証して作ったものと等しいことを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    created_at = datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST)
+    saved = make_report(created_at)
+    saved.meta.source_urls = [HttpUrl("https://example.com/a?b=c")]
+    repo = MarkdownReportRepository(notes_repo_root, index=SqliteReportIndex(tmp_path / "index.db"))
+    repo.save(saved)
+
+    (found,) = repo.find_recent(created_at - timedelta(days=1))
+
+    assert found.meta == saved.meta
+    assert found.meta == ReportMeta.model_validate(found.meta.model_dump())
+    assert found.model_dump()["body_markdown"] == saved.body_markdown
+
+
+def test_hand_edited_file_is_fully_validated(tmp_path: Path) -> None:
+    """手で編集された不正なフロントマターのファイルは読み飛ばされることを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    created_at = datetime(2025, 11, 17, 21, 0, 0, tzinfo=JST)
+    repo = MarkdownReportRepository(notes_repo_root)
+    path = repo.save(make_report(created_at))
+    path.write_text(path.read_text(encoding="utf-8").replace("type: tech", "type: unknown"), encoding="utf-8")
+
+    assert repo.find_recent(created_at - timedelta(days=1)) == []
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [
+        (ReportQuery(), ["tech-py-cli", "meta-py", "tech-cli", "life"]),
+        (ReportQuery(limit=2), ["tech-py-cli", "meta-py"]),
+        (ReportQuery(newest_first=False, limit=2), ["life", "tech-cli"]),
+        (ReportQuery(report_type=ReportType.TECH), ["tech-py-cli", "tech-cli"]),
+        (ReportQuery(author=ReportAuthor.SELF_OBSERVER), ["meta-py"]),
+        (ReportQuery(tags=("python", "cli")), ["tech-py-cli", "meta-py", "tech-cli"]),
+        (ReportQuery(tags=("python", "cli"), tag_match="all"), ["tech-py-cli"]),
+        (ReportQuery(tags=("py*",)), ["tech-py-cli", "meta-py"]),
+        (ReportQuery(tags=("py*", "c*"), tag_match="all"), ["tech-py-cli"]),
+        (ReportQuery(exclude_tags=("cli",)), ["meta-py", "life"]),
+        (ReportQuery(tags=("py*",), exclude_tags=("cli",)), ["meta-py"]),
+        (ReportQuery(since=datetime(2025, 3, 2, tzinfo=JST)), ["tech-py-cli", "meta-py", "tech-cli"]),
+        (ReportQuery(until=datetime(2025, 3, 2, 12, tzinfo=JST)), ["tech-cli", "life"]),
+    ],
+)
+def test_query_filters_orders_and_limits(
+    tmp_path: Path,
+    spec: ReportQuery,
+    expected: list[str],
+    *,
+    use_index: bool,
+) -> None:
+    """Query が索引の有無によらず同じ条件・順序・件数で返すことを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=notes_repo_root, index=index)
+    notes = [
+        ("life", 1, ReportType.LIFE, ReportAuthor.USER, []),
+        ("tech-cli", 2, ReportType.TECH, ReportAuthor.USER, ["cli"]),
+        ("meta-py", 3, ReportType.META, ReportAuthor.SELF_OBSERVER, ["python"]),
+        ("tech-py-cli", 4, ReportType.TECH, ReportAuthor.USER, ["python", "cli"]),
+    ]
+    for note_id, day, report_type, author, tags in notes:
+        report = make_report(datetime(2025, 3, day, 9, 0, 0, tzinfo=JST), note_id=note_id)
+        report.meta = report.meta.model_copy(update={"type": report_type, "author": author, "tags": tags})
+        repo.save(report)
+
+    assert [r.meta.note_id for r in repo.query(spec)] == expected
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+@pytest.mark.parametrize("newest_first", [True, False])
+def test_query_pages_with_cursor(tmp_path: Path, *, use_index: bool, newest_first: bool) -> None:
+    """After のカーソルで、同時刻のノートも含めて重複・欠落なく 1 ページずつ辿れることを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    for i in range(7):
+        # 2 件ずつ同じ updated_at にする. 最後の 1 件は作成日より後に更新されている
+        report = make_report(datetime(2025, 3, 1 + i // 2, 9, 0, 0, tzinfo=JST), note_id=f"page-{i}")
+        if i == 6:  # noqa: PLR2004
+            report.meta.updated_at = datetime(2025, 3, 10, 9, 0, 0, tzinfo=JST)
+        repo.save(report)
+    spec = ReportQuery(newest_first=newest_first, limit=3)
+    everything = [r.meta.note_id for r in repo.query(ReportQuery(newest_first=newest_first))]
+
+    pages: list[list[str]] = []
+    cursor = None
+    while page := repo.query(replace(spec, after=cursor)):
+        pages.append([r.meta.note_id for r in page])
+        cursor = ReportCursor.decode(ReportCursor.of(page[-1].meta).encode())
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [note_id for page in pages for note_id in page] == everything
+
+    after_first = replace(spec, after=ReportCursor.of(repo.query(spec)[0].meta), limit=None)
+    assert [r.meta.note_id for r in repo.iter_query(after_first)] == everything[1:]
+    with pytest.raises(ValueError, match="invalid cursor"):
+        ReportCursor.decode("bm90LWEtY3Vyc29y")
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_search_pages_recent_with_cursor(tmp_path: Path, *, use_index: bool) -> None:
+    """新しい順の検索が、カーソルより古いものを続きとして返すことを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    for hours_ago in range(1, 6):
+        _save_searchable(repo, f"hit-{hours_ago}", "索引", "索引の話" * hours_ago, hours_ago=hours_ago)
+
+    first = repo.search(SearchQuery(keyword="索引", order="recent", limit=2))
+    rest = repo.search(SearchQuery(keyword="索引", order="recent", after=ReportCursor.of(first[-1].report.meta)))
+
+    assert [hit.report.meta.note_id for hit in [*first, *rest]] == [f"hit-{i}" for i in range(1, 6)]
+
+
+def test_search_query_rejects_cursor_in_relevance_order() -> None:
+    """関連の強い順の検索にカーソルを渡すと、新しい順に読み替えずにエラーにすることを検証する."""
+    cursor = ReportCursor(updated_at=datetime.now(tz=JST), note_id="hit-1")
+
+    with pytest.raises(ValueError, match="order='recent'"):
+        SearchQuery(keyword="索引", after=cursor)
+
+
+def _save_searchable(repo: MarkdownReportRepository, note_id: str, title: str, body: str, hours_ago: int) -> Path:
+    report = make_report(datetime.now(tz=JST) - timedelta(hours=hours_ago), note_id=note_id)
+    report.meta.title = title
+    report.body_markdown = body
+    return repo.save(report)
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_search_matches_japanese_substrings(tmp_path: Path, *, use_index: bool) -> None:
+    """日本語の 1 文字・2 文字の検索語と、英字の大文字小文字を区別しない検索を検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    _save_searchable(repo, "fts", "全文検索の設計", "SQLite の FTS5 を使う。", hours_ago=2)
+    _save_searchable(repo, "cache", "キャッシュ", "索引はキャッシュにすぎない。", hours_ago=1)
+
+    def found(keyword: str, fields: frozenset[SearchField] = ALL_SEARCH_FIELDS) -> set[str]:
+        return {hit.report.meta.note_id for hit in repo.search(SearchQuery(keyword=keyword, fields=fields))}
+
+    assert found("検索") == {"fts"}
+    assert found("索") == {"fts", "cache"}
+    assert found("fts5 sqlite") == {"fts"}
+    assert found("ＦＴＳ") == {"fts"}  # noqa: RUF001
+    assert found("キャッシュ", frozenset({"title"})) == {"cache"}
+    assert found("索引", frozenset({"title", "tags"})) == set()
+    assert found("見つからない") == set()
+
+
+def test_search_with_index_ranks_and_highlights(tmp_path: Path) -> None:
+    """索引付きの検索が bm25 の順に並び、本文の一致箇所をスニペットにすることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    _save_searchable(repo, "weak", "日記", "長い本文。" * 50 + "途中で一度だけ索引に触れる。", hours_ago=1)
+    _save_searchable(repo, "strong", "索引の作り方", "索引を作る。索引を更新する。", hours_ago=2)
+
+    hits = repo.search(SearchQuery(keyword="索引"))
+
+    assert [hit.report.meta.note_id for hit in hits] == ["strong", "weak"]
+    assert hits[0].score > hits[1].score
+    snippet = hits[1].snippet
+    assert snippet is not None
+    assert [snippet.text[s:e] for s, e in snippet.highlights] == ["索引"]
+
+
+def test_search_index_follows_edits_and_deletes(tmp_path: Path) -> None:
+    """保存し直したノートと削除したノートが全文検索の索引に反映されることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    path = _save_searchable(repo, "edited", "タイトル", "古い本文", hours_ago=2)
+    removed = _save_searchable(repo, "removed", "タイトル", "古い本文", hours_ago=1)
+
+    _save_searchable(repo, "edited", "タイトル", "新しい本文", hours_ago=2)
+    removed.unlink()
+
+    assert [hit.report.meta.note_id for hit in repo.search(SearchQuery(keyword="新しい"))] == ["edited"]
+    assert repo.search(SearchQuery(keyword="古い")) == []
+    assert path.exists()
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_search_filters_by_updated_range(tmp_path: Path, *, use_index: bool) -> None:
+    """検索の期間指定が updated_at に対して掛かり、年をまたいだ古いノートも検索できることを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    for year in (2020, 2022, 2024):
+        report = make_report(datetime(year, 6, 1, 12, 0, 0, tzinfo=JST), note_id=f"note-{year}")
+        report.body_markdown = "年次の振り返り"
+        repo.save(report)
+
+    def found(since: datetime | None, until: datetime | None) -> list[str]:
+        hits = repo.search(SearchQuery(keyword="振り返り", since=since, until=until))
+        return sorted(hit.report.meta.note_id for hit in hits)
+
+    assert found(None, None) == ["note-2020", "note-2022", "note-2024"]
+    assert found(datetime(2021, 1, 1, tzinfo=JST), None) == ["note-2022", "note-2024"]
+    assert found(None, datetime(2022, 6, 1, 12, 0, 0, tzinfo=JST)) == ["note-2020", "note-2022"]
+    assert found(datetime(2021, 1, 1, tzinfo=JST), datetime(2023, 1, 1, tzinfo=JST)) == ["note-2022"]
+
+
+def test_query_tag_postings_follow_retagging(tmp_path: Path) -> None:
+    """タグを付け替えて保存し直すと、タグの転置リストも付け替わることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    report = make_report(datetime(2025, 3, 1, 9, 0, 0, tzinfo=JST), note_id="retagged", tags=["test"])
+    path = repo.save(report)
+
+    report.meta.tags = ["python/typing"]
+    repo.save(report)
+
+    assert repo.query(ReportQuery(tags=("test",))) == []
+    assert [r.meta.note_id for r in repo.query(ReportQuery(tags=("python/*",)))] == ["retagged"]
+
+    path.unlink()
+    assert repo.query(ReportQuery(tags=("python/*",))) == []
+
+
+def test_stats_rollups_match_file_scan(tmp_path: Path) -> None:
+    """日ごとの集計から求めた統計が、ファイル走査で数えた統計と一致することを検証する (両端の日は時刻で切る)."""
+    scan_repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    indexed_repo = MarkdownReportRepository(
+        notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db")
+    )
+    for day in range(1, 6):
+        for hour, report_type, tags in ((6, ReportType.TECH, ["python"]), (18, ReportType.LIFE, ["food", "python"])):
+            report = make_report(datetime(2025, 3, day, hour, tzinfo=JST), note_id=f"note-{day}-{hour}")
+            report.meta = report.meta.model_copy(update={"type": report_type, "tags": tags})
+            scan_repo.save(report)
+
+    since = datetime(2025, 3, 1, 12, tzinfo=JST)
+    until = datetime(2025, 3, 5, 12, tzinfo=JST)
+    expected = scan_repo.stats(since, until)
+    stats = indexed_repo.stats(since, until)
+
+    assert stats == expected
+    assert stats.total_count == 8  # noqa: PLR2004
+    assert stats.by_type == {ReportType.TECH: 4, ReportType.LIFE: 4}
+    assert stats.top_tags == {"python": 8, "food": 4}
+    # タグごとの件数は combine のためだけに持ち、書き出さない
+    assert "tag_counts" not in stats.model_dump()
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_stats_counts_mixed_offsets_by_instant(tmp_path: Path, *, use_index: bool) -> None:
+    """日本時間以外のオフセットで作成されたノートも、作成日時そのもので期間の内外を判定することを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    # 3/11 08:30 (日本時間) だが、ディレクトリは UTC の 3/10
+    repo.save(make_report(datetime(2025, 3, 10, 23, 30, tzinfo=UTC), note_id="utc"))
+    # 3/20 10:00 (日本時間) だが、ディレクトリは UTC-5 の 3/19
+    repo.save(make_report(datetime(2025, 3, 19, 20, tzinfo=timezone(timedelta(hours=-5))), note_id="minus-5"))
+    # 期間の内側の日の集計から数える
+    repo.save(make_report(datetime(2025, 3, 15, 12, tzinfo=JST), note_id="middle"))
+
+    def total(since: datetime, until: datetime) -> int:
+        return repo.stats(since, until).total_count
+
+    assert total(datetime(2025, 3, 11, tzinfo=JST), datetime(2025, 3, 20, 9, tzinfo=JST)) == 2  # noqa: PLR2004
+    assert total(datetime(2025, 3, 11, tzinfo=JST), datetime(2025, 3, 11, 23, tzinfo=JST)) == 1
+    assert total(datetime(2025, 3, 12, tzinfo=JST), datetime(2025, 3, 21, tzinfo=JST)) == 2  # noqa: PLR2004
+    assert total(datetime(2025, 3, 1, tzinfo=JST), datetime(2025, 3, 31, tzinfo=JST)) == 3  # noqa: PLR2004
+
+
+def test_stats_rollups_follow_edits_and_deletes(tmp_path: Path) -> None:
+    """保存し直したノートと削除したノートが日ごとの集計に反映されることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    since = datetime(2025, 3, 1, tzinfo=JST)
+    until = datetime(2025, 3, 31, tzinfo=JST)
+    report = make_report(datetime(2025, 3, 10, 9, tzinfo=JST), note_id="edited")
+    repo.save(report)
+    removed = repo.save(make_report(datetime(2025, 3, 15, 9, tzinfo=JST), note_id="removed"))
+    assert repo.stats(since, until).total_count == 2  # noqa: PLR2004
+
+    report.meta.tags = ["retagged"]
+    repo.save(report)
+    removed.unlink()
+
+    stats = repo.stats(since, until)
+    assert stats.total_count == 1
+    assert stats.top_tags == {"retagged": 1}
+
+
+def test_catalog_snapshot_follows_index(tmp_path: Path) -> None:
+    """索引付きのカタログがスナップショットから読まれ、ノートを保存すると作り直されることを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db")
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    scan_repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    for day in (1, 2):
+        repo.save(make_report(datetime(2025, 3, day, 9, tzinfo=JST), note_id=f"note-{day}"))
+
+    catalog = repo.catalog()
+    assert not isinstance(catalog.created_us, memoryview)
+    reloaded = repo.catalog()
+    assert isinstance(reloaded.created_us, memoryview)
+    assert list(reloaded.note_ids) == list(scan_repo.catalog().note_ids) == ["note-1", "note-2"]
+
+    repo.save(make_report(datetime(2025, 3, 3, 9, tzinfo=JST), note_id="note-3"))
+    rebuilt = repo.catalog()
+    assert rebuilt.generation != reloaded.generation
+    assert list(rebuilt.note_ids) == ["note-1", "note-2", "note-3"]
+
+
+def test_catalog_since_refreshes_only_recent_days(tmp_path: Path, mocker: MockerFixture) -> None:
+    """カタログに since を渡すと、git が無くても since 以降になりうる日付だけを走査して索引を更新することを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db")
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    for day in (1, 2, 3):
+        repo.save(make_report(datetime(2025, 3, day, 9, tzinfo=JST), note_id=f"note-{day}"))
+    # 索引を通さずに書かれたノート
+    writer = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    writer.save(make_report(datetime(2025, 3, 5, 9, tzinfo=JST), note_id="note-5"))
+    scanned = mocker.spy(repo, "_scan_journal")
+
+    catalog = repo.catalog(datetime(2025, 3, 4, tzinfo=JST))
+
+    # 3/4 00:00 (日本時間) は UTC の 3/3 なので、その前日から
+    scanned.assert_called_once_with(date(2025, 3, 2), None)
+    assert list(catalog.note_ids) == ["note-1", "note-2", "note-3", "note-5"]
+    assert catalog.crosstab(datetime(2025, 3, 4, tzinfo=JST), datetime(2025, 3, 6, tzinfo=JST)) == {
+        (ReportType.TECH, ReportAuthor.USER): 1
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rebuild_index_matches_incremental_index(tmp_path: Path, jobs: int) -> None:
+    """年月ごとに並列で作り直した索引が、保存時に更新した索引と同じ結果を返し、古い行を残さないことを検証する."""
+    notes_repo_root = tmp_path / "notes"
+    repo = MarkdownReportRepository(notes_repo_root=notes_repo_root, index=SqliteReportIndex(tmp_path / "index.db"))
+    for month, day in ((1, 31), (2, 1), (2, 15), (3, 1)):
+        report = make_report(datetime(2025, month, day, 9, 0, 0, tzinfo=JST), note_id=f"note-{month}-{day}")
+        report.body_markdown = f"{month} 月の記録"
+        repo.save(report)
+    removed = repo.save(make_report(datetime(2025, 3, 2, 9, 0, 0, tzinfo=JST), note_id="removed"))
+    removed.unlink()
+    since = datetime(2025, 1, 1, tzinfo=JST)
+    until = datetime(2025, 3, 31, tzinfo=JST)
+    expected_stats = repo.stats(since, until)
+
+    result = repo.rebuild_index(jobs=jobs)
+
+    assert (result.scanned, result.parsed) == (4, 4)
+    assert [r.meta.note_id for r in repo.query(ReportQuery(newest_first=False))] == [
+        "note-1-31",
+        "note-2-1",
+        "note-2-15",
+        "note-3-1",
+    ]
+    assert [hit.report.meta.note_id for hit in repo.search(SearchQuery(keyword="2 月"))] == ["note-2-15", "note-2-1"]
+    assert repo.stats(since, until) == expected_stats
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_get_resolves_note_id(tmp_path: Path, *, use_index: bool) -> None:
+    """Get が note_id の日付からパスを求め、日付が作成日と違う場合は索引から引くことを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    repo.save(
+        make_report(datetime(2025, 3, 1, 9, tzinfo=JST), note_id="2025-03-01-0900-tech-direct", body="直接引く本文")
+    )
+    repo.save(make_report(datetime(2025, 3, 2, 9, tzinfo=JST), note_id="2025-02-28-2359-tech-moved"))
+
+    direct = repo.get("2025-03-01-0900-tech-direct")
+    assert direct is not None
+    assert direct.body_markdown == "直接引く本文"
+    moved = repo.get("2025-02-28-2359-tech-moved")
+    assert (moved is not None) == use_index
+    assert repo.get("2025-03-01-0900-tech-missing") is None
+    assert repo.get("2025-03-01-../../secret") is None
+
+
+def test_update_bumps_updated_at_and_surfaces_old_notes(tmp_path: Path) -> None:
+    """Update が updated_at を現在時刻にし、作成日の古いノートも最近の Report として見つかることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    created = datetime.now(tz=JST) - timedelta(days=400)
+    note_id = created.strftime("%Y-%m-%d-%H%M-tech-old")
+    path = repo.save(make_report(created, note_id=note_id))
+    since = datetime.now(tz=JST) - timedelta(days=1)
+    assert repo.query(ReportQuery(since=since)) == []
+
+    updated = repo.update(note_id, title="書き直したノート", tags=["edited"])
+
+    assert updated.meta.updated_at >= since
+    assert updated.meta.created_at == created
+    assert [r.meta.title for r in repo.query(ReportQuery(since=since))] == ["書き直したノート"]
+    assert [r.meta.note_id for r in repo.find_recent(since)] == [note_id]
+    reloaded = repo.get(note_id)
+    assert reloaded is not None
+    assert reloaded.meta.tags == ["edited"]
+    assert reloaded.body_markdown == updated.body_markdown
+    assert list(path.parent.iterdir()) == [path]
+
+    with pytest.raises(ReportNotFoundError):
+        repo.update("2025-01-01-0000-tech-missing", title="x")
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_save_many_writes_files_and_index_atomically(tmp_path: Path, *, jobs: int) -> None:
+    """save_many が全ファイルを書き、一時ファイルを残さず、索引にまとめて入れることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    reports = [
+        make_report(datetime(2025, 3, day % 3 + 1, 9, minute, tzinfo=JST), note_id=f"2025-03-0{day % 3 + 1}-{day}")
+        for minute, day in enumerate(range(10))
+    ]
+
+    paths = repo.save_many(reports, jobs=jobs)
+
+    assert [p.stem for p in paths] == [r.meta.note_id for r in reports]
+    journal = tmp_path / "notes" / "docs" / "journal"
+    assert sorted(p.name for p in journal.rglob("*") if p.is_file()) == sorted(f"{p.stem}.md" for p in paths)
+    assert len(repo.query(ReportQuery())) == len(reports)
+    saved = repo.get("2025-03-02-4")
+    assert saved is not None
+    assert saved.body_markdown == reports[4].body_markdown
+    # 索引のファイル状態が書いたファイルと一致するので、refresh で読み直されない
+    assert repo.refresh_index().parsed == 0
+
+
+def test_save_many_removes_temp_files_on_failure(tmp_path: Path, mocker: MockerFixture) -> None:
+    """書き込みに失敗した場合、一時ファイルも置き換え後のファイルも残らないことを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path)
+    reports = [make_report(datetime(2025, 3, 1, 9, tzinfo=JST), note_id=f"2025-03-01-{i}") for i in range(3)]
+    mocker.patch("os.fsync", side_effect=[None, OSError("disk full")])
+
+    with pytest.raises(OSError, match="disk full"):
+        repo.save_many(reports)
+
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+    mocker.stopall()
+    assert repo.save(reports[0]).is_file()
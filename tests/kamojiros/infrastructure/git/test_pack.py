@@ -0,0 +1,119 @@
+"""月ごとのパックへのまとめと、パックと loose ファイルをまたいだ読み出しのテスト."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.git.pack import PACK_FILE, JournalPack, write_pack
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from kamojiros.interfaces.reports import ReportQuery, SearchQuery
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+_BASE = datetime(2025, 1, 30, 9, 0, 0, tzinfo=JST)
+
+
+def _journal_files(root: Path) -> list[str]:
+    return sorted(p.relative_to(root).as_posix() for p in (root / "docs" / "journal").rglob("*") if p.is_file())
+
+
+def _snapshot(repo: MarkdownReportRepository) -> list[tuple[str, str, str]]:
+    reports = repo.query(ReportQuery(since=_BASE - timedelta(days=1)))
+    return [(r.meta.note_id, r.meta.title, r.body_markdown) for r in reports]
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_packed_months_read_like_loose_files(tmp_path: Path, *, use_index: bool) -> None:
+    """閉じた月だけがパックされ、パックの前後で読み出し結果が変わらないことを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    # 1/30 - 2/4
+    reports = [
+        make_report(
+            _BASE + timedelta(days=days),
+            f"note-{days}",
+            title=f"ノート {days}",
+            tags=[f"day{days}"],
+            body=f"# ノート {days}\n\nパックの本文 {days}",
+        )
+        for days in range(6)
+    ]
+    repo.save_many(reports)
+    before = _snapshot(repo)
+
+    result = repo.pack_months(date(2025, 2, 1))
+
+    assert (result.months, result.packed, result.removed) == (1, 2, 2)
+    assert _journal_files(tmp_path / "notes") == [
+        f"docs/journal/2025/01/{PACK_FILE}",
+        *(f"docs/journal/2025/02/0{d}/2025-02-0{d}-0900-tech-note-{d + 1}.md" for d in range(1, 5)),
+    ]
+    assert _snapshot(repo) == before
+    packed = repo.get("2025-01-31-0900-tech-note-1")
+    assert packed is not None
+    assert packed.body_markdown == "# ノート 1\n\nパックの本文 1"
+    assert packed.body_preview(4) == "# ノー"
+    hits = repo.search(SearchQuery(keyword="本文 0", since=_BASE - timedelta(days=1)))
+    assert [hit.report.meta.note_id for hit in hits] == ["2025-01-30-0900-tech-note-0"]
+    assert next(iter(repo.iter_reports(_BASE, _BASE + timedelta(days=1), newest_first=False))).meta.title == "ノート 0"
+    # 閉じた月だけなので、もう一度実行しても何もしない
+    assert repo.pack_months(date(2025, 2, 1)).months == 0
+
+
+def test_save_to_packed_month_writes_loose_overlay(tmp_path: Path) -> None:
+    """パックした月への保存・更新は loose ファイルに書かれ、パックの同じノートより優先されることを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    reports = [
+        make_report(
+            _BASE + timedelta(days=days),
+            f"note-{days}",
+            title=f"ノート {days}",
+            body=f"# ノート {days}\n\nパックの本文 {days}",
+        )
+        for days in range(2)
+    ]
+    repo.save_many(reports)
+    repo.pack_months(date(2025, 2, 1))
+
+    repo.save(make_report(_BASE, "note-0", title="書き直し", body="# ノート 0\n\nパックの本文 0"))
+    updated = repo.update("2025-01-31-0900-tech-note-1", body="更新した本文")
+
+    titles = {r.meta.note_id: (r.meta.title, r.body_markdown) for r in repo.query(ReportQuery())}
+    assert titles == {
+        "2025-01-30-0900-tech-note-0": ("書き直し", "# ノート 0\n\nパックの本文 0"),
+        "2025-01-31-0900-tech-note-1": ("ノート 1", "更新した本文"),
+    }
+    assert updated.meta.updated_at > _BASE
+    assert len(_journal_files(tmp_path / "notes")) == 3  # noqa: PLR2004
+
+    # 次のパックで loose ファイルがパックに入り、内容は loose ファイルのものになる
+    assert repo.pack_months(date(2025, 2, 1)).removed == 2  # noqa: PLR2004
+    assert _journal_files(tmp_path / "notes") == [f"docs/journal/2025/01/{PACK_FILE}"]
+    reloaded = repo.get("2025-01-30-0900-tech-note-0")
+    assert reloaded is not None
+    assert reloaded.meta.title == "書き直し"
+    assert repo.refresh_index().parsed == 0
+
+
+def test_broken_pack_is_ignored(tmp_path: Path) -> None:
+    """途中で切れたパックや形式の違うファイルは開かないことを検証する."""
+    path = tmp_path / PACK_FILE
+    write_pack(path, [("n-1", "01/n-1.md", b"---\nnote_id: n-1\n---\n\nbody\n")])
+    pack = JournalPack.open(path)
+    assert pack is not None
+    note = pack.find("n-1")
+    assert note is not None
+    assert note.read_bytes().endswith(b"body\n")
+
+    path.write_bytes(path.read_bytes()[:-4])
+    assert JournalPack.open(path) is None
+    path.write_bytes(b"not a pack")
+    assert JournalPack.open(path) is None
@@ -0,0 +1,132 @@
+"""読み込んだノートをファイルの同一性をキーに保持する ParseCache のテスト."""
+
+from __future__ import annotations
+
+import os
+import pickle
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git import markdown_report_writer
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.git.parse_cache import ParseCache
+from kamojiros.infrastructure.sqlite.report_index import FileState, SqliteReportIndex
+from kamojiros.services.report_service import ReportService
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+_BASE = datetime(2025, 3, 1, 9, 0, tzinfo=JST)
+_A, _B, _C = (f"/notes/{name}.md" for name in "abc")
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_unchanged_notes_are_not_read_again(tmp_path: Path, mocker: MockerFixture, *, use_index: bool) -> None:
+    """変わっていないノートは、2 回目からフロントマターも本文もファイルから読まないことを検証する."""
+    index = SqliteReportIndex(tmp_path / "index.db") if use_index else None
+    MarkdownReportRepository(notes_repo_root=tmp_path / "notes").save_many(
+        [
+            make_report(_BASE + timedelta(hours=i), f"cache-{i}", title=f"キャッシュ {i}", body=f"本文 {i}")
+            for i in range(5)
+        ]
+    )
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=index)
+    service = ReportService(repo)
+
+    first = [(r.meta.title, r.body_markdown) for r in service.list_reports(since=_BASE)]
+    read_spy = mocker.spy(markdown_report_writer, "read_front_matter")
+    open_spy = mocker.spy(markdown_report_writer.MarkdownBody, "read")
+    second = [(r.meta.title, r.body_markdown) for r in service.list_reports(since=_BASE)]
+
+    assert second == first
+    assert read_spy.call_count == 0
+    assert open_spy.call_count == 0
+    assert repo.cache.stats().hits >= len(first)
+
+
+def test_changed_file_is_read_again(tmp_path: Path) -> None:
+    """ファイルが書き換わると (mtime_ns, サイズ) が変わり、新しい内容を読むことを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    report = make_report(_BASE, "cache-0", title="キャッシュ 0", body="本文 0")
+    path = MarkdownReportRepository(notes_repo_root=tmp_path / "notes").save(report)
+    loaded = repo.get(report.meta.note_id)
+    assert loaded is not None
+    assert loaded.body_markdown == "本文 0"
+
+    path.write_text(path.read_text().replace("キャッシュ 0", "書き換えたタイトル").replace("本文 0", "新しい本文"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = repo.get(report.meta.note_id)
+
+    assert reloaded is not None
+    assert (reloaded.meta.title, reloaded.body_markdown) == ("書き換えたタイトル", "新しい本文")
+
+
+def test_save_replaces_cached_note(tmp_path: Path, mocker: MockerFixture) -> None:
+    """保存した内容がそのままキャッシュに入り、直後の読み出しはファイルを読まないことを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    report = make_report(_BASE, "cache-0")
+    repo.save(report)
+    assert repo.get(report.meta.note_id) is not None
+
+    repo.save(make_report(_BASE, "cache-0", body="保存し直した本文"))
+    read_spy = mocker.spy(markdown_report_writer, "read_front_matter")
+    reloaded = repo.get(report.meta.note_id)
+
+    assert reloaded is not None
+    assert reloaded.body_markdown == "保存し直した本文"
+    assert read_spy.call_count == 0
+    assert len(repo.cache) == 1
+
+
+def test_cached_meta_is_not_shared_with_callers(tmp_path: Path) -> None:
+    """返した ReportMeta を書き換えても、キャッシュの内容は変わらないことを検証する."""
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes")
+    report = make_report(_BASE, "cache-0", tags=["cache"])
+    repo.save(report)
+    note_id = report.meta.note_id
+
+    first = repo.get(note_id)
+    assert first is not None
+    first.meta.tags.append("mutated")
+    second = repo.get(note_id)
+
+    assert second is not None
+    assert second.meta.tags == ["cache"]
+
+
+def test_evicts_least_recently_used_entries() -> None:
+    """件数とおおよそのメモリの上限を超えると、最近使われていないものから捨てることを検証する."""
+    meta = make_report(_BASE).meta
+    state = FileState(mtime_ns=1, size=10, inode=1)
+    cache = ParseCache(max_entries=2)
+    cache.put(_A, state, meta, 0)
+    cache.put(_B, state, meta, 0)
+    assert cache.get(_A, state) is not None  # a を最近使ったものにする
+    cache.put(_C, state, meta, 0)
+
+    assert cache.get(_B, state) is None
+    assert cache.get(_A, state) is not None
+    assert cache.get(_A, FileState(mtime_ns=2, size=10, inode=1)) is None  # 書き換わったものは捨てる
+    assert cache.stats().entries == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (2, 2)
+
+    small = ParseCache(max_bytes=4096)
+    for path in (_A, _B, _C):
+        small.put(path, state, meta, 0, body="x" * 1000)
+    assert len(small) == 1
+    assert small.get_body(_C, state) == "x" * 1000
+
+    disabled = ParseCache(max_entries=0)
+    disabled.put(_A, state, meta, 0)
+    assert len(disabled) == 0
+
+    restored = pickle.loads(pickle.dumps(cache))  # noqa: S301
+    assert (len(restored), restored.max_entries) == (0, 2)
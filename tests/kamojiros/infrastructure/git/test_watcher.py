@@ -0,0 +1,94 @@
+"""Docs/journal の変更を監視して索引に反映する JournalWatcher / IndexUpdater のテスト."""
+
+from __future__ import annotations
+
+import queue
+import shutil
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.git.watcher import IndexUpdater, JournalWatcher
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from kamojiros.interfaces.reports import ReportQuery
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from kamojiros.infrastructure.git.markdown_report_writer import IndexRefreshResult
+
+_BASE = datetime(2025, 3, 1, 9, 0, tzinfo=JST)
+# 変更が索引に反映されるのを待つ最長の秒数
+_TIMEOUT = 10.0
+
+
+def _titles(repo: MarkdownReportRepository) -> list[str]:
+    return sorted(report.meta.title for report in repo.query(ReportQuery(since=_BASE)))
+
+
+def test_updater_applies_changes_in_background(tmp_path: Path) -> None:
+    """別の書き手が追加・削除したノートが、読み出しを待たずに索引へ反映されることを検証する."""
+    notes_root = tmp_path / "notes"
+    writer = MarkdownReportRepository(notes_repo_root=notes_root)
+    writer.save(make_report(_BASE, "watch-0", title="監視 0"))
+    repo = MarkdownReportRepository(notes_repo_root=notes_root, index=SqliteReportIndex(tmp_path / "index.db"))
+    results: queue.Queue[IndexRefreshResult] = queue.Queue()
+    updater = IndexUpdater(
+        [repo], lambda _, result: results.put(result), debounce=0.05, poll_interval=0.05, force_polling=True
+    )
+
+    updater.start()
+    try:
+        assert repo.watched
+        assert _titles(repo) == ["監視 0"]
+
+        paths = writer.save_many(
+            [make_report(_BASE + timedelta(days=i), f"watch-{i}", title=f"監視 {i}") for i in range(1, 4)]
+        )
+        applied = 0
+        while applied < len(paths):
+            applied += results.get(timeout=_TIMEOUT).parsed
+        assert _titles(repo) == ["監視 0", "監視 1", "監視 2", "監視 3"]
+
+        paths[0].unlink()
+        assert results.get(timeout=_TIMEOUT).deleted == 1
+        assert _titles(repo) == ["監視 0", "監視 2", "監視 3"]
+    finally:
+        updater.stop()
+    assert not repo.watched
+
+
+def test_apply_changes_rescans_moved_directories(tmp_path: Path) -> None:
+    """ディレクトリごと移動された日付の範囲は、その範囲全体を走査し直すことを検証する."""
+    notes_root = tmp_path / "notes"
+    repo = MarkdownReportRepository(notes_repo_root=notes_root, index=SqliteReportIndex(tmp_path / "index.db"))
+    repo.save_many([make_report(_BASE + timedelta(days=i), f"watch-{i}", title=f"監視 {i}") for i in range(3)])
+    repo.refresh_index()
+
+    shutil.move(notes_root / "docs/journal/2025/03/02", tmp_path / "moved")
+    result = repo.apply_changes({"docs/journal/2025/03/02"})
+
+    assert result.deleted == 1
+    assert _titles(repo) == ["監視 0", "監視 2"]
+    assert repo.apply_changes({"docs/journal/2025"}).deleted == 0
+
+
+def test_watcher_ignores_unrelated_paths(tmp_path: Path) -> None:
+    """一時ファイルや docs/journal の外のパスは変更として返さないことを検証する."""
+    watcher = JournalWatcher(tmp_path)
+
+    relevant = [
+        "docs/journal/2025/03/01/2025-03-01-0900-tech-watch-0.md",
+        "docs/journal/2025/03/journal.pack",
+        "docs/journal/2025/03",
+    ]
+    ignored = [
+        "docs/journal/2025/03/01/.2025-03-01-0900-tech-watch-0.md.1a2b3c4d.tmp",
+        "docs/journal/2025/03/01/notes.txt",
+        "docs/other/2025/03/01/a.md",
+        ".kamojiros/index.db",
+    ]
+    assert [watcher._relevant(str(tmp_path / path)) for path in relevant] == relevant
+    assert all(watcher._relevant(str(tmp_path / path)) is None for path in ignored)
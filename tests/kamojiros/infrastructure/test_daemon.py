@@ -0,0 +1,155 @@
+"""Kamojiros serve (IndexServer) と、それに問い合わせる DaemonReportService のテスト."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from kamojiros.apps.index_server.main import DaemonAlreadyRunningError, IndexServer, bind_socket
+from kamojiros.cli.service import report_service
+from kamojiros.config.settings import NotesSettings
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.daemon import DaemonReportService
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.interfaces.reports import ReportCursor
+from kamojiros.models import Report, ReportType
+from kamojiros.services.report_service import ReportService
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+_SINCE = datetime(2025, 3, 1, tzinfo=JST)
+
+
+@pytest.fixture
+def notes(tmp_path: Path) -> NotesSettings:
+    """索引付きで 6 件を保存した Notes リポジトリの設定."""
+    settings = NotesSettings(repo_root=tmp_path / "notes")
+    reports = [
+        make_report(
+            _SINCE + timedelta(days=i, hours=9),
+            f"daemon-{i}",
+            title=f"デーモン {i}",
+            report_type=ReportType.TECH if i % 2 else ReportType.LIFE,
+            tags=["daemon", f"n{i}"],
+            body=f"常駐サーバーの本文 {i}\n\n" + "長い本文。" * 40,
+        )
+        for i in range(6)
+    ]
+    MarkdownReportRepository.for_root(settings.repo_root).save_many(reports)
+    return settings
+
+
+@pytest.fixture
+def server(notes: NotesSettings) -> Iterator[IndexServer]:
+    """別のスレッドで動かしたサーバー."""
+    server = IndexServer(notes)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    yield server
+    server.stop()
+    thread.join(timeout=10)
+
+
+def _summary(reports: list[Report]) -> list[tuple[str, str, str]]:
+    return [(r.meta.note_id, r.meta.title, r.body_markdown) for r in reports]
+
+
+def test_forwards_queries_to_running_server(notes: NotesSettings, server: IndexServer) -> None:
+    """サーバーが動いていれば問い合わせを任せ、同じプロセスで実行した場合と同じ結果になることを検証する."""
+    local = ReportService(report_repo=MarkdownReportRepository.for_root(notes.repo_root))
+    remote = report_service(notes, with_body=True)
+    assert isinstance(remote, DaemonReportService)
+
+    assert _summary(remote.list_reports(since=_SINCE, tags=["n1", "n4"])) == _summary(
+        local.list_reports(since=_SINCE, tags=["n1", "n4"])
+    )
+    assert _summary(list(remote.stream_reports(since=_SINCE, limit=4))) == _summary(
+        local.list_reports(since=_SINCE, limit=4)
+    )
+    after = ReportCursor.of(local.list_reports(since=_SINCE, limit=2)[-1].meta)
+    assert _summary(remote.list_reports(since=_SINCE, after=after)) == _summary(
+        local.list_reports(since=_SINCE, after=after)
+    )
+    assert [
+        h.report.meta.note_id for h in remote.search_reports("常駐サーバー", since=_SINCE, order="recent", after=after)
+    ] == [
+        h.report.meta.note_id for h in local.search_reports("常駐サーバー", since=_SINCE, order="recent", after=after)
+    ]
+    remote_hits = remote.search_reports("常駐サーバー 3", since=_SINCE)
+    local_hits = local.search_reports("常駐サーバー 3", since=_SINCE)
+    assert [(h.report.meta.note_id, h.snippet) for h in remote_hits] == [
+        (h.report.meta.note_id, h.snippet) for h in local_hits
+    ]
+    # period_end は問い合わせた時刻
+    remote_stats, local_stats = remote.get_statistics(_SINCE), local.get_statistics(_SINCE)
+    assert remote_stats.model_dump(exclude={"period_end"}) == local_stats.model_dump(exclude={"period_end"})
+    assert remote.get_timeline("week", _SINCE) == local.get_timeline("week", _SINCE)
+    assert remote.get_crosstab(_SINCE) == local.get_crosstab(_SINCE)
+    assert remote._local is None
+
+    # 応答に含めなかった本文は、アクセスしたときに取り寄せる
+    lazy = report_service(notes, preview=10).list_reports(since=_SINCE, limit=1)
+    assert lazy[0].body_preview(10) == "常駐サーバーの本文 "
+    assert lazy[0].body_markdown.startswith("常駐サーバーの本文 5\n\n長い本文。")
+
+    with pytest.raises(DaemonAlreadyRunningError):
+        bind_socket(server.path)
+
+
+def test_second_server_fails_before_warming(notes: NotesSettings, server: IndexServer, mocker: MockerFixture) -> None:
+    """同じソケットで 2 つ目のサーバーを起動すると、索引の更新や監視を始める前に失敗することを検証する."""
+    second = IndexServer(notes)
+    start = mocker.spy(second._updater, "start")
+
+    with pytest.raises(DaemonAlreadyRunningError):
+        second.run()
+
+    start.assert_not_called()
+    # 動いているサーバーのソケットは消さない
+    assert server.path.exists()
+    assert isinstance(report_service(notes), DaemonReportService)
+
+
+def test_falls_back_when_settings_differ(notes: NotesSettings, server: IndexServer) -> None:
+    """サーバーと設定が違うクライアントは、同じプロセスで実行することを検証する."""
+    other = notes.model_copy(update={"parse_cache_entries": 1})
+    service = report_service(other)
+    assert isinstance(service, DaemonReportService)
+
+    reports = service.list_reports(since=_SINCE)
+
+    assert len(reports) == 6  # noqa: PLR2004
+    assert service._local is not None
+    assert server.started
+
+
+def test_falls_back_without_server(notes: NotesSettings, server: IndexServer) -> None:
+    """サーバーが止まるとソケットが消え、残っていても同じプロセスで実行することを検証する."""
+    remote = report_service(notes)
+    server.stop()
+    deadline = time.monotonic() + 10
+    while server.path.exists():
+        assert time.monotonic() < deadline, "socket was not removed"
+        time.sleep(0.01)
+
+    assert isinstance(report_service(notes), ReportService)
+    assert isinstance(remote, DaemonReportService)
+    assert remote.get_statistics(_SINCE).total_count == 6  # noqa: PLR2004
+    assert len(list(remote.stream_reports(since=_SINCE))) == 6  # noqa: PLR2004
+
+    # 前回のサーバーが残したソケットファイルは作り直せる
+    server.path.touch()
+    bind_socket(server.path).close()
@@ -0,0 +1,144 @@
+"""FederatedReportRepository のテスト."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.federated import FederatedReportRepository
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from kamojiros.interfaces.reports import ReportCursor, ReportQuery, SearchQuery
+from tests.kamojiros.factories import make_report
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    import pytest
+
+    from kamojiros.models import Report
+
+
+def _federation(tmp_path: Path) -> tuple[FederatedReportRepository, list[MarkdownReportRepository]]:
+    repos = [
+        MarkdownReportRepository(notes_repo_root=tmp_path / name, index=SqliteReportIndex(tmp_path / f"{name}.db"))
+        for name in ("work", "research", "private")
+    ]
+    for repo, days in zip(repos, ((1, 4, 7), (2, 5), (3, 6)), strict=True):
+        name = repo.notes_repo_root.name
+        for day in days:
+            created_at = datetime(2025, 3, day, 9, tzinfo=JST)
+            repo.save(make_report(created_at, note_id=f"{name}-{day}", tags=[name, "common"], body="共通の本文"))
+    return FederatedReportRepository(repos=repos), repos
+
+
+def test_query_merges_roots_in_updated_order(tmp_path: Path) -> None:
+    """各 root の結果が updated_at の順にマージされ、limit がマージ後の件数に掛かることを検証する."""
+    federation, _ = _federation(tmp_path)
+
+    newest = federation.query(ReportQuery(limit=4))
+    oldest = federation.query(ReportQuery(newest_first=False, tags=("common",), limit=3))
+
+    assert [r.meta.note_id for r in newest] == ["work-7", "private-6", "research-5", "work-4"]
+    assert [r.meta.note_id for r in oldest] == ["work-1", "research-2", "private-3"]
+
+    # 最後の 1 件のカーソルから、全 root を通した続きを返す
+    after = ReportCursor.of(newest[-1].meta)
+    assert [r.meta.note_id for r in federation.query(ReportQuery(after=after))] == ["private-3", "research-2", "work-1"]
+    recent = federation.search(SearchQuery(keyword="共通", order="recent", after=after, limit=2))
+    assert [hit.report.meta.note_id for hit in recent] == ["private-3", "research-2"]
+
+
+def test_iter_reports_streams_merged_results(tmp_path: Path) -> None:
+    """iter_reports が全 root を通して新しい順に遅延で返すことを検証する."""
+    federation, _ = _federation(tmp_path)
+
+    reports = federation.iter_reports(datetime(2025, 3, 1, tzinfo=JST))
+
+    assert [next(reports).meta.note_id for _ in range(3)] == ["work-7", "private-6", "research-5"]
+
+
+def test_streams_start_every_root_in_parallel(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """iter_query が各 root の最初の 1 件を並行に読むことを検証する (順に読むとバリアで待ちきれない)."""
+    federation, repos = _federation(tmp_path)
+    barrier = threading.Barrier(len(repos), timeout=5)
+
+    def gated(repo: MarkdownReportRepository) -> Callable[[ReportQuery], Iterator[Report]]:
+        original = repo.iter_query
+
+        def iter_query(spec: ReportQuery) -> Iterator[Report]:
+            barrier.wait()
+            yield from original(spec)
+
+        return iter_query
+
+    for repo in repos:
+        monkeypatch.setattr(repo, "iter_query", gated(repo))
+
+    reports = federation.iter_query(ReportQuery(limit=3))
+
+    assert [r.meta.note_id for r in reports] == ["work-7", "private-6", "research-5"]
+
+
+def test_search_and_stats_cover_all_roots(tmp_path: Path) -> None:
+    """検索と統計がすべての root を対象にすることを検証する."""
+    federation, repos = _federation(tmp_path)
+    since = datetime(2025, 3, 1, tzinfo=JST)
+    until = datetime(2025, 3, 31, tzinfo=JST)
+
+    hits = federation.search(SearchQuery(keyword="共通", limit=10))
+    stats = federation.stats(since, until)
+
+    assert len(hits) == 7  # noqa: PLR2004
+    assert stats.total_count == 7  # noqa: PLR2004
+    assert stats.top_tags["common"] == 7  # noqa: PLR2004
+    assert stats.top_tags["work"] == 3  # noqa: PLR2004
+    assert stats.total_count == sum(repo.stats(since, until).total_count for repo in repos)
+    assert len(federation.catalog()) == 7  # noqa: PLR2004
+
+
+def test_search_normalizes_scores_per_root(tmp_path: Path) -> None:
+    """関連の強い順では、各 root のスコアを root ごとの最上位を 1 とした値にしてからマージすることを検証する."""
+    federation, repos = _federation(tmp_path)
+    # 1 つの root だけ文書が多いと、bm25 の値はその root だけ別の尺度になる
+    for i in range(20):
+        created_at = datetime(2025, 3, 10 + i % 15, 9, tzinfo=JST)
+        repos[2].save(make_report(created_at, note_id=f"private-extra-{i}", tags=["common"], body="共通の本文"))
+    spec = SearchQuery(keyword="共通", limit=100)
+
+    hits = federation.search(spec)
+
+    scores = [hit.score for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert max(scores) == 1.0
+    for repo in repos:
+        own = repo.search(spec)
+        merged = {hit.report.meta.note_id: hit.score for hit in hits}
+        assert merged[own[0].report.meta.note_id] == 1.0
+        assert [merged[hit.report.meta.note_id] for hit in own] == [hit.score / own[0].score for hit in own]
+
+
+def test_save_writes_to_primary_root(tmp_path: Path) -> None:
+    """保存は先頭の root にだけ書き込まれることを検証する."""
+    federation, repos = _federation(tmp_path)
+
+    path = federation.save(make_report(datetime(2025, 3, 8, 9, tzinfo=JST), note_id="new"))
+
+    assert path.is_relative_to(repos[0].notes_repo_root)
+    assert [r.meta.note_id for r in repos[1].query(ReportQuery())] == ["research-5", "research-2"]
+
+
+def test_update_writes_to_owning_root(tmp_path: Path) -> None:
+    """Get / update が note_id を持つ root を探して、その root に書き込むことを検証する."""
+    federation, repos = _federation(tmp_path)
+
+    updated = federation.update("research-2", tags=["edited"])
+
+    assert updated.meta.tags == ["edited"]
+    assert repos[1].query(ReportQuery(tags=("edited",)))[0].meta.note_id == "research-2"
+    assert repos[0].query(ReportQuery(tags=("edited",))) == []
+    assert federation.get("private-3") is not None
+    assert federation.get("missing") is None
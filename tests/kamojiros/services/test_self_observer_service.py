@@ -4,34 +4,16 @@ from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
 from kamojiros.core.time import JST
-from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
+from kamojiros.infrastructure.sqlite.report_index import SqliteReportIndex
+from kamojiros.models import Report, ReportAuthor, ReportType
 from kamojiros.services.self_observer_service import SelfObserverService
+from tests.kamojiros.factories import make_report
 
 if TYPE_CHECKING:
-    from pytest_mock import MockerFixture
-
+    from pathlib import Path
 
-def _make_report(
-    created_at: datetime,
-    report_type: ReportType = ReportType.TECH,
-    author: ReportAuthor = ReportAuthor.USER,
-    tags: list[str] | None = None,
-) -> Report:
-    """テスト用の Report を作成するヘルパー."""
-    if tags is None:
-        tags = []
-
-    meta = ReportMeta(
-        note_id="test-note",
-        title="Test Note",
-        created_at=created_at,
-        updated_at=created_at,
-        type=report_type,
-        author=author,
-        tags=tags,
-        source_urls=[],
-    )
-    return Report(meta=meta, body_markdown="body")
+    from pytest_mock import MockerFixture
 
 
 def test_analyze_daily_activity_aggregates_correctly(mocker: MockerFixture) -> None:
@@ -39,14 +21,14 @@ def test_analyze_daily_activity_aggregates_correctly(mocker: MockerFixture) -> N
     # Mock Repository
     mock_repo = mocker.Mock()
 
-    # 準備: find_recent が返すレポート
+    # 準備: find_recent_meta が返すレポート
     now = datetime.now(tz=JST)
     reports = [
-        _make_report(now, report_type=ReportType.TECH, author=ReportAuthor.USER, tags=["python", "agent"]),
-        _make_report(now, report_type=ReportType.TECH, author=ReportAuthor.USER, tags=["python"]),
-        _make_report(now, report_type=ReportType.LIFE, author=ReportAuthor.USER, tags=["food"]),
+        make_report(now, report_type=ReportType.TECH, author=ReportAuthor.USER, tags=["python", "agent"]),
+        make_report(now, report_type=ReportType.TECH, author=ReportAuthor.USER, tags=["python"]),
+        make_report(now, report_type=ReportType.LIFE, author=ReportAuthor.USER, tags=["food"]),
     ]
-    mock_repo.find_recent.return_value = reports
+    mock_repo.find_recent_meta.return_value = [report.meta for report in reports]
 
     # Service 実行
     service = SelfObserverService(report_repo=mock_repo)
@@ -57,9 +39,9 @@ def test_analyze_daily_activity_aggregates_correctly(mocker: MockerFixture) -> N
 
     service.analyze_daily_activity()
 
-    # 検証: find_recent が呼ばれたか
+    # 検証: 過去 24 時間に作成・更新されたレポートが求められたか
     expected_since = mock_now - timedelta(hours=24)
-    mock_repo.find_recent.assert_called_once_with(expected_since)
+    mock_repo.find_recent_meta.assert_called_once_with(expected_since)
 
     # 検証: save が呼ばれたか
     mock_repo.save.assert_called_once()
@@ -78,3 +60,18 @@ def test_analyze_daily_activity_aggregates_correctly(mocker: MockerFixture) -> N
     assert "user**: 3" in body
     assert "python**: 2" in body
     assert "food**: 1" in body
+
+
+def test_analyze_daily_activity_counts_edited_old_notes(tmp_path: Path, mocker: MockerFixture) -> None:
+    """作成は古くても直近 24 時間に更新されたノートを活動として数えることを検証する."""
+    now = datetime(2025, 11, 20, 19, 0, 0, tzinfo=JST)
+    mocker.patch("kamojiros.services.self_observer_service.now_jst", return_value=now)
+    repo = MarkdownReportRepository(notes_repo_root=tmp_path / "notes", index=SqliteReportIndex(tmp_path / "index.db"))
+    edited = make_report(now - timedelta(days=30), tags=["edited"])
+    edited.meta.updated_at = now - timedelta(hours=1)
+    repo.save(edited)
+
+    report = SelfObserverService(report_repo=repo).analyze_daily_activity()
+
+    assert "Total Reports**: 1" in report.body_markdown
+    assert "edited**: 1" in report.body_markdown
@@ -2,19 +2,35 @@
 
 from __future__ import annotations
 
+import base64
+import json
+from datetime import datetime
 from pathlib import Path  # noqa: TC003
 from typing import TYPE_CHECKING
 
+import pytest
 from typer.testing import CliRunner
 
+from kamojiros.config.settings import load_settings
+from kamojiros.core.time import JST
+from kamojiros.infrastructure.git.markdown_report_writer import MarkdownReportRepository
 from kamojiros.main import app
+from kamojiros.models import Report, ReportAuthor, ReportMeta, ReportType
 
 if TYPE_CHECKING:
-    import pytest
+    from collections.abc import Iterator
 
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def _fresh_settings() -> Iterator[None]:
+    """テストごとに環境変数から Settings を作り直す."""
+    load_settings.cache_clear()
+    yield
+    load_settings.cache_clear()
+
+
 def test_help_command() -> None:
     """ヘルプコマンドが正常に動作することを確認."""
     result = runner.invoke(app, ["--help"])
@@ -207,3 +223,202 @@ def test_list_with_json_format(tmp_path: Path, monkeypatch: pytest.MonkeyPatch)
     assert result.exit_code == 0
     # JSON形式の出力を確認（簡易チェック）
     assert "{" in result.stdout or "note_id" in result.stdout
+
+
+def test_list_and_search_stream_formats(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """List / search の --format ndjson / tsv / json が 1 件 1 行 (json は配列) で書き出されることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+    for title in ("First\tTab", "Second"):
+        runner.invoke(app, ["create", "-I", "--title", title, "--type", "tech", "--body", "line 1\nline 2"])
+
+    result = runner.invoke(app, ["list", "--format", "ndjson"])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(record["title"] for record in records) == ["First\tTab", "Second"]
+    assert all(record["body_markdown"] == "line 1\nline 2" for record in records)
+    assert json.loads(runner.invoke(app, ["list", "--json"]).stdout) == records
+
+    result = runner.invoke(app, ["list", "--format", "tsv", "-n", "1"])
+    assert result.exit_code == 0
+    [row] = result.stdout.splitlines()
+    assert row.split("\t")[1:4] == ["Second", "tech", "user"]
+    assert "First\\tTab" in runner.invoke(app, ["list", "--format", "tsv"]).stdout
+
+    result = runner.invoke(app, ["search", "Second", "--format", "ndjson"])
+    assert [json.loads(line)["title"] for line in result.stdout.splitlines()] == ["Second"]
+    assert runner.invoke(app, ["search", "missing", "--format", "ndjson"]).stdout == ""
+
+    assert runner.invoke(app, ["list", "--format", "xml"]).exit_code == 1
+
+
+def test_list_and_search_page_with_after(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """List / search が続きを読むカーソルを出力し、--after でその次から続けることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+    for i in range(3):
+        runner.invoke(app, ["create", "-I", "--title", f"Paged {i}", "--type", "tech", "--body", "paged body"])
+
+    first = [
+        json.loads(line) for line in runner.invoke(app, ["list", "--format", "ndjson", "-n", "2"]).stdout.splitlines()
+    ]
+    rest = runner.invoke(app, ["list", "--format", "ndjson", "--after", first[-1]["cursor"]]).stdout.splitlines()
+    assert [record["title"] for record in first] == ["Paged 2", "Paged 1"]
+    assert [json.loads(line)["title"] for line in rest] == ["Paged 0"]
+
+    table = runner.invoke(app, ["list", "-n", "2"]).stdout
+    assert f"--after {first[-1]['cursor']}" in table
+
+    hits = runner.invoke(app, ["search", "paged", "--format", "tsv", "--sort", "recent", "-n", "1"]).stdout
+    [cursor] = [row.split("\t")[-1] for row in hits.splitlines()]
+    rest = runner.invoke(app, ["search", "paged", "--format", "ndjson", "--after", cursor]).stdout.splitlines()
+    assert [json.loads(line)["title"] for line in rest] == ["Paged 1", "Paged 0"]
+    # 関連の強い順の結果はカーソルで続けられない
+    relevance = runner.invoke(app, ["search", "paged", "--sort", "relevance", "--after", cursor])
+    assert relevance.exit_code == 1
+    assert "--after" in relevance.stdout
+
+    # datetime で表せない時刻のトークンも、不正なカーソルとして扱う
+    out_of_range = base64.urlsafe_b64encode(b"99999999999999999999:x").decode()
+    for token in ("broken", out_of_range):
+        result = runner.invoke(app, ["list", "--after", token])
+        assert result.exit_code == 1
+        assert "Invalid cursor" in result.stdout
+
+
+def test_index_refresh_command(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Index refresh コマンドが件数を報告することを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+
+    runner.invoke(
+        app,
+        [
+            "create",
+            "-I",
+            "--title",
+            "Index Test",
+            "--type",
+            "tech",
+            "--body",
+            "Test",
+        ],
+    )
+
+    result = runner.invoke(app, ["index", "refresh"])
+
+    assert result.exit_code == 0
+    assert "scanned 1, parsed 0, deleted 0" in result.stdout
+
+    result = runner.invoke(app, ["index", "rebuild", "--jobs", "1"])
+
+    assert result.exit_code == 0
+    assert "scanned 1, indexed 1" in result.stdout
+    assert "files/s" in result.stdout
+
+
+def test_search_command_date_range(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Search の --all / --since / --until で 1 年より前のノートも検索できることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+    created = datetime(2021, 4, 1, 9, 0, 0, tzinfo=JST)
+    meta = ReportMeta(
+        note_id="2021-04-01-0900-tech-old",
+        title="Old Report",
+        created_at=created,
+        updated_at=created,
+        type=ReportType.TECH,
+        author=ReportAuthor.USER,
+    )
+    MarkdownReportRepository(notes_repo_root=tmp_path).save(Report(meta=meta, body_markdown="ARCHIVED keyword"))
+
+    assert "No reports found" in runner.invoke(app, ["search", "ARCHIVED"]).stdout
+    assert "Old Report" in runner.invoke(app, ["search", "ARCHIVED", "--all"]).stdout
+    assert "Old Report" in runner.invoke(app, ["search", "ARCHIVED", "--since", "2021-04-01"]).stdout
+    assert "No reports found" in runner.invoke(app, ["search", "ARCHIVED", "--all", "--until", "2021-03-31"]).stdout
+
+    result = runner.invoke(app, ["search", "ARCHIVED", "--all", "--since", "2021-01-01"])
+    assert result.exit_code == 1
+
+
+def test_list_command_tag_match(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """List の --tags / --match all / --exclude-tags でタグを組み合わせて絞り込めることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+    for title, tags in (("Both Tags", "python/cli,draft"), ("Python Only", "python/typing")):
+        runner.invoke(app, ["create", "-I", "--title", title, "--type", "tech", "--tags", tags, "--body", "body"])
+
+    result = runner.invoke(app, ["list", "--json", "--tags", "python/*,draft", "--match", "all"])
+    assert "Both Tags" in result.stdout
+    assert "Python Only" not in result.stdout
+
+    result = runner.invoke(app, ["list", "--json", "--tags", "python/*", "--exclude-tags", "draft"])
+    assert "Both Tags" not in result.stdout
+    assert "Python Only" in result.stdout
+
+    assert runner.invoke(app, ["list", "--match", "some"]).exit_code == 1
+
+
+def test_stats_command_group_by_and_crosstab(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Stats の --group-by と --crosstab で区切りごとの件数と種別 x 作成者の件数が表示されることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path))
+    runner.invoke(app, ["create", "-I", "--title", "Grouped", "--type", "tech", "--body", "body"])
+
+    result = runner.invoke(app, ["stats", "--group-by", "week", "--crosstab"])
+    assert result.exit_code == 0
+    assert "Timeline" in result.stdout
+    assert "Type x Author" in result.stdout
+
+    assert runner.invoke(app, ["stats", "--group-by", "year"]).exit_code == 1
+
+
+def test_list_command_reads_extra_roots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """KAMOJIROS_NOTES__EXTRA_ROOTS の root のノートも一覧に含まれ、作成は repo_root に行われることを確認."""
+    primary = tmp_path / "work"
+    extra = tmp_path / "research"
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(extra))
+    runner.invoke(app, ["create", "-I", "--title", "Research Note", "--type", "paper", "--body", "body"])
+
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(primary))
+    monkeypatch.setenv("KAMOJIROS_NOTES__EXTRA_ROOTS", f'["{extra}"]')
+    load_settings.cache_clear()
+    runner.invoke(app, ["create", "-I", "--title", "Work Note", "--type", "tech", "--body", "body"])
+
+    result = runner.invoke(app, ["list", "--json"])
+    assert "Work Note" in result.stdout
+    assert "Research Note" in result.stdout
+    assert list((primary / "docs" / "journal").rglob("*.md"))
+    assert len(list((extra / "docs" / "journal").rglob("*.md"))) == 1
+
+
+def test_import_command(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Import コマンドが Markdown のディレクトリと JSONL を取り込み、読めないものを数えることを確認."""
+    monkeypatch.setenv("KAMOJIROS_NOTES__REPO_ROOT", str(tmp_path / "notes"))
+    created = datetime(2025, 3, 1, 9, 0, 0, tzinfo=JST)
+    reports = [
+        Report(
+            meta=ReportMeta(
+                note_id=f"2025-03-01-0900-tech-import-{i}",
+                title=f"Imported {i}",
+                created_at=created,
+                updated_at=created,
+                type=ReportType.TECH,
+                author=ReportAuthor.USER,
+                tags=["imported"],
+            ),
+            body_markdown=f"Body {i}",
+        )
+        for i in range(3)
+    ]
+    MarkdownReportRepository(notes_repo_root=tmp_path / "export").save(reports[0])
+    (tmp_path / "export" / "README.md").write_text("# no front matter\n")
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text("\n".join([*(r.model_dump_json() for r in reports[1:]), "{broken"]) + "\n")
+
+    from_dir = runner.invoke(app, ["import", str(tmp_path / "export")])
+    from_jsonl = runner.invoke(app, ["import", str(dump), "--jobs", "2", "--batch-size", "1"])
+
+    assert from_dir.exit_code == 0
+    assert "Imported 1 notes" in from_dir.stdout
+    assert "skipped 1" in from_dir.stdout
+    assert from_jsonl.exit_code == 0
+    assert "Imported 2 notes" in from_jsonl.stdout
+    assert "notes/s" in from_jsonl.stdout
+    result = runner.invoke(app, ["list", "--tags", "imported", "--since", "2025-01-01", "--json"])
+    assert all(f"Imported {i}" in result.stdout for i in range(3))
+    assert runner.invoke(app, ["import", str(tmp_path / "missing")]).exit_code == 1
@@ -0,0 +1,38 @@
+"""CLI の起動時間 (-X importtime) のテスト."""
+
+from __future__ import annotations
+
+from benchmarks.cli_startup import import_times, top_level_us
+
+# kamojiros --help が site より後に読み込むモジュールの import 時間の合計の上限 (マイクロ秒)
+_HELP_BUDGET_US = 400_000
+
+# --help では読み込まないモジュール (コマンドを実行するときに初めて読み込む)
+_DEFERRED = (
+    "yaml",
+    "pydantic",
+    "pydantic_settings",
+    "sqlalchemy",
+    "sqlmodel",
+    "fastapi",
+    "uvicorn",
+    "kamojiros.config.settings",
+    "kamojiros.models",
+    "kamojiros.infrastructure",
+    "kamojiros.cli.formatters",
+)
+
+
+def test_help_imports_only_what_it_needs() -> None:
+    """Kamojiros --help がコマンドのモジュールや重い依存を読み込まず、import 時間の上限に収まることを検証する.
+
+    上限は -X importtime が数えた、site より後に読み込んだモジュールの累積時間の合計に対してかける
+    (プロセスの起動全体の経過時間ではないので、インタプリタの起動やマシンの負荷で揺れにくい)。
+    """
+    times = import_times(["--help"])
+
+    modules = {entry.name for entry in times}
+    assert not [name for name in modules if name.startswith(_DEFERRED)]
+    assert "kamojiros.cli.lazy" in modules
+    imported_us = top_level_us(times)
+    assert imported_us < _HELP_BUDGET_US, f"kamojiros --help imports took {imported_us / 1000:.1f} ms"